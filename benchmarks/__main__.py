@@ -0,0 +1,122 @@
+import argparse
+import json
+import os
+import platform
+import random
+import sqlite3
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from ormagic import (
+    clear_cache,
+    disable_connection_pool,
+    disable_write_queue,
+    shutdown_workers,
+)
+
+from .workloads import WORKLOADS
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmarks", description="Run ORMagic benchmarks."
+    )
+    parser.add_argument("--size", type=int, default=1000, help="rows per dataset")
+    parser.add_argument("--rounds", type=int, default=50, help="timed rounds")
+    parser.add_argument("--warmup", type=int, default=3, help="untimed rounds")
+    parser.add_argument("--seed", type=int, default=0, help="random seed")
+    parser.add_argument("--only", nargs="*", choices=sorted(WORKLOADS), default=None)
+    parser.add_argument("--output", type=Path, help="write results as JSON to file")
+    parser.add_argument("--compare", type=Path, help="JSON results to compare with")
+    parser.add_argument(
+        "--max-regression",
+        type=float,
+        default=0.10,
+        help="allowed median slowdown when comparing, e.g. 0.10 for 10%%",
+    )
+    args = parser.parse_args()
+
+    results = {
+        "metadata": _collect_metadata(args),
+        "benchmarks": {
+            name: _run_workload(name, args) for name in args.only or sorted(WORKLOADS)
+        },
+    }
+    report = json.dumps(results, indent=2)
+    if args.output:
+        args.output.write_text(report + "\n")
+    else:
+        print(report)
+    if args.compare:
+        baseline = json.loads(args.compare.read_text())
+        return _compare(baseline, results, args.max_regression)
+    return 0
+
+
+def _run_workload(name: str, args: argparse.Namespace) -> dict:
+    random.seed(args.seed)
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as directory:
+        os.chdir(directory)
+        try:
+            run = WORKLOADS[name](args.size)
+            for _ in range(args.warmup):
+                run()
+            timings = []
+            for _ in range(args.rounds):
+                start = time.perf_counter()
+                run()
+                timings.append(time.perf_counter() - start)
+        finally:
+            disable_write_queue()
+            shutdown_workers()
+            disable_connection_pool()
+            clear_cache()
+            os.chdir(cwd)
+    print(f"{name}: {statistics.median(timings) * 1000:.3f} ms", file=sys.stderr)
+    return {
+        "rounds": len(timings),
+        "min": min(timings),
+        "max": max(timings),
+        "mean": statistics.mean(timings),
+        "median": statistics.median(timings),
+        "stdev": statistics.stdev(timings) if len(timings) > 1 else 0.0,
+    }
+
+
+def _collect_metadata(args: argparse.Namespace) -> dict:
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        "commit": commit,
+        "python": platform.python_version(),
+        "sqlite": sqlite3.sqlite_version,
+        "platform": platform.platform(),
+        "size": args.size,
+        "rounds": args.rounds,
+        "seed": args.seed,
+    }
+
+
+def _compare(baseline: dict, results: dict, max_regression: float) -> int:
+    regressions = 0
+    for name, current in results["benchmarks"].items():
+        if name not in baseline["benchmarks"]:
+            continue
+        ratio = current["median"] / baseline["benchmarks"][name]["median"]
+        status = "REGRESSION" if ratio > 1 + max_regression else "ok"
+        regressions += status == "REGRESSION"
+        print(f"{name}: {ratio:.2f}x {status}", file=sys.stderr)
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,275 @@
+import random
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+from typing import Callable, Optional
+
+from ormagic import (
+    DBField,
+    DBModel,
+    Q,
+    enable_connection_pool,
+    enable_write_queue,
+    transaction,
+)
+
+Workload = Callable[[int], Callable[[], object]]
+
+WORKLOADS: dict[str, Workload] = {}
+
+HOT_KEYS = 10
+
+
+def workload(name: str) -> Callable[[Workload], Workload]:
+    def decorator(setup: Workload) -> Workload:
+        WORKLOADS[name] = setup
+        return setup
+
+    return decorator
+
+
+class User(DBModel):
+    email: str = DBField(unique=True)
+    name: str
+    age: int
+
+
+class CachedUser(DBModel, cache=True):
+    name: str
+    age: int
+
+
+class Post(DBModel, searchable=["body"]):
+    body: str
+
+
+class Team(DBModel):
+    name: str
+
+
+class Player(DBModel):
+    name: str
+    team: Team
+
+
+class Course(DBModel):
+    name: str
+    students: list["Student"] = []
+
+
+class Student(DBModel):
+    name: str
+    courses: list[Course] = []
+
+
+def _create_users(size: int) -> None:
+    User.create_table()
+    with transaction():
+        for i in range(size):
+            User(email=f"user{i}@example.com", name=f"User {i}", age=18 + i % 60).save()
+
+
+@workload("save_single")
+def save_single(size: int) -> Callable[[], object]:
+    User.create_table()
+    counter = iter(range(10**9))
+
+    def run() -> object:
+        i = next(counter)
+        return User(email=f"single{i}@example.com", name="Single", age=30).save()
+
+    return run
+
+
+@workload("save_bulk")
+def save_bulk(size: int) -> Callable[[], object]:
+    User.create_table()
+    counter = iter(range(10**9))
+
+    def run() -> object:
+        with transaction():
+            return [
+                User(email=f"bulk{i}@example.com", name="Bulk", age=30).save()
+                for i in islice(counter, size)
+            ]
+
+    return run
+
+
+def _save_concurrently(size: int, threads: int = 8) -> Callable[[], object]:
+    User.create_table()
+    counter = iter(range(10**9))
+
+    def save(_: int) -> object:
+        i = next(counter)
+        return User(
+            email=f"concurrent{i}@example.com", name="Concurrent", age=30
+        ).save()
+
+    def run() -> object:
+        with ThreadPoolExecutor(max_workers=threads) as executor:
+            return list(executor.map(save, range(size)))
+
+    return run
+
+
+@workload("save_concurrent")
+def save_concurrent(size: int) -> Callable[[], object]:
+    return _save_concurrently(size)
+
+
+@workload("save_concurrent_write_queue")
+def save_concurrent_write_queue(size: int) -> Callable[[], object]:
+    enable_write_queue()
+    return _save_concurrently(size)
+
+
+def _read_while_writing(size: int, threads: int = 8) -> Callable[[], object]:
+    _create_users(size)
+
+    def read(_: int) -> object:
+        return User.filter(age__gt=50, limit=20)
+
+    def write(i: int) -> object:
+        return User(email=f"writer{i}@example.com", name="Writer", age=30).save()
+
+    counter = iter(range(10**9))
+
+    def run() -> object:
+        with ThreadPoolExecutor(max_workers=threads) as executor:
+            writes = executor.submit(lambda: [write(next(counter)) for _ in range(10)])
+            reads = list(executor.map(read, range(size // 10)))
+            writes.result()
+            return reads
+
+    return run
+
+
+@workload("read_while_writing")
+def read_while_writing(size: int) -> Callable[[], object]:
+    return _read_while_writing(size)
+
+
+@workload("read_while_writing_connection_pool")
+def read_while_writing_connection_pool(size: int) -> Callable[[], object]:
+    run = _read_while_writing(size)
+    enable_connection_pool()
+    return run
+
+
+@workload("get_by_pk")
+def get_by_pk(size: int) -> Callable[[], object]:
+    _create_users(size)
+    return lambda: User.get(id=random.randint(1, size))
+
+
+@workload("get_by_pk_cached")
+def get_by_pk_cached(size: int) -> Callable[[], object]:
+    CachedUser.create_table()
+    with transaction():
+        for i in range(size):
+            CachedUser(name=f"User {i}", age=18 + i % 60).save()
+    hot_ids = list(range(1, min(size, HOT_KEYS) + 1))
+    for user_id in hot_ids:
+        CachedUser.get(id=user_id)
+    return lambda: CachedUser.get(id=random.choice(hot_ids))
+
+
+@workload("get_by_indexed_field")
+def get_by_indexed_field(size: int) -> Callable[[], object]:
+    _create_users(size)
+    return lambda: User.get(email=f"user{random.randrange(size)}@example.com")
+
+
+@workload("get_by_unindexed_field")
+def get_by_unindexed_field(size: int) -> Callable[[], object]:
+    _create_users(size)
+    return lambda: User.get(name=f"User {random.randrange(size)}")
+
+
+@workload("filter_q_tree")
+def filter_q_tree(size: int) -> Callable[[], object]:
+    _create_users(size)
+    return lambda: User.filter(
+        (Q(age__lt=25) | Q(age__gt=70)) & ~Q(name__like="User 1%"), limit=100
+    )
+
+
+@workload("paginate_offset_deep")
+def paginate_offset_deep(size: int) -> Callable[[], object]:
+    _create_users(size)
+    return lambda: User.filter(order_by="id", limit=50, offset=max(size - 50, 1))
+
+
+@workload("paginate_keyset_deep")
+def paginate_keyset_deep(size: int) -> Callable[[], object]:
+    _create_users(size)
+    cursor = None
+    page = User.paginate(page_size=50)
+    while page.next_cursor:
+        cursor = page.next_cursor
+        page = User.paginate(after=cursor, page_size=50)
+    return lambda: User.paginate(after=cursor, page_size=50)
+
+
+def _create_posts(size: int) -> None:
+    Post.create_table()
+    words = ["sqlite", "python", "index", "query", "cache", "page", "table", "row"]
+    with transaction():
+        for i in range(size):
+            Post(body=" ".join(random.choices(words, k=20)) + f" post{i}").save()
+
+
+@workload("search_like")
+def search_like(size: int) -> Callable[[], object]:
+    _create_posts(size)
+    return lambda: Post.filter(body__like=f"% post{random.randrange(size)}")
+
+
+@workload("search_fts")
+def search_fts(size: int) -> Callable[[], object]:
+    _create_posts(size)
+    return lambda: Post.search(f"post{random.randrange(size)}")
+
+
+@workload("fk_read")
+def fk_read(size: int) -> Callable[[], object]:
+    Team.create_table()
+    Player.create_table()
+    with transaction():
+        teams = [Team(name=f"Team {i}").save() for i in range(max(size // 10, 1))]
+        for i in range(size):
+            Player(name=f"Player {i}", team=teams[i % len(teams)]).save()
+    return lambda: Player.filter(limit=100)
+
+
+@workload("m2m_read")
+def m2m_read(size: int) -> Callable[[], object]:
+    Course.create_table()
+    Student.create_table()
+    with transaction():
+        courses = [Course(name=f"Course {i}").save() for i in range(10)]
+        for i in range(size):
+            Student(name=f"Student {i}", courses=random.sample(courses, 3)).save()
+    return lambda: Student.filter(limit=100)
+
+
+def _user_model_with_phone() -> type[DBModel]:
+    class User(DBModel):
+        email: str = DBField(unique=True)
+        name: str
+        age: int
+        phone: Optional[str] = None
+
+    return User
+
+
+@workload("update_table")
+def update_table(size: int) -> Callable[[], object]:
+    _create_users(size)
+    user_with_phone = _user_model_with_phone()
+
+    def run() -> object:
+        user_with_phone.update_table()
+        return User.update_table()
+
+    return run
@@ -1,6 +1,50 @@
+from .backup import backup, restore, snapshot
+from .cache import clear_cache, configure_cache
+from .connection import configure_database
+from .expressions import F
 from .fields import DBField
+from .migrations import MigrationPlan, migrate
 from .models import DBModel
+from .n_plus_one import detect_n_plus_one
+from .pagination import Page
+from .pool import disable_connection_pool, enable_connection_pool
 from .query import Q
+from .queryset import QuerySet
+from .relations import aprefetch_related, prefetch_related
+from .retry import configure_retries, reset_retry_stats, retry_stats
+from .statement_cache import clear_statement_cache, statement_cache_info
 from .transactions import transaction
+from .workers import configure_workers, shutdown_workers
+from .writer import disable_write_queue, enable_write_queue
 
-__all__ = ["DBModel", "DBField", "Q", "transaction"]
+__all__ = [
+    "DBModel",
+    "DBField",
+    "Q",
+    "F",
+    "QuerySet",
+    "prefetch_related",
+    "aprefetch_related",
+    "Page",
+    "transaction",
+    "migrate",
+    "MigrationPlan",
+    "backup",
+    "restore",
+    "snapshot",
+    "detect_n_plus_one",
+    "configure_database",
+    "configure_workers",
+    "shutdown_workers",
+    "enable_write_queue",
+    "disable_write_queue",
+    "enable_connection_pool",
+    "disable_connection_pool",
+    "configure_cache",
+    "clear_cache",
+    "statement_cache_info",
+    "clear_statement_cache",
+    "configure_retries",
+    "retry_stats",
+    "reset_retry_stats",
+]
@@ -0,0 +1,110 @@
+import json
+from datetime import date, datetime, timezone
+from decimal import Decimal
+from typing import Any, Callable
+from weakref import WeakKeyDictionary
+
+from pydantic import BaseModel
+
+from .field_utils import is_json_field, unwrap_optional
+
+_read_adapters: WeakKeyDictionary[type, dict[str, Callable[[Any], Any]]] = (
+    WeakKeyDictionary()
+)
+_json_fields: WeakKeyDictionary[type, frozenset[str]] = WeakKeyDictionary()
+_decimal_fields: WeakKeyDictionary[type, frozenset[str]] = WeakKeyDictionary()
+
+
+def to_db_value(value: Any) -> Any:
+    """Convert a Python value to the value stored in the database."""
+    if value is None or isinstance(value, (str, bytes, float)):
+        return value
+    if isinstance(value, bool):
+        return int(value)
+    if isinstance(value, int):
+        return value
+    if isinstance(value, datetime):
+        return _datetime_to_db(value)
+    if isinstance(value, date):
+        return value.isoformat()
+    if isinstance(value, (dict, list, tuple)):
+        return json.dumps(value, separators=(",", ":"), default=str)
+    if isinstance(value, BaseModel):
+        return _model_to_db(value)
+    return str(value)
+
+
+def get_read_adapters(model: Any) -> dict[str, Callable[[Any], Any]]:
+    """Return functions converting values read from the database, by field name."""
+    if (adapters := _read_adapters.get(model)) is None:
+        adapters = _read_adapters[model] = {
+            field_name: adapter
+            for field_name, field_info in model.model_fields.items()
+            if (adapter := _get_read_adapter(field_info.annotation))
+        }
+    return adapters
+
+
+def get_json_fields(model: Any) -> frozenset[str]:
+    """Return names of the fields stored as JSON."""
+    if (fields := _json_fields.get(model)) is None:
+        fields = _json_fields[model] = frozenset(
+            field_name
+            for field_name, field_info in model.model_fields.items()
+            if is_json_field(field_info.annotation)
+        )
+    return fields
+
+
+def get_decimal_fields(model: Any) -> frozenset[str]:
+    """Return names of the Decimal fields, stored as text and compared as numbers."""
+    if (fields := _decimal_fields.get(model)) is None:
+        fields = _decimal_fields[model] = frozenset(
+            field_name
+            for field_name, field_info in model.model_fields.items()
+            if unwrap_optional(field_info.annotation) is Decimal
+        )
+    return fields
+
+
+def _get_read_adapter(annotation: Any) -> Callable[[Any], Any] | None:
+    if is_json_field(annotation):
+        return _json_from_db
+    return _READ_ADAPTERS.get(unwrap_optional(annotation))
+
+
+def _model_to_db(value: BaseModel) -> Any:
+    from .models import DBModel
+
+    if isinstance(value, DBModel):
+        return value.model_id
+    return to_db_value(value.model_dump())
+
+
+def _datetime_to_db(value: datetime) -> str:
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc)
+    return value.isoformat(sep=" ", timespec="microseconds")
+
+
+def _datetime_from_db(value: Any) -> Any:
+    return datetime.fromisoformat(value) if isinstance(value, str) else value
+
+
+def _date_from_db(value: Any) -> Any:
+    return date.fromisoformat(value) if isinstance(value, str) else value
+
+
+def _decimal_from_db(value: Any) -> Any:
+    return Decimal(repr(value) if isinstance(value, float) else value)
+
+
+def _json_from_db(value: Any) -> Any:
+    return json.loads(value) if isinstance(value, str) else value
+
+
+_READ_ADAPTERS: dict[Any, Callable[[Any], Any]] = {
+    datetime: _datetime_from_db,
+    date: _date_from_db,
+    Decimal: _decimal_from_db,
+}
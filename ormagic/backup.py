@@ -0,0 +1,96 @@
+from os import PathLike
+from sqlite3 import Connection, connect
+from typing import Callable
+
+from .cache import clear_cache
+from .migrations import clear_schema_fingerprint
+from .pool import read_connection, write_connection
+from .transactions import transaction
+
+Progress = Callable[[int, int], object]
+
+
+def backup(
+    target_path: str | PathLike,
+    pages_per_step: int = 1024,
+    sleep: float = 0.25,
+    progress: Progress | None = None,
+) -> None:
+    """Copy the database to a file while it is in use.
+
+    The database is copied in steps, and between them other connections can write to it, so writers are blocked only for a short time.
+
+    Args:
+        target_path (str | PathLike): Path of the backup file, an existing file is overwritten.
+        pages_per_step (int, optional): Number of pages copied in one step, -1 copies the whole database at once. Defaults to 1024.
+        sleep (float, optional): Seconds to wait between steps. Defaults to 0.25.
+        progress (Callable[[int, int], Any], optional): Function called after each step with the number of copied pages and the total number of pages.
+    """
+    target = connect(target_path)
+    try:
+        with read_connection() as connection:
+            _copy(connection, target, pages_per_step, sleep, progress)
+    finally:
+        target.close()
+
+
+def restore(
+    source_path: str | PathLike,
+    pages_per_step: int = -1,
+    sleep: float = 0.25,
+    progress: Progress | None = None,
+) -> None:
+    """Replace the content of the database with a backup.
+
+    Args:
+        source_path (str | PathLike): Path of the backup file.
+        pages_per_step (int, optional): Number of pages copied in one step, -1 copies the whole backup at once. Defaults to -1.
+        sleep (float, optional): Seconds to wait between steps. Defaults to 0.25.
+        progress (Callable[[int, int], Any], optional): Function called after each step with the number of copied pages and the total number of pages.
+    """
+    if transaction.is_active():
+        raise RuntimeError("Backup can't be restored inside a transaction")
+    source = connect(f"file:{source_path}?mode=ro", uri=True)
+    try:
+        with write_connection() as connection:
+            _copy(source, connection, pages_per_step, sleep, progress)
+            clear_schema_fingerprint(connection.cursor())
+    finally:
+        source.close()
+        clear_cache()
+
+
+def snapshot() -> Connection:
+    """Return a read-only connection to a copy of the database in memory.
+
+    The copy doesn't change when the database does, so long analytical queries can read it without holding the database.
+    """
+    memory_connection = connect(":memory:", check_same_thread=False)
+    with read_connection() as connection:
+        _copy(connection, memory_connection, -1, 0, None)
+    memory_connection.execute("PRAGMA query_only = ON")
+    return memory_connection
+
+
+def _copy(
+    source: Connection,
+    target: Connection,
+    pages_per_step: int,
+    sleep: float,
+    progress: Progress | None,
+) -> None:
+    if pages_per_step == 0 or pages_per_step < -1:
+        raise ValueError("Number of pages per step must be greater than 0 or -1")
+    source.backup(
+        target,
+        pages=pages_per_step,
+        progress=_report(progress) if progress else None,
+        sleep=sleep,
+    )
+
+
+def _report(progress: Progress) -> Callable[[int, int, int], object]:
+    def report(status: int, remaining: int, total: int) -> None:
+        progress(total - remaining, total)
+
+    return report
@@ -0,0 +1,192 @@
+from collections import OrderedDict
+from sqlite3 import Connection
+from threading import Lock
+from time import monotonic
+from typing import Any, Callable, Hashable, NamedTuple, TypeVar
+from weakref import WeakKeyDictionary
+
+from pydantic import BaseModel
+
+from .change_tracking import ChangeWatcher
+
+T = TypeVar("T")
+
+_MISSING = object()
+
+
+class _Entry(NamedTuple):
+    value: Any
+    generations: tuple[int, ...]
+    tables: tuple[str, ...]
+    expires_at: float
+
+
+class QueryCache:
+    """LRU cache of query results invalidated by changes of the tables they depend on."""
+
+    def __init__(self, max_size: int = 1024, ttl: float = 60.0) -> None:
+        self.max_size = max_size
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[Hashable, _Entry] = OrderedDict()
+        self._generations: dict[str, int] = {}
+        self._lock = Lock()
+
+    def get(self, key: Hashable) -> Any:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or not self._is_valid(entry):
+                self._entries.pop(key, None)
+                self.misses += 1
+                return _MISSING
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry.value
+
+    def snapshot(self, tables: tuple[str, ...]) -> tuple[int, ...]:
+        with self._lock:
+            return tuple(self._generations.get(table, 0) for table in tables)
+
+    def put(
+        self,
+        key: Hashable,
+        tables: tuple[str, ...],
+        generations: tuple[int, ...],
+        value: Any,
+    ) -> None:
+        with self._lock:
+            self._entries[key] = _Entry(
+                value, generations, tables, monotonic() + self.ttl
+            )
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, tables: set[str] | tuple[str, ...]) -> None:
+        with self._lock:
+            for table in tables:
+                self._generations[table] = self._generations.get(table, 0) + 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _is_valid(self, entry: _Entry) -> bool:
+        return entry.expires_at > monotonic() and entry.generations == tuple(
+            self._generations.get(table, 0) for table in entry.tables
+        )
+
+
+_cache = QueryCache()
+_watcher: ChangeWatcher | None = None
+_pending: dict[Connection, set[str]] = {}
+_pending_lock = Lock()
+_dependencies: WeakKeyDictionary[type, tuple[str, ...]] = WeakKeyDictionary()
+
+
+def configure_cache(
+    max_size: int = 1024, ttl: float = 60.0, cross_process: bool = False
+) -> None:
+    """Configure the query cache used by models defined with `cache=True`.
+
+    Args:
+        max_size (int, optional): Maximum number of cached query results. Defaults to 1024.
+        ttl (float, optional): Time in seconds after which a cached result expires. Defaults to 60.
+        cross_process (bool, optional): Check for changes committed by other processes before serving cached results. Defaults to False.
+    """
+    global _cache, _watcher
+    if max_size < 1:
+        raise ValueError("Cache size must be greater than 0")
+    if _watcher:
+        _watcher.close()
+    _cache = QueryCache(max_size, ttl)
+    _watcher = ChangeWatcher() if cross_process else None
+
+
+def clear_cache() -> None:
+    """Remove all cached query results."""
+    _cache.clear()
+
+
+def get_query_cache() -> QueryCache:
+    return _cache
+
+
+def cached_query(
+    model: Any, kind: str, query: str, params: list, load: Callable[[], T]
+) -> T:
+    if not model._cache_enabled:
+        return load()
+    from .transactions import transaction
+
+    if transaction.is_active():
+        return load()
+    try:
+        key = (model, kind, query, tuple(params))
+        hash(key)
+    except TypeError:
+        return load()
+    cache = _cache
+    if _watcher and (changed_tables := _watcher.changed_tables()):
+        cache.invalidate(changed_tables)
+    value = cache.get(key)
+    if value is _MISSING:
+        tables = get_dependent_tables(model)
+        generations = cache.snapshot(tables)
+        value = load()
+        cache.put(key, tables, generations, value)
+    return _copy(value)
+
+
+def invalidate_tables(connection: Connection, *tables: str) -> None:
+    _cache.invalidate(tables)
+    if connection.in_transaction:
+        with _pending_lock:
+            _pending.setdefault(connection, set()).update(tables)
+
+
+def invalidate_pending_tables(connection: Connection) -> None:
+    with _pending_lock:
+        tables = _pending.pop(connection, None)
+    if tables:
+        _cache.invalidate(tables)
+
+
+def get_dependent_tables(model: Any) -> tuple[str, ...]:
+    if (tables := _dependencies.get(model)) is None:
+        tables = _dependencies[model] = tuple(sorted(_collect_tables(model, set())))
+    return tables
+
+
+def _collect_tables(model: Any, tables: set[str]) -> set[str]:
+    from .field_utils import is_many_to_many_field
+    from .table_manager import get_foreign_key_model
+
+    table_name = model._get_table_name()
+    if table_name in tables:
+        return tables
+    tables.add(table_name)
+    for field_info in model.model_fields.values():
+        if is_many_to_many_field(field_info.annotation):
+            related_model = getattr(field_info.annotation, "__args__")[0]
+            related_table_name = related_model._get_table_name()
+            tables.add(f"{table_name}_{related_table_name}")
+            tables.add(f"{related_table_name}_{table_name}")
+            _collect_tables(related_model, tables)
+        elif foreign_model := get_foreign_key_model(field_info.annotation):
+            _collect_tables(foreign_model, tables)
+    return tables
+
+
+def _copy(value: T) -> T:
+    if isinstance(value, list):
+        return [_copy(item) for item in value]  # type: ignore
+    if isinstance(value, BaseModel):
+        return value.model_copy(deep=True)  # type: ignore
+    return value
@@ -0,0 +1,91 @@
+from sqlite3 import Connection, Cursor, OperationalError
+from threading import Lock
+
+from ormagic.connection import create_connection
+
+CHANGES_TABLE = "_ormagic_changes"
+
+
+class ChangeWatcher:
+    """Detect tables changed by any connection, also in other processes.
+
+    `PRAGMA data_version` tells cheaply whether anything was committed since the
+    last check, and only then the per-table counters maintained by triggers are
+    read to find out which tables actually changed.
+    """
+
+    def __init__(self) -> None:
+        self._connection: Connection | None = None
+        self._data_version: int | None = None
+        self._versions: dict[str, int] = {}
+        self._lock = Lock()
+
+    def changed_tables(self) -> set[str]:
+        with self._lock:
+            if self._connection is None:
+                self._connection = create_connection(check_same_thread=False)
+            cursor = self._connection.execute("PRAGMA data_version")
+            data_version = cursor.fetchone()[0]
+            if data_version == self._data_version:
+                return set()
+            self._data_version = data_version
+            versions = _fetch_table_versions(self._connection)
+            changed = {
+                table
+                for table in versions.keys() | self._versions.keys()
+                if versions.get(table) != self._versions.get(table)
+            }
+            self._versions = versions
+            return changed
+
+    def close(self) -> None:
+        with self._lock:
+            if self._connection:
+                self._connection.close()
+            self._connection = None
+            self._data_version = None
+
+
+def install_change_triggers(cursor: Cursor, *table_names: str) -> None:
+    _create_changes_table(cursor)
+    placeholders = ", ".join(["?"] * len(table_names))
+    cursor.execute(
+        f"SELECT name FROM sqlite_master WHERE type='table' AND name IN ({placeholders})",
+        table_names,
+    )
+    for (table_name,) in cursor.fetchall():
+        cursor.execute(
+            f"INSERT OR IGNORE INTO {CHANGES_TABLE} (table_name, version) VALUES (?, 0)",
+            (table_name,),
+        )
+        for operation in ("INSERT", "UPDATE", "DELETE"):
+            cursor.execute(
+                f"CREATE TRIGGER IF NOT EXISTS {CHANGES_TABLE}_{table_name}_{operation.lower()} "
+                f"AFTER {operation} ON {table_name} BEGIN "
+                f"UPDATE {CHANGES_TABLE} SET version = version + 1 WHERE table_name = '{table_name}'; "
+                "END"
+            )
+
+
+def record_table_change(cursor: Cursor, table_name: str) -> None:
+    _create_changes_table(cursor)
+    cursor.execute(
+        f"INSERT INTO {CHANGES_TABLE} (table_name, version) VALUES (?, 1) "
+        "ON CONFLICT (table_name) DO UPDATE SET version = version + 1",
+        (table_name,),
+    )
+
+
+def _create_changes_table(cursor: Cursor) -> None:
+    cursor.execute(
+        f"CREATE TABLE IF NOT EXISTS {CHANGES_TABLE} "
+        "(table_name TEXT PRIMARY KEY, version INTEGER NOT NULL DEFAULT 0)"
+    )
+
+
+def _fetch_table_versions(connection: Connection) -> dict[str, int]:
+    try:
+        cursor = connection.execute(f"SELECT table_name, version FROM {CHANGES_TABLE}")
+    except OperationalError:
+        return {}
+    return dict(cursor.fetchall())
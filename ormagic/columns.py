@@ -0,0 +1,112 @@
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Any, Callable, Sequence
+
+from .adapters import _json_from_db
+from .field_utils import (
+    is_json_field,
+    is_many_to_many_field,
+    is_primary_key_field,
+    unwrap_optional,
+)
+from .statement_cache import prepare_query
+from .table_manager import get_foreign_key_model
+
+_DTYPES: dict[Any, str] = {
+    int: "int64",
+    bool: "bool",
+    float: "float64",
+    Decimal: "float64",
+    datetime: "datetime64[us]",
+    date: "datetime64[D]",
+}
+_OPTIONAL_DTYPES = {"int64": "float64", "bool": "object"}
+
+
+def fetch_columns(
+    model: Any, fields: Sequence[str], batch_size: int, *args, **kwargs
+) -> dict[str, Any]:
+    """Fetch values of the fields into NumPy arrays, `batch_size` rows at a time, without creating objects."""
+    from .cursor import get_read_cursor
+
+    np = _import_numpy()
+    if batch_size < 1:
+        raise ValueError("Batch size must be greater than 0")
+    fields = fields or [
+        field_name
+        for field_name, field_info in model.model_fields.items()
+        if not is_many_to_many_field(field_info.annotation)
+    ]
+    column_types = [_get_column_type(model, field_name) for field_name in fields]
+    chunks: list[list[Any]] = [[] for _ in fields]
+    query, params = prepare_query(
+        model,
+        f"SELECT {', '.join(fields)} FROM {model._get_table_name()}",
+        *args,
+        **kwargs,
+    )
+    with get_read_cursor() as cursor:
+        cursor.execute(query, params)
+        while rows := cursor.fetchmany(batch_size):
+            for index, (dtype, convert) in enumerate(column_types):
+                values = [row[index] for row in rows]
+                if convert:
+                    values = [convert(value) for value in values]
+                chunks[index].append(_to_array(np, values, dtype))
+    return {
+        field_name: np.concatenate(arrays) if arrays else np.empty(0, dtype=dtype)
+        for field_name, arrays, (dtype, _) in zip(fields, chunks, column_types)
+    }
+
+
+def _import_numpy() -> Any:
+    try:
+        import numpy
+    except ImportError as error:
+        raise ImportError(
+            "NumPy is required to fetch columns, install it with: pip install ormagic[numpy]"
+        ) from error
+    return numpy
+
+
+def _get_column_type(
+    model: Any, field_name: str
+) -> tuple[str, Callable[[Any], Any] | None]:
+    field_info = model.model_fields.get(field_name)
+    if not field_info or is_many_to_many_field(field_info.annotation):
+        raise ValueError(f"Invalid field: {field_name}")
+    annotation = field_info.annotation
+    if is_json_field(annotation):
+        return "object", _json_from_db
+    base_annotation = unwrap_optional(annotation)
+    is_nullable = base_annotation is not annotation and not is_primary_key_field(
+        field_info
+    )
+    if foreign_model := get_foreign_key_model(annotation):
+        base_annotation = unwrap_optional(
+            foreign_model.model_fields[
+                foreign_model._get_primary_key_field_name()
+            ].annotation
+        )
+    dtype = _DTYPES.get(base_annotation, "object")
+    if is_nullable:
+        dtype = _OPTIONAL_DTYPES.get(dtype, dtype)
+    if base_annotation is datetime:
+        return dtype, _naive_datetime_text
+    if dtype == "object" and base_annotation is bool:
+        return dtype, _bool_from_db
+    return dtype, None
+
+
+def _to_array(np: Any, values: list, dtype: str) -> Any:
+    if dtype == "object":
+        return np.fromiter(values, dtype=object, count=len(values))
+    return np.array(values, dtype=dtype)
+
+
+def _naive_datetime_text(value: Any) -> Any:
+    return value[:26] if isinstance(value, str) else value
+
+
+def _bool_from_db(value: Any) -> Any:
+    return bool(value) if value is not None else None
@@ -1,8 +1,82 @@
 from sqlite3 import Connection, connect
+from threading import Lock
+from uuid import uuid4
 
+from .retry import get_busy_timeout
 
-def create_connection() -> Connection:
-    connection = connect("db.sqlite3", isolation_level=None)
+DEFAULT_DATABASE = "db.sqlite3"
+
+_database = DEFAULT_DATABASE
+_keep_alive_connection: Connection | None = None
+_database_lock = Lock()
+
+
+def configure_database(database: str = DEFAULT_DATABASE) -> None:
+    """Set the database used by all connections.
+
+    Args:
+        database (str, optional): Path to the database file, `:memory:` for an in-memory database shared by all connections of the process or a SQLite URI like `file::memory:?cache=shared`. An in-memory database exists until another database is configured. Defaults to "db.sqlite3".
+    """
+    global _database, _keep_alive_connection
+    from . import cache
+    from .pool import disable_connection_pool
+    from .workers import shutdown_workers
+
+    disable_connection_pool()
+    shutdown_workers()
+    cache.clear_cache()
+    if cache._watcher:
+        cache._watcher.close()
+    with _database_lock:
+        if database == ":memory:":
+            database = f"file:/ormagic-{uuid4().hex}?vfs=memdb"
+        keep_alive_connection, _keep_alive_connection = _keep_alive_connection, None
+        _database = database
+        if is_memory_database():
+            _keep_alive_connection = create_connection(check_same_thread=False)
+    if keep_alive_connection:
+        keep_alive_connection.close()
+
+
+def get_database() -> str:
+    """Return path or URI of the configured database."""
+    return _database
+
+
+def is_memory_database() -> bool:
+    """Check if the configured database is stored in memory."""
+    return _is_uri(_database) and (
+        "vfs=memdb" in _database
+        or "mode=memory" in _database
+        or _database.startswith("file::memory:")
+    )
+
+
+def create_connection(check_same_thread: bool = True) -> Connection:
+    connection = connect(
+        _database,
+        uri=_is_uri(_database),
+        isolation_level=None,
+        check_same_thread=check_same_thread,
+        timeout=get_busy_timeout(),
+    )
     connection.execute("PRAGMA foreign_keys = ON")
-    connection.execute("PRAGMA journal_mode = WAL")
+    if not is_memory_database():
+        connection.execute("PRAGMA journal_mode = WAL")
+    return connection
+
+
+def create_read_connection(check_same_thread: bool = True) -> Connection:
+    connection = connect(
+        _database if _is_uri(_database) else f"file:{_database}?mode=ro",
+        uri=True,
+        isolation_level=None,
+        check_same_thread=check_same_thread,
+        timeout=get_busy_timeout(),
+    )
+    connection.execute("PRAGMA query_only = ON")
     return connection
+
+
+def _is_uri(database: str) -> bool:
+    return database.startswith("file:")
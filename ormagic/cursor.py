@@ -2,17 +2,29 @@ from contextlib import contextmanager
 from sqlite3 import Cursor
 from typing import Any, Generator
 
-from ormagic.connection import create_connection
+from ormagic.n_plus_one import install_detector
+from ormagic.pool import read_connection, write_connection
+from ormagic.retry import RetryingCursor
 from ormagic.transactions import transaction
 
 
 @contextmanager
 def get_cursor() -> Generator[Cursor, Any, None]:
-    if transaction._is_transaction:
-        yield transaction._connection.cursor()
+    if connection := transaction._get_connection():
+        install_detector(connection)
+        yield connection.cursor(RetryingCursor)
     else:
-        connection = create_connection()
-        try:
-            yield connection.cursor()
-        finally:
-            connection.close()
+        with write_connection() as connection:
+            install_detector(connection)
+            yield connection.cursor(RetryingCursor)
+
+
+@contextmanager
+def get_read_cursor() -> Generator[Cursor, Any, None]:
+    if connection := transaction._get_connection():
+        install_detector(connection)
+        yield connection.cursor(RetryingCursor)
+    else:
+        with read_connection() as connection:
+            install_detector(connection)
+            yield connection.cursor(RetryingCursor)
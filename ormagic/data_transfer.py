@@ -0,0 +1,175 @@
+import csv
+import json
+from base64 import b64decode, b64encode
+from itertools import islice
+from os import PathLike
+from typing import Any, Iterator, Literal
+from weakref import WeakKeyDictionary
+
+from pydantic import TypeAdapter
+
+from .adapters import get_json_fields, to_db_value
+from .field_utils import is_many_to_many_field, unwrap_optional
+from .table_manager import get_foreign_key_model
+
+Format = Literal["jsonl", "csv"]
+
+_row_schemas: WeakKeyDictionary[
+    type, tuple[list[str], dict[str, tuple[Any, str, TypeAdapter]]]
+] = WeakKeyDictionary()
+
+
+def export_rows(
+    model: Any,
+    path: str | PathLike,
+    format: Format,
+    batch_size: int,
+    *args,
+    **kwargs,
+) -> int:
+    """Write rows of the model table matching the filters to a file, `batch_size` rows at a time."""
+    from .cursor import get_read_cursor
+
+    _check_options(format, batch_size)
+    json_fields = get_json_fields(model) if format == "jsonl" else frozenset()
+    count = 0
+    with open(path, "w", newline="", encoding="utf-8") as file:
+        with get_read_cursor() as cursor:
+            query, params = model._prepare_query_to_fetch_raw_data(*args, **kwargs)
+            cursor.execute(query, params)
+            columns = [column[0] for column in cursor.description]
+            writer = _get_writer(file, format, columns)
+            while rows := cursor.fetchmany(batch_size):
+                for row in rows:
+                    writer(
+                        [
+                            _export_value(value, column in json_fields)
+                            for column, value in zip(columns, row)
+                        ]
+                    )
+                count += len(rows)
+    return count
+
+
+def import_rows(
+    model: Any, path: str | PathLike, format: Format, batch_size: int
+) -> int:
+    """Validate rows read from a file and insert them into the model table, `batch_size` rows in one transaction."""
+    from .cache import invalidate_tables
+    from .cursor import get_cursor
+    from .transactions import transaction
+
+    _check_options(format, batch_size)
+    table_name = model._get_table_name()
+    count = 0
+    with open(path, newline="", encoding="utf-8") as file:
+        rows = map(
+            lambda row: _prepare_row(model, row, format),
+            _read_rows(file, format),
+        )
+        while batch := list(islice(rows, batch_size)):
+            values = [validate_row(model, row) for row in batch]
+            columns = list(values[0])
+            with transaction():
+                with get_cursor() as cursor:
+                    cursor.executemany(
+                        f"INSERT INTO {table_name} ({', '.join(columns)}) "
+                        f"VALUES ({', '.join(['?'] * len(columns))})",
+                        [
+                            [to_db_value(row[column]) for column in columns]
+                            for row in values
+                        ],
+                    )
+                    invalidate_tables(cursor.connection, table_name)
+            count += len(batch)
+    return count
+
+
+def validate_row(model: Any, row: dict[str, Any]) -> dict[str, Any]:
+    """Validate a row with the model and its validators and return column values, with foreign keys as primary key values."""
+    columns, foreign_keys = _get_row_schema(model)
+    for field_name, (foreign_model, primary_key, adapter) in foreign_keys.items():
+        if (value := row.get(field_name)) is not None:
+            row[field_name] = foreign_model.model_construct(
+                **{primary_key: adapter.validate_python(value)}
+            )
+    obj = model.model_validate(row)
+    values = obj.model_dump(include=set(columns) - set(foreign_keys))
+    for field_name in foreign_keys:
+        related = getattr(obj, field_name)
+        values[field_name] = related.model_id if related is not None else None
+    return {column: values[column] for column in columns}
+
+
+def _get_row_schema(
+    model: Any,
+) -> tuple[list[str], dict[str, tuple[Any, str, TypeAdapter]]]:
+    if (schema := _row_schemas.get(model)) is None:
+        columns = []
+        foreign_keys = {}
+        for field_name, field_info in model.model_fields.items():
+            if is_many_to_many_field(field_info.annotation):
+                continue
+            columns.append(field_name)
+            if foreign_model := get_foreign_key_model(field_info.annotation):
+                primary_key = foreign_model._get_primary_key_field_name()
+                annotation = foreign_model.model_fields[primary_key].annotation
+                foreign_keys[field_name] = (
+                    foreign_model,
+                    primary_key,
+                    TypeAdapter(unwrap_optional(annotation)),
+                )
+        schema = _row_schemas[model] = (columns, foreign_keys)
+    return schema
+
+
+def _check_options(format: str, batch_size: int) -> None:
+    if format not in ("jsonl", "csv"):
+        raise ValueError(f"Unsupported format: {format}")
+    if batch_size < 1:
+        raise ValueError("Batch size must be greater than 0")
+
+
+def _get_writer(file: Any, format: Format, columns: list[str]) -> Any:
+    if format == "csv":
+        csv_writer = csv.writer(file)
+        csv_writer.writerow(columns)
+        return csv_writer.writerow
+    return lambda values: file.write(
+        json.dumps(dict(zip(columns, values)), ensure_ascii=False) + "\n"
+    )
+
+
+def _export_value(value: Any, is_json: bool) -> Any:
+    if isinstance(value, bytes):
+        return b64encode(value).decode()
+    if is_json and isinstance(value, str):
+        return json.loads(value)
+    return value
+
+
+def _read_rows(file: Any, format: Format) -> Iterator[dict[str, Any]]:
+    if format == "csv":
+        yield from csv.DictReader(file)
+        return
+    for line in file:
+        if line.strip():
+            yield json.loads(line)
+
+
+def _prepare_row(model: Any, row: dict[str, Any], format: Format) -> dict[str, Any]:
+    json_fields = get_json_fields(model)
+    for field_name, value in row.items():
+        if field_name not in model.model_fields:
+            continue
+        annotation = model.model_fields[field_name].annotation
+        is_optional = unwrap_optional(annotation) is not annotation
+        if format == "csv" and value == "" and is_optional:
+            row[field_name] = value = None
+        if value is None:
+            continue
+        if unwrap_optional(annotation) is bytes:
+            row[field_name] = b64decode(value)
+        elif format == "csv" and field_name in json_fields:
+            row[field_name] = json.loads(value)
+    return row
@@ -0,0 +1,208 @@
+import re
+from abc import ABC, abstractmethod
+from typing import Any, Collection, Hashable
+
+from .adapters import to_db_value
+
+_FIELD_NAME = re.compile(r"^\w+(__\w+)*$")
+
+
+class Expression(ABC):
+    """Value computed by the database from columns of the row, built from `F` objects."""
+
+    __slots__ = ()
+
+    def __add__(self, other: Any) -> "CombinedExpression":
+        return CombinedExpression(self, "+", other)
+
+    def __radd__(self, other: Any) -> "CombinedExpression":
+        return CombinedExpression(other, "+", self)
+
+    def __sub__(self, other: Any) -> "CombinedExpression":
+        return CombinedExpression(self, "-", other)
+
+    def __rsub__(self, other: Any) -> "CombinedExpression":
+        return CombinedExpression(other, "-", self)
+
+    def __mul__(self, other: Any) -> "CombinedExpression":
+        return CombinedExpression(self, "*", other)
+
+    def __rmul__(self, other: Any) -> "CombinedExpression":
+        return CombinedExpression(other, "*", self)
+
+    def __truediv__(self, other: Any) -> "CombinedExpression":
+        return CombinedExpression(self, "/", other)
+
+    def __rtruediv__(self, other: Any) -> "CombinedExpression":
+        return CombinedExpression(other, "/", self)
+
+    def __mod__(self, other: Any) -> "CombinedExpression":
+        return CombinedExpression(self, "%", other)
+
+    def __rmod__(self, other: Any) -> "CombinedExpression":
+        return CombinedExpression(other, "%", self)
+
+    def __eq__(self, other: object) -> bool:
+        return type(self) is type(other) and self._key() == other._key()  # type: ignore
+
+    def __hash__(self) -> int:
+        return hash(self._key())
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        raise AttributeError("Expressions are immutable")
+
+    def asc(self) -> "OrderBy":
+        """Order results by the expression in ascending order."""
+        return OrderBy(self, False)
+
+    def desc(self) -> "OrderBy":
+        """Order results by the expression in descending order."""
+        return OrderBy(self, True)
+
+    @property
+    @abstractmethod
+    def params(self) -> list: ...
+
+    @property
+    @abstractmethod
+    def shape(self) -> Hashable: ...
+
+    @abstractmethod
+    def compile(
+        self, json_fields: Collection[str] = (), decimal_fields: Collection[str] = ()
+    ) -> tuple[str, list]:
+        """Compile the expression to SQL with `?` placeholders and its parameters."""
+
+    @abstractmethod
+    def _key(self) -> Hashable: ...
+
+
+class F(Expression):
+    """Reference to a field of the row, like `F("views")` or `F("data__count")` for a JSON key."""
+
+    __slots__ = ("name",)
+
+    name: str
+
+    def __init__(self, name: str) -> None:
+        if not _FIELD_NAME.match(name):
+            raise ValueError(f"Invalid field name: {name}")
+        object.__setattr__(self, "name", name)
+
+    def __repr__(self) -> str:
+        return f"F({self.name!r})"
+
+    @property
+    def params(self) -> list:
+        return []
+
+    @property
+    def shape(self) -> Hashable:
+        return ("F", self.name)
+
+    def compile(
+        self, json_fields: Collection[str] = (), decimal_fields: Collection[str] = ()
+    ) -> tuple[str, list]:
+        from .field_utils import prepare_lookup_expression
+
+        return prepare_lookup_expression(self.name, json_fields, decimal_fields), []
+
+    def _key(self) -> Hashable:
+        return self.name
+
+
+class CombinedExpression(Expression):
+    """Arithmetic operation on two expressions or an expression and a value."""
+
+    __slots__ = ("left", "operator", "right")
+
+    left: Any
+    operator: str
+    right: Any
+
+    def __init__(self, left: Any, operator: str, right: Any) -> None:
+        object.__setattr__(self, "left", left)
+        object.__setattr__(self, "operator", operator)
+        object.__setattr__(self, "right", right)
+
+    def __repr__(self) -> str:
+        return f"({self.left!r} {self.operator} {self.right!r})"
+
+    @property
+    def params(self) -> list:
+        return [*_get_params(self.left), *_get_params(self.right)]
+
+    @property
+    def shape(self) -> Hashable:
+        return (_get_shape(self.left), self.operator, _get_shape(self.right))
+
+    def compile(
+        self, json_fields: Collection[str] = (), decimal_fields: Collection[str] = ()
+    ) -> tuple[str, list]:
+        left, left_params = _compile_operand(self.left, json_fields, decimal_fields)
+        right, right_params = _compile_operand(self.right, json_fields, decimal_fields)
+        return f"{left} {self.operator} {right}", [*left_params, *right_params]
+
+    def _key(self) -> Hashable:
+        return (self.left, self.operator, self.right)
+
+
+class OrderBy:
+    """Expression with the direction of ordering, created with `asc` and `desc` methods of expressions."""
+
+    __slots__ = ("expression", "descending")
+
+    def __init__(self, expression: Expression, descending: bool) -> None:
+        self.expression = expression
+        self.descending = descending
+
+    def __eq__(self, other: object) -> bool:
+        return isinstance(other, OrderBy) and self._key() == other._key()
+
+    def __hash__(self) -> int:
+        return hash(self._key())
+
+    @property
+    def params(self) -> list:
+        return self.expression.params
+
+    @property
+    def shape(self) -> Hashable:
+        return (self.expression.shape, self.descending)
+
+    def compile(
+        self, json_fields: Collection[str] = (), decimal_fields: Collection[str] = ()
+    ) -> tuple[str, list]:
+        sql, params = self.expression.compile(json_fields, decimal_fields)
+        return f"{sql} {'DESC' if self.descending else 'ASC'}", params
+
+    def _key(self) -> Hashable:
+        return (self.expression, self.descending)
+
+
+def get_order_by_params(order_by: Any) -> list:
+    """Return parameters of expressions used to order results."""
+    if isinstance(order_by, (list, tuple, set)):
+        return [param for item in order_by for param in get_order_by_params(item)]
+    if isinstance(order_by, (Expression, OrderBy)):
+        return order_by.params
+    return []
+
+
+def _compile_operand(
+    operand: Any, json_fields: Collection[str], decimal_fields: Collection[str]
+) -> tuple[str, list]:
+    if isinstance(operand, CombinedExpression):
+        sql, params = operand.compile(json_fields, decimal_fields)
+        return f"({sql})", params
+    if isinstance(operand, Expression):
+        return operand.compile(json_fields, decimal_fields)
+    return "?", [to_db_value(operand)]
+
+
+def _get_params(operand: Any) -> list:
+    return operand.params if isinstance(operand, Expression) else [to_db_value(operand)]
+
+
+def _get_shape(operand: Any) -> Hashable:
+    return operand.shape if isinstance(operand, Expression) else "?"
@@ -1,5 +1,8 @@
-from types import NoneType
-from typing import Any, Literal, Union, get_args
+import re
+from datetime import date, datetime
+from decimal import Decimal
+from types import NoneType, UnionType
+from typing import Any, Collection, Literal, Union, get_args, get_origin
 
 from pydantic.fields import FieldInfo
 
@@ -10,10 +13,26 @@ def is_many_to_many_field(field_annotation: Any) -> bool:
     return bool(
         hasattr(field_annotation, "__origin__")
         and getattr(field_annotation, "__origin__") is list
+        and isinstance(getattr(field_annotation, "__args__")[0], type)
         and issubclass(getattr(field_annotation, "__args__")[0], DBModel)
     )
 
 
+def is_json_field(field_annotation: Any) -> bool:
+    from pydantic import BaseModel
+
+    from .models import DBModel
+
+    annotation = unwrap_optional(field_annotation)
+    if is_many_to_many_field(annotation):
+        return False
+    origin = get_origin(annotation) or annotation
+    return isinstance(origin, type) and (
+        issubclass(origin, (dict, list))
+        or (issubclass(origin, BaseModel) and not issubclass(origin, DBModel))
+    )
+
+
 def is_unique_field(field_info: FieldInfo) -> bool:
     return bool(
         field_info.json_schema_extra and field_info.json_schema_extra.get("unique")
@@ -26,19 +45,46 @@ def is_primary_key_field(field_info: FieldInfo) -> bool:
     )
 
 
+def is_version_field(field_info: FieldInfo) -> bool:
+    return bool(
+        field_info.json_schema_extra and field_info.json_schema_extra.get("version")
+    )
+
+
+def get_related_name(field_info: FieldInfo) -> str | None:
+    if isinstance(field_info.json_schema_extra, dict):
+        related_name = field_info.json_schema_extra.get("related_name")
+        return related_name if isinstance(related_name, str) else None
+    return None
+
+
+_SQL_TYPES: dict[Any, Literal["INTEGER", "REAL", "NUMERIC", "BLOB", "TEXT"]] = {
+    int: "INTEGER",
+    bool: "INTEGER",
+    float: "REAL",
+    Decimal: "TEXT",
+    bytes: "BLOB",
+    datetime: "TEXT",
+    date: "TEXT",
+}
+
+
+def unwrap_optional(annotation: Any) -> Any:
+    if get_origin(annotation) not in (Union, UnionType):
+        return annotation
+    types_tuple = tuple(arg for arg in get_args(annotation) if arg is not NoneType)
+    return types_tuple[0] if len(types_tuple) == 1 else annotation
+
+
 def transform_field_annotation_to_sql_type(
     annotation: Any,
-) -> Literal["INTEGER", "TEXT"]:
+) -> Literal["INTEGER", "REAL", "NUMERIC", "BLOB", "TEXT"]:
     from .models import DBModel
 
-    if annotation in [int, Union[int, NoneType]]:
-        return "INTEGER"
-    types_tuple = get_args(annotation)
-    if not types_tuple and issubclass(annotation, DBModel):
-        return "INTEGER"
-    if types_tuple and issubclass(types_tuple[0], DBModel):
+    annotation = unwrap_optional(annotation)
+    if isinstance(annotation, type) and issubclass(annotation, DBModel):
         return "INTEGER"
-    return "TEXT"
+    return _SQL_TYPES.get(annotation, "TEXT")
 
 
 def get_on_delete_action(
@@ -57,38 +103,111 @@ def get_on_delete_action(
     return "CASCADE"
 
 
-def _extract_field_operator(field: str) -> tuple[str, str]:
-    if "__" not in field:
-        return field, "="
-    field, operator = field.split("__")
-    if operator == "ne":
-        operator = "<>"
-    elif operator == "gt":
-        operator = ">"
-    elif operator == "gte":
-        operator = ">="
-    elif operator == "lt":
-        operator = "<"
-    elif operator == "lte":
-        operator = "<="
-    elif operator == "like":
-        operator = "LIKE"
-    elif operator == "nlike":
-        operator = "NOT LIKE"
-    elif operator == "in":
-        operator = "IN"
-    elif operator == "nin":
-        operator = "NOT IN"
-    elif operator == "between":
-        operator = "BETWEEN"
-    elif operator == "nbetween":
-        operator = "NOT BETWEEN"
-    else:
-        raise ValueError(f"Invalid operator: {operator}")
-    return field, operator
-
-
-def prepare_where_conditions(*args, **kwargs) -> tuple[str, list]:
+_OPERATORS = {
+    "ne": "<>",
+    "gt": ">",
+    "gte": ">=",
+    "lt": "<",
+    "lte": "<=",
+    "like": "LIKE",
+    "nlike": "NOT LIKE",
+    "in": "IN",
+    "nin": "NOT IN",
+    "between": "BETWEEN",
+    "nbetween": "NOT BETWEEN",
+}
+
+
+_JSON_OPERATORS = {
+    "contains": "EXISTS",
+    "ncontains": "NOT EXISTS",
+}
+
+_JSON_PATH_KEY = re.compile(r"^\w+$")
+
+
+def parse_lookup(
+    lookup: str, json_fields: Collection[str] = ()
+) -> tuple[str, list[str], str]:
+    field, *path = lookup.split("__")
+    if path and path[-1] in _OPERATORS:
+        return field, path[:-1], _OPERATORS[path[-1]]
+    if path and path[-1] in _JSON_OPERATORS and field in json_fields:
+        return field, path[:-1], _JSON_OPERATORS[path[-1]]
+    if path and field not in json_fields:
+        raise ValueError(f"Invalid operator: {path[-1]}")
+    return field, path, "="
+
+
+def prepare_json_path(path: list[str]) -> str:
+    for key in path:
+        if not _JSON_PATH_KEY.match(key):
+            raise ValueError(f"Invalid JSON path key: {key}")
+    return "$" + "".join(f"[{key}]" if key.isdigit() else f".{key}" for key in path)
+
+
+def prepare_lookup_expression(
+    lookup: str,
+    json_fields: Collection[str] = (),
+    decimal_fields: Collection[str] = (),
+) -> str:
+    field, path, operator = parse_lookup(lookup, json_fields)
+    if operator != "=":
+        raise ValueError(f"Invalid lookup: {lookup}")
+    return _prepare_column_expression(field, path, decimal_fields)
+
+
+def prepare_lookup_condition(
+    lookup: str,
+    value: Any,
+    json_fields: Collection[str] = (),
+    decimal_fields: Collection[str] = (),
+) -> tuple[str, list]:
+    from .expressions import Expression
+
+    field, path, operator = parse_lookup(lookup, json_fields)
+    if isinstance(value, Expression):
+        if "EXISTS" in operator or "IN" in operator or "BETWEEN" in operator:
+            raise ValueError(f"Expressions can't be used in lookup: {lookup}")
+        column = _prepare_column_expression(field, path, decimal_fields)
+        expression, params = value.compile(json_fields, decimal_fields)
+        return f"{column} {operator} {expression}", params
+    if "EXISTS" in operator:
+        source = (
+            f"json_each({field}, '{prepare_json_path(path)}')"
+            if path
+            else f"json_each({field})"
+        )
+        return f"{operator} (SELECT 1 FROM {source} WHERE value = ?)", [value]
+    column = _prepare_column_expression(field, path)
+    placeholder = "?"
+    if "LIKE" not in operator and (
+        (field in decimal_fields and not path) or is_decimal_value(value)
+    ):
+        column = f"CAST({column} AS NUMERIC)"
+        placeholder = "CAST(? AS NUMERIC)"
+    if "IN" in operator:
+        placeholders = ", ".join([placeholder] * len(value))
+        return f"{column} {operator} ({placeholders})", list(value)
+    if "BETWEEN" in operator:
+        return f"{column} {operator} {placeholder} AND {placeholder}", list(value)
+    return f"{column} {operator} {placeholder}", [value]
+
+
+def is_decimal_value(value: Any) -> bool:
+    """Check if the lookup value is a Decimal or a collection of Decimals, compared as numbers also outside of Decimal fields."""
+    if isinstance(value, (list, tuple, set, frozenset)):
+        return any(isinstance(item, Decimal) for item in value)
+    return isinstance(value, Decimal)
+
+
+def is_multi_value_lookup(lookup: str) -> bool:
+    return lookup.rsplit("__", 1)[-1] in ("in", "nin", "between", "nbetween")
+
+
+def prepare_where_conditions(
+    json_fields: Collection[str], decimal_fields: Collection[str], /, *args, **kwargs
+) -> tuple[str, list]:
     from .query import Q
 
     conditions = []
@@ -96,19 +215,26 @@ def prepare_where_conditions(*args, **kwargs) -> tuple[str, list]:
     for field, value in kwargs.items():
         if field in ("order_by", "limit", "offset"):
             continue
-        field, operator = _extract_field_operator(field)
-        if "IN" in operator:
-            placeholders = ", ".join(["?"] * len(value))
-            conditions.append(f"{field} {operator} ({placeholders})")
-            params.extend(value)
-        elif "BETWEEN" in operator:
-            conditions.append(f"{field} {operator} ? AND ?")
-            params.extend(value)
-        else:
-            conditions.append(f"{field} {operator} ?")
-            params.append(value)
+        condition, condition_params = prepare_lookup_condition(
+            field, value, json_fields, decimal_fields
+        )
+        conditions.append(condition)
+        params.extend(condition_params)
     for arg in args:
-        if isinstance(arg, Q):
-            conditions.append(arg.conditions)
-            params.extend(arg.params)
+        if isinstance(arg, Q) and arg.children:
+            condition, condition_params = arg.compile(
+                json_fields, decimal_fields, Q.AND
+            )
+            conditions.append(condition)
+            params.extend(condition_params)
     return " AND ".join(conditions), params
+
+
+def _prepare_column_expression(
+    field: str, path: list[str], decimal_fields: Collection[str] = ()
+) -> str:
+    if path:
+        return f"json_extract({field}, '{prepare_json_path(path)}')"
+    if field in decimal_fields:
+        return f"CAST({field} AS NUMERIC)"
+    return field
@@ -1,6 +1,7 @@
 from typing import Literal
 
 from pydantic import Field
+from pydantic.json_schema import JsonDict
 
 OnDelateType = Literal["CASCADE", "SET NULL", "SET DEFAULT", "RESTRICT", "NO ACTION"]
 
@@ -10,6 +11,8 @@ def DBField(
     unique: bool = False,
     on_delete: OnDelateType = "CASCADE",
     primary_key: bool = False,
+    version: bool = False,
+    related_name: str | None = None,
     **kwargs,
 ):
     """Custom field function that extends pydantic's Field with additional database-related arguments.
@@ -18,13 +21,20 @@ def DBField(
         default (Any, optional): The default value of the field. Defaults to PydanticUndefined.
         unique (bool, optional): Whether the field should be unique. Defaults to False.
         on_delete (CASCADE | SET NULL | SET DEFAULT | RESTRICT | NO ACTION, optional): The action to take when the referenced object is deleted. Defaults to "CASCADE".
+        version (bool, optional): Whether the field is a version number incremented on every update and checked to detect concurrent changes. Defaults to False.
+        related_name (str, optional): Name of the accessor of referencing objects added to the model of a foreign key. Defaults to the table name with the `_set` suffix.
         other arguments: Any other arguments that pydantic's Field accepts.
     """
-    json_schema_extra = {
+    json_schema_extra: JsonDict = {
         "unique": unique,
         "on_delete": on_delete,
         "primary_key": primary_key,
+        "version": version,
     }
+    if related_name:
+        json_schema_extra["related_name"] = related_name
     if primary_key and "default" not in kwargs:
         kwargs["default"] = None
+    if version and "default" not in kwargs:
+        kwargs["default"] = 0
     return Field(*args, **kwargs, json_schema_extra=json_schema_extra)
@@ -0,0 +1,482 @@
+import hashlib
+import json
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from sqlite3 import Cursor, IntegrityError, OperationalError
+from typing import Any, NamedTuple, Sequence
+
+from pydantic.fields import FieldInfo
+from pydantic_core import PydanticUndefined
+
+from .field_utils import (
+    get_on_delete_action,
+    is_many_to_many_field,
+    is_primary_key_field,
+    is_unique_field,
+    transform_field_annotation_to_sql_type,
+)
+from .table_manager import (
+    get_foreign_key_model,
+    get_intermediate_table_name,
+    prepare_column_definition,
+    prepare_create_table_statement,
+    prepare_default_value,
+    prepare_intermediate_table_statement,
+)
+
+MIGRATIONS_TABLE = "_ormagic_migrations"
+SCHEMA_TABLE = "_ormagic_schema"
+
+
+class Column(NamedTuple):
+    name: str
+    type: str
+    not_null: bool
+    default: str | None
+    primary_key: bool
+    unique: bool
+    references: tuple[str, str, str] | None
+
+
+@dataclass
+class TableMigration:
+    """Changes of one table and the SQL statements applying them."""
+
+    table_name: str
+    changes: list[str]
+    statements: list[str]
+    rows: int = 0
+    rebuild: bool = False
+
+    def __str__(self) -> str:
+        operation = f"rebuild ({self.rows} rows)" if self.rebuild else "alter"
+        return f"{self.table_name}: {operation}: {', '.join(self.changes)}"
+
+
+@dataclass
+class MigrationPlan:
+    """Changes needed to bring the database schema up to date with the models."""
+
+    tables: list[TableMigration] = field(default_factory=list)
+    version: int | None = None
+    dry_run: bool = False
+
+    @property
+    def statements(self) -> list[str]:
+        return [statement for table in self.tables for statement in table.statements]
+
+    @property
+    def rows_touched(self) -> int:
+        return sum(table.rows for table in self.tables)
+
+    def __bool__(self) -> bool:
+        return bool(self.tables)
+
+    def __str__(self) -> str:
+        if not self.tables:
+            return "No changes"
+        return "\n".join(str(table) for table in self.tables)
+
+
+def migrate(
+    *models: Any,
+    renames: dict[str, dict[str, str]] | None = None,
+    dry_run: bool = False,
+) -> MigrationPlan:
+    """Bring the tables of the given models up to date with their definitions in one transaction.
+
+    New tables are created, new columns at the end of a table are added and renamed columns are renamed in place. Any other change, like dropped columns, changed types, constraints or foreign keys, rebuilds the table once with all its changes: a new table is created, rows are copied to it and it replaces the old one. Every applied migration is saved with a new version number in the `_ormagic_migrations` table.
+
+    Args:
+        models (DBModel): Models whose tables should be migrated.
+        renames (dict[str, dict[str, str]], optional): Renamed columns as `{table_name: {old_name: new_name}}`. Without it a renamed field is detected as a dropped and a new column.
+        dry_run (bool, optional): Only plan the migration and report the statements and estimated rows touched without changing the database. Defaults to False.
+    """
+    return _run_migration(models, renames or {}, dry_run)
+
+
+def sync_schema(models: Sequence[Any]) -> MigrationPlan:
+    """Migrate tables of the models, skipped when their schema fingerprint is already saved in the database."""
+    from .pool import read_connection
+
+    fingerprint = get_schema_fingerprint(models)
+    with read_connection() as connection:
+        if _fetch_fingerprint(connection.cursor()) == fingerprint:
+            return MigrationPlan()
+    return _run_migration(sort_models_by_dependencies(models), {}, False, fingerprint)
+
+
+def get_schema_fingerprint(models: Sequence[Any]) -> str:
+    """Return a hash of table definitions, indexes, search indexes and cache triggers of the models."""
+    from .cache import get_dependent_tables
+
+    schema = [
+        [
+            model._get_table_name(),
+            prepare_create_table_statement(model._get_table_name(), model.model_fields),
+            _get_intermediate_table_names(model),
+            model._indexes,
+            model._searchable,
+            get_dependent_tables(model) if model._cache_enabled else (),
+        ]
+        for model in sorted(models, key=lambda model: model._get_table_name())
+    ]
+    return hashlib.sha256(json.dumps(schema).encode()).hexdigest()
+
+
+def sort_models_by_dependencies(models: Sequence[Any]) -> list[Any]:
+    """Sort models so that models referenced by foreign keys come before the models referencing them."""
+    models_by_table = {model._get_table_name(): model for model in models}
+    sorted_models: dict[str, Any] = {}
+    visiting: set[str] = set()
+
+    def visit(model: Any) -> None:
+        table_name = model._get_table_name()
+        if table_name in sorted_models or table_name in visiting:
+            return
+        visiting.add(table_name)
+        for field_info in model.model_fields.values():
+            foreign_model = get_foreign_key_model(field_info.annotation)
+            if foreign_model and foreign_model.__name__.lower() in models_by_table:
+                visit(models_by_table[foreign_model.__name__.lower()])
+        sorted_models[table_name] = model
+
+    for model in models_by_table.values():
+        visit(model)
+    return list(sorted_models.values())
+
+
+def _run_migration(
+    models: Sequence[Any],
+    renames: dict[str, dict[str, str]],
+    dry_run: bool,
+    fingerprint: str | None = None,
+) -> MigrationPlan:
+    from .cache import invalidate_tables
+    from .change_tracking import record_table_change
+    from .pool import write_connection
+    from .search import drop_search_index
+    from .transactions import transaction
+
+    if transaction.is_active():
+        raise RuntimeError("Migrations can't run inside a transaction")
+    with write_connection() as connection:
+        cursor = connection.cursor()
+        if dry_run:
+            return MigrationPlan(_plan_tables(cursor, models, renames), None, True)
+        cursor.execute("PRAGMA foreign_keys = OFF")
+        try:
+            cursor.execute("BEGIN IMMEDIATE")
+            try:
+                plan = MigrationPlan(_plan_tables(cursor, models, renames))
+                for table in plan.tables:
+                    if table.rebuild:
+                        drop_search_index(cursor, table.table_name)
+                    for statement in table.statements:
+                        cursor.execute(statement)
+                migrated_tables = {table.table_name for table in plan.tables}
+                for model in models:
+                    model._install_table_extras(cursor)
+                    if (
+                        model._cache_enabled
+                        and model._get_table_name() in migrated_tables
+                    ):
+                        record_table_change(cursor, model._get_table_name())
+                _check_foreign_keys(cursor)
+                if plan:
+                    plan.version = _save_migration(cursor, plan)
+                if fingerprint:
+                    _save_fingerprint(cursor, fingerprint)
+                else:
+                    clear_schema_fingerprint(cursor)
+                cursor.execute("COMMIT")
+            except BaseException:
+                cursor.execute("ROLLBACK")
+                raise
+        finally:
+            cursor.execute("PRAGMA foreign_keys = ON")
+        invalidate_tables(connection, *(table.table_name for table in plan.tables))
+    return plan
+
+
+def clear_schema_fingerprint(cursor: Cursor) -> None:
+    """Remove the saved schema fingerprint, so that the next `sync_all` checks all tables again."""
+    try:
+        cursor.execute(f"DELETE FROM {SCHEMA_TABLE}")
+    except OperationalError:
+        pass
+
+
+def get_model_columns(model: Any) -> list[Column]:
+    return [
+        _get_field_column(field_name, field_info)
+        for field_name, field_info in model.model_fields.items()
+        if not is_many_to_many_field(field_info.annotation)
+    ]
+
+
+def fetch_table_columns(cursor: Cursor, table_name: str) -> list[Column]:
+    cursor.execute(f"PRAGMA table_info({table_name})")
+    table_info = cursor.fetchall()
+    if not table_info:
+        return []
+    cursor.execute(f"PRAGMA foreign_key_list({table_name})")
+    references = {
+        row[3]: (row[2], row[4], row[6]) for row in cursor.fetchall() if row[1] == 0
+    }
+    unique_columns = _fetch_unique_columns(cursor, table_name)
+    return [
+        Column(
+            name,
+            column_type.upper(),
+            bool(not_null),
+            default,
+            bool(primary_key),
+            name in unique_columns,
+            references.get(name),
+        )
+        for _, name, column_type, not_null, default, primary_key in table_info
+    ]
+
+
+def _plan_tables(
+    cursor: Cursor, models: Sequence[Any], renames: dict[str, dict[str, str]]
+) -> list[TableMigration]:
+    tables = []
+    intermediate_tables: set[frozenset[str]] = set()
+    for model in models:
+        if table := _plan_table(
+            cursor,
+            model,
+            renames.get(model._get_table_name(), {}),
+            intermediate_tables,
+        ):
+            tables.append(table)
+    return tables
+
+
+def _plan_table(
+    cursor: Cursor,
+    model: Any,
+    renames: dict[str, str],
+    planned_intermediate_tables: set[frozenset[str]],
+) -> TableMigration | None:
+    table_name = model._get_table_name()
+    intermediate_tables = _plan_intermediate_tables(
+        cursor, model, planned_intermediate_tables
+    )
+    existing_columns = fetch_table_columns(cursor, table_name)
+    if not existing_columns:
+        statements = [prepare_create_table_statement(table_name, model.model_fields)]
+        return TableMigration(
+            table_name, ["create table"], intermediate_tables + statements
+        )
+    renames = {
+        old_name: new_name
+        for old_name, new_name in renames.items()
+        if any(column.name == old_name for column in existing_columns)
+    }
+    existing = {
+        renames.get(column.name, column.name): column._replace(
+            name=renames.get(column.name, column.name)
+        )
+        for column in existing_columns
+    }
+    columns = get_model_columns(model)
+    added = [column for column in columns if column.name not in existing]
+    dropped = [name for name in existing if name not in {c.name for c in columns}]
+    changed = [
+        column.name
+        for column in columns
+        if column.name in existing and existing[column.name] != column
+    ]
+    changes = [
+        *(f"rename column {old} to {new}" for old, new in renames.items()),
+        *(f"add column {column.name}" for column in added),
+        *(f"drop column {name}" for name in dropped),
+        *(f"change column {name}" for name in changed),
+    ]
+    if not changes and list(existing) != [column.name for column in columns]:
+        changes.append("reorder columns")
+    if intermediate_tables:
+        changes.append("create intermediate tables")
+    if not changes:
+        return None
+    if _can_alter(list(existing), columns, added, dropped, changed):
+        statements = [
+            *(
+                f"ALTER TABLE {table_name} RENAME COLUMN {old} TO {new}"
+                for old, new in renames.items()
+            ),
+            *(
+                f"ALTER TABLE {table_name} ADD COLUMN "
+                f"{prepare_column_definition(column.name, model.model_fields[column.name])}"
+                for column in added
+            ),
+        ]
+        return TableMigration(table_name, changes, intermediate_tables + statements)
+    rows = _count_rows(cursor, table_name)
+    for column in added:
+        if rows and column.not_null and column.default is None:
+            raise ValueError(
+                f"Can't add required column {column.name} without a default value to table {table_name} with rows"
+            )
+    statements = _prepare_rebuild_statements(model, columns, existing, renames)
+    return TableMigration(
+        table_name, changes, intermediate_tables + statements, rows, True
+    )
+
+
+def _plan_intermediate_tables(
+    cursor: Cursor, model: Any, planned: set[frozenset[str]]
+) -> list[str]:
+    statements = []
+    table_name = model._get_table_name()
+    for field_info in model.model_fields.values():
+        if not is_many_to_many_field(field_info.annotation):
+            continue
+        related_model = getattr(field_info.annotation, "__args__")[0]
+        related_table_name = related_model._get_table_name()
+        if frozenset((table_name, related_table_name)) in planned:
+            continue
+        planned.add(frozenset((table_name, related_table_name)))
+        if get_intermediate_table_name(cursor, table_name, related_table_name):
+            continue
+        statements.append(
+            prepare_intermediate_table_statement(
+                table_name,
+                model._get_primary_key_field_name(),
+                related_table_name,
+                related_model._get_primary_key_field_name(),
+            )
+        )
+    return statements
+
+
+def _can_alter(
+    existing_names: list[str],
+    columns: list[Column],
+    added: list[Column],
+    dropped: list[str],
+    changed: list[str],
+) -> bool:
+    if dropped or changed:
+        return False
+    if [column.name for column in columns[: len(existing_names)]] != existing_names:
+        return False
+    return all(
+        not column.primary_key
+        and not column.unique
+        and not column.references
+        and not (column.not_null and column.default is None)
+        for column in added
+    )
+
+
+def _prepare_rebuild_statements(
+    model: Any, columns: list[Column], existing: dict[str, Column], renames: dict
+) -> list[str]:
+    table_name = model._get_table_name()
+    new_table_name = f"_ormagic_new_{table_name}"
+    sources = {new_name: old_name for old_name, new_name in renames.items()}
+    copied = [column.name for column in columns if column.name in existing]
+    targets = ", ".join(copied)
+    values = ", ".join(sources.get(name, name) for name in copied)
+    return [
+        prepare_create_table_statement(new_table_name, model.model_fields),
+        f"INSERT INTO {new_table_name} ({targets}) SELECT {values} FROM {table_name}",
+        f"DROP TABLE {table_name}",
+        f"ALTER TABLE {new_table_name} RENAME TO {table_name}",
+    ]
+
+
+def _get_intermediate_table_names(model: Any) -> list[str]:
+    return sorted(
+        getattr(field_info.annotation, "__args__")[0]._get_table_name()
+        for field_info in model.model_fields.values()
+        if is_many_to_many_field(field_info.annotation)
+    )
+
+
+def _get_field_column(field_name: str, field_info: FieldInfo) -> Column:
+    references = None
+    if foreign_model := get_foreign_key_model(field_info.annotation):
+        references = (
+            foreign_model.__name__.lower(),
+            foreign_model._get_primary_key_field_name(),
+            get_on_delete_action(field_info),
+        )
+    default = None
+    if field_info.default not in (PydanticUndefined, None):
+        default = prepare_default_value(field_info.default)
+    return Column(
+        field_name,
+        transform_field_annotation_to_sql_type(field_info.annotation),
+        field_info.is_required(),
+        default,
+        is_primary_key_field(field_info),
+        is_unique_field(field_info),
+        references,
+    )
+
+
+def _fetch_unique_columns(cursor: Cursor, table_name: str) -> set[str]:
+    cursor.execute(f"PRAGMA index_list({table_name})")
+    unique_columns = set()
+    for _, index_name, unique, origin, _ in cursor.fetchall():
+        if not unique or origin != "u":
+            continue
+        cursor.execute(f"PRAGMA index_info({index_name})")
+        if len(index_columns := cursor.fetchall()) == 1:
+            unique_columns.add(index_columns[0][2])
+    return unique_columns
+
+
+def _count_rows(cursor: Cursor, table_name: str) -> int:
+    cursor.execute(f"SELECT count(*) FROM {table_name}")
+    return cursor.fetchone()[0]
+
+
+def _check_foreign_keys(cursor: Cursor) -> None:
+    cursor.execute("PRAGMA foreign_key_check")
+    if violations := cursor.fetchall():
+        raise IntegrityError(
+            f"Migration violates foreign key constraints in tables: {', '.join(sorted({row[0] for row in violations}))}"
+        )
+
+
+def _save_migration(cursor: Cursor, plan: MigrationPlan) -> int:
+    cursor.execute(
+        f"CREATE TABLE IF NOT EXISTS {MIGRATIONS_TABLE} ("
+        "version INTEGER PRIMARY KEY, applied_at TEXT NOT NULL, "
+        "changes TEXT NOT NULL, statements TEXT NOT NULL)"
+    )
+    cursor.execute(
+        f"INSERT INTO {MIGRATIONS_TABLE} (applied_at, changes, statements) VALUES (?, ?, ?)",
+        (
+            datetime.now(timezone.utc).isoformat(sep=" ", timespec="microseconds"),
+            json.dumps([str(table) for table in plan.tables]),
+            json.dumps(plan.statements),
+        ),
+    )
+    return cursor.lastrowid or 0
+
+
+def _fetch_fingerprint(cursor: Cursor) -> str | None:
+    try:
+        cursor.execute(f"SELECT fingerprint FROM {SCHEMA_TABLE}")
+    except OperationalError:
+        return None
+    row = cursor.fetchone()
+    return row[0] if row else None
+
+
+def _save_fingerprint(cursor: Cursor, fingerprint: str) -> None:
+    cursor.execute(
+        f"CREATE TABLE IF NOT EXISTS {SCHEMA_TABLE} ("
+        "id INTEGER PRIMARY KEY CHECK (id = 1), fingerprint TEXT NOT NULL)"
+    )
+    cursor.execute(
+        f"INSERT OR REPLACE INTO {SCHEMA_TABLE} (id, fingerprint) VALUES (1, ?)",
+        (fingerprint,),
+    )
@@ -1,30 +1,83 @@
+from concurrent.futures import Future
+from os import PathLike
 from sqlite3 import Cursor
-from typing import Any, Self
+from typing import Any, ClassVar, Self, Sequence
 
 from pydantic import BaseModel
 
 from ormagic import DBField
 
-from .cursor import get_cursor
+from .adapters import (
+    get_decimal_fields,
+    get_json_fields,
+    get_read_adapters,
+    to_db_value,
+)
+from .cache import cached_query, get_dependent_tables, invalidate_tables
+from .change_tracking import install_change_triggers, record_table_change
+from .cursor import get_cursor, get_read_cursor
+from .data_transfer import Format, export_rows, import_rows
+from .expressions import Expression, OrderBy
 from .field_utils import (
+    get_related_name,
     is_many_to_many_field,
     is_primary_key_field,
-    prepare_where_conditions,
+    is_unique_field,
+    is_version_field,
+    unwrap_optional,
+)
+from .migrations import MigrationPlan, clear_schema_fingerprint, sync_schema
+from .n_plus_one import track_relation
+from .pagination import (
+    Page,
+    encode_cursor,
+    prepare_keyset_condition,
+    prepare_order_by,
+    prepare_sort_fields,
 )
+from .queryset import QuerySet
+from .relations import add_reverse_relation
+from .search import drop_search_index, install_search_index, prepare_search_select
+from .statement_cache import prepare_query
 from .table_manager import (
+    create_indexes,
     create_table,
     get_foreign_key_model,
     get_intermediate_table_name,
     update_table,
 )
+from .workers import run_in_worker
+from .writer import queued_write, submit_write
 
 
 class ObjectNotFound(Exception):
     pass
 
 
+class ConflictError(Exception):
+    pass
+
+
 class DBModel(BaseModel):
     id: int | None = DBField(primary_key=True)
+    _cache_enabled: ClassVar[bool] = False
+    _indexes: ClassVar[tuple[tuple[str, ...], ...]] = ()
+    _searchable: ClassVar[tuple[str, ...]] = ()
+    _version_field: ClassVar[str | None] = None
+
+    def __init_subclass__(
+        cls,
+        cache: bool = False,
+        indexes: Sequence[str | tuple[str, ...]] = (),
+        searchable: Sequence[str] = (),
+        **kwargs: Any,
+    ) -> None:
+        super().__init_subclass__(**kwargs)
+        cls._cache_enabled = cache
+        cls._indexes = tuple(
+            (index,) if isinstance(index, str) else tuple(index) for index in indexes
+        )
+        cls._searchable = tuple(searchable)
 
     @classmethod
     def __pydantic_init_subclass__(cls, **kwargs: Any) -> None:
@@ -33,8 +86,42 @@ class DBModel(BaseModel):
             if is_primary_key_field(field_info) and field_name != "id":
                 cls.model_fields.pop("id")
                 break
+        version_fields = [
+            field_name
+            for field_name, field_info in cls.model_fields.items()
+            if is_version_field(field_info)
+        ]
+        if len(version_fields) > 1:
+            raise ValueError(f"Model {cls.__name__} can have only one version field")
+        for field_name in version_fields:
+            if cls.model_fields[field_name].annotation is not int:
+                raise ValueError(f"Version field must be an integer: {field_name}")
+        cls._version_field = version_fields[0] if version_fields else None
+        for field_name, field_info in cls.model_fields.items():
+            if is_many_to_many_field(field_info.annotation) or not (
+                foreign_model := get_foreign_key_model(field_info.annotation)
+            ):
+                continue
+            add_reverse_relation(
+                foreign_model,
+                cls,
+                field_name,
+                get_related_name(field_info) or f"{cls._get_table_name()}_set",
+            )
+            if not is_unique_field(field_info) and not any(
+                index[0] == field_name for index in cls._indexes
+            ):
+                cls._indexes = (*cls._indexes, (field_name,))
+        for field_name in cls._searchable:
+            searchable_field = cls.model_fields.get(field_name)
+            if (
+                not searchable_field
+                or unwrap_optional(searchable_field.annotation) is not str
+            ):
+                raise ValueError(f"Only text fields can be searchable: {field_name}")
 
     @classmethod
+    @queued_write
     def create_table(cls) -> None:
         """Create a table in the database for the model."""
         with get_cursor() as cursor:
@@ -44,8 +131,12 @@ class DBModel(BaseModel):
                 cls._get_primary_key_field_name(),
                 cls.model_fields,
             )
+            cls._install_table_extras(cursor)
+            clear_schema_fingerprint(cursor)
+            invalidate_tables(cursor.connection, cls._get_table_name())
 
     @classmethod
+    @queued_write
     def update_table(cls) -> None:
         """Update the table in the database based on the model definition."""
         with get_cursor() as cursor:
@@ -55,13 +146,34 @@ class DBModel(BaseModel):
                 cls._get_primary_key_field_name(),
                 cls.model_fields,
             )
+            cls._install_table_extras(cursor)
+            if cls._cache_enabled:
+                record_table_change(cursor, cls._get_table_name())
+            clear_schema_fingerprint(cursor)
+            invalidate_tables(cursor.connection, cls._get_table_name())
 
     @classmethod
+    @queued_write
     def drop_table(cls) -> None:
         """Remove the table from the database."""
         with get_cursor() as cursor:
+            drop_search_index(cursor, cls._get_table_name())
             cursor.execute(f"DROP TABLE IF EXISTS {cls._get_table_name()}")
+            if cls._cache_enabled:
+                record_table_change(cursor, cls._get_table_name())
+            clear_schema_fingerprint(cursor)
+            invalidate_tables(cursor.connection, cls._get_table_name())
 
+    @classmethod
+    def sync_all(cls, *models: type["DBModel"]) -> MigrationPlan:
+        """Create and migrate tables of all models in one transaction, skipped when no model changed since the last sync.
+
+        Args:
+            models (DBModel, optional): Models to synchronize. Defaults to all subclasses of the model.
+        """
+        return sync_schema(models or cls._get_subclasses())
+
+    @queued_write
     def save(self) -> Self:
         """Save object to the database."""
         with get_cursor() as cursor:
@@ -74,58 +186,258 @@ class DBModel(BaseModel):
     @classmethod
     def get(cls, *args, **kwargs) -> Self:
         """Get an object from the database based on the given keyword arguments."""
-        with get_cursor() as cursor:
-            return cls(**cls._fetchone_raw_data(cursor, *args, **kwargs))
+        query, params = cls._prepare_query_to_fetch_raw_data(*args, **kwargs)
+        return cached_query(
+            cls, "get", query, params, lambda: cls._load_one(query, params)
+        )
 
     @classmethod
     def filter(cls, *args, **kwargs) -> list[Self]:
         """Get objects from the database based on the given keyword arguments."""
-        with get_cursor() as cursor:
-            return [
-                cls(**data) for data in cls._fetchall_raw_data(cursor, *args, **kwargs)
-            ]
+        query, params = cls._prepare_query_to_fetch_raw_data(*args, **kwargs)
+        return cached_query(
+            cls, "filter", query, params, lambda: cls._load_all(query, params)
+        )
+
+    @classmethod
+    def query(cls, *args, **kwargs) -> "QuerySet[Self]":
+        """Get a lazy query of objects based on the given keyword arguments."""
+        return QuerySet(cls, *args, **kwargs)
 
     @classmethod
     def all(cls, *args, **kwargs) -> list[Self]:
         """Get all objects from the database."""
-        with get_cursor() as cursor:
-            return [
-                cls(**data) for data in cls._fetchall_raw_data(cursor, *args, **kwargs)
-            ]
+        query, params = cls._prepare_query_to_fetch_raw_data(*args, **kwargs)
+        return cached_query(
+            cls, "filter", query, params, lambda: cls._load_all(query, params)
+        )
 
+    @classmethod
+    def paginate(
+        cls,
+        *args,
+        after: str | None = None,
+        order_by: str | list[str] | None = None,
+        page_size: int = 50,
+        **kwargs,
+    ) -> Page[Self]:
+        """Get a page of objects matching the given keyword arguments, starting after the cursor of the previous page."""
+        if page_size < 1:
+            raise ValueError("Page size must be greater than 0")
+        fields, descending = prepare_sort_fields(
+            order_by, cls._get_primary_key_field_name()
+        )
+        if after:
+            nullable = tuple(
+                (field_info := cls.model_fields.get(field)) is not None
+                and not is_primary_key_field(field_info)
+                and unwrap_optional(field_info.annotation) is not field_info.annotation
+                for field in fields
+            )
+            args = (
+                *args,
+                prepare_keyset_condition(fields, descending, after, nullable),
+            )
+        items = cls.filter(
+            *args,
+            order_by=prepare_order_by(fields, descending),
+            limit=page_size + 1,
+            **kwargs,
+        )
+        if len(items) <= page_size:
+            return Page(items, None)
+        items = items[:page_size]
+        return Page(items, encode_cursor(fields, descending, items[-1]))
+
+    @classmethod
+    def search(cls, query: str, *args, rank: bool = True, **kwargs) -> list[Self]:
+        """Get objects matching the full-text search query, the best matches first when `rank` is True."""
+        if not cls._searchable:
+            raise ValueError(f"Model {cls.__name__} has no searchable fields")
+        if rank:
+            kwargs.setdefault("order_by", "_search_rank")
+        sql, params = prepare_query(
+            cls, prepare_search_select(cls._get_table_name()), *args, **kwargs
+        )
+        params = [query, *params]
+        return cached_query(
+            cls, "search", sql, params, lambda: cls._load_all(sql, params)
+        )
+
+    @classmethod
+    def count(cls, *args, **kwargs) -> int:
+        """Count objects in the database matching the given keyword arguments."""
+        query, params = prepare_query(
+            cls,
+            f"SELECT count(*) FROM {cls._get_table_name()}",
+            *args,
+            **kwargs,
+        )
+        return cached_query(
+            cls, "count", query, params, lambda: cls._load_count(query, params)
+        )
+
+    @classmethod
+    def export(
+        cls,
+        path: str | PathLike,
+        *args,
+        format: Format = "jsonl",
+        batch_size: int = 1000,
+        **kwargs,
+    ) -> int:
+        """Stream objects matching the given keyword arguments to a JSON Lines or CSV file and return their number."""
+        return export_rows(cls, path, format, batch_size, *args, **kwargs)
+
+    @classmethod
+    def import_(
+        cls, path: str | PathLike, format: Format = "jsonl", batch_size: int = 1000
+    ) -> int:
+        """Validate and insert objects from a JSON Lines or CSV file in batches and return their number."""
+        return import_rows(cls, path, format, batch_size)
+
+    @queued_write
     def delete(self) -> None:
         """Delete the object from the database."""
         with get_cursor() as cursor:
             cursor.execute(
                 f"DELETE FROM {self._get_table_name()} WHERE {self._get_primary_key_field_name()}={self.model_id}"
             )
+            invalidate_tables(cursor.connection, self._get_table_name())
         if cursor.rowcount == 0:
             raise ObjectNotFound
 
+    def submit_save(self) -> "Future[Self]":
+        """Save object to the database in the writer thread and return a future with the saved object."""
+        return submit_write(self.save)
+
+    def submit_delete(self) -> "Future[None]":
+        """Delete the object from the database in the writer thread and return a future."""
+        return submit_write(self.delete)
+
+    @classmethod
+    async def acreate_table(cls) -> None:
+        """Asynchronous version of `create_table` running in a worker thread."""
+        await run_in_worker(cls.create_table)
+
+    @classmethod
+    async def aupdate_table(cls) -> None:
+        """Asynchronous version of `update_table` running in a worker thread."""
+        await run_in_worker(cls.update_table)
+
+    @classmethod
+    async def adrop_table(cls) -> None:
+        """Asynchronous version of `drop_table` running in a worker thread."""
+        await run_in_worker(cls.drop_table)
+
+    async def asave(self) -> Self:
+        """Asynchronous version of `save` running in a worker thread."""
+        return await run_in_worker(self.save)
+
+    @classmethod
+    async def aget(cls, *args, **kwargs) -> Self:
+        """Asynchronous version of `get` running in a worker thread."""
+        return await run_in_worker(cls.get, *args, **kwargs)
+
+    @classmethod
+    async def afilter(cls, *args, **kwargs) -> list[Self]:
+        """Asynchronous version of `filter` running in a worker thread."""
+        return await run_in_worker(cls.filter, *args, **kwargs)
+
+    @classmethod
+    async def aall(cls, *args, **kwargs) -> list[Self]:
+        """Asynchronous version of `all` running in a worker thread."""
+        return await run_in_worker(cls.all, *args, **kwargs)
+
+    @classmethod
+    async def apaginate(cls, *args, **kwargs) -> Page[Self]:
+        """Asynchronous version of `paginate` running in a worker thread."""
+        return await run_in_worker(cls.paginate, *args, **kwargs)
+
+    @classmethod
+    async def asearch(cls, query: str, *args, **kwargs) -> list[Self]:
+        """Asynchronous version of `search` running in a worker thread."""
+        return await run_in_worker(cls.search, query, *args, **kwargs)
+
+    @classmethod
+    async def acount(cls, *args, **kwargs) -> int:
+        """Asynchronous version of `count` running in a worker thread."""
+        return await run_in_worker(cls.count, *args, **kwargs)
+
+    @classmethod
+    async def aexport(cls, path: str | PathLike, *args, **kwargs) -> int:
+        """Asynchronous version of `export` running in a worker thread."""
+        return await run_in_worker(cls.export, path, *args, **kwargs)
+
+    @classmethod
+    async def aimport_(cls, path: str | PathLike, *args, **kwargs) -> int:
+        """Asynchronous version of `import_` running in a worker thread."""
+        return await run_in_worker(cls.import_, path, *args, **kwargs)
+
+    async def adelete(self) -> None:
+        """Asynchronous version of `delete` running in a worker thread."""
+        await run_in_worker(self.delete)
+
+    @classmethod
+    def _get_subclasses(cls) -> list[type["DBModel"]]:
+        subclasses: dict[str, type[DBModel]] = {}
+        for subclass in cls.__subclasses__():
+            subclasses[subclass._get_table_name()] = subclass
+            for nested_subclass in subclass._get_subclasses():
+                subclasses[nested_subclass._get_table_name()] = nested_subclass
+        return list(subclasses.values())
+
+    @classmethod
+    def _install_table_extras(cls, cursor: Cursor) -> None:
+        create_indexes(
+            cursor,
+            cls._get_table_name(),
+            cls._indexes,
+            get_json_fields(cls),
+            get_decimal_fields(cls),
+        )
+        if cls._searchable:
+            install_search_index(cursor, cls._get_table_name(), cls._searchable)
+        if cls._cache_enabled:
+            install_change_triggers(cursor, *get_dependent_tables(cls))
+
     def _insert(self, cursor: Cursor) -> Self:
         prepared_data = self._prepare_data_to_insert()
         fields = ", ".join(prepared_data.keys())
-        values = ", ".join(
-            f"'{value}'" if value else "NULL" for value in prepared_data.values()
-        )
+        placeholders = ", ".join(["?"] * len(prepared_data))
         cursor.execute(
-            f"INSERT INTO {self._get_table_name()} ({fields}) VALUES ({values})"
+            f"INSERT INTO {self._get_table_name()} ({fields}) VALUES ({placeholders})",
+            [to_db_value(value) for value in prepared_data.values()],
         )
         setattr(self, self._get_primary_key_field_name(), cursor.lastrowid)
         self._update_many_to_many_intermediate_table(cursor)
+        invalidate_tables(cursor.connection, self._get_table_name())
         return self
 
     def _update(self, cursor: Cursor) -> Self:
         prepared_data = self._prepare_data_to_insert()
         prepared_data.pop(self._get_primary_key_field_name())
-        fields = ", ".join(
-            f"{field}='{value}'" if value else f"{field}=NULL"
-            for field, value in prepared_data.items()
-        )
+        if version_field := self._version_field:
+            version = prepared_data.pop(version_field)
+        fields = [f"{field}=?" for field in prepared_data.keys()]
+        conditions = f"{self._get_primary_key_field_name()}=?"
+        params = [*map(to_db_value, prepared_data.values()), self.model_id]
+        if version_field:
+            fields.append(f"{version_field}={version_field} + 1")
+            conditions += f" AND {version_field}=?"
+            params.append(version)
         cursor.execute(
-            f"UPDATE {self._get_table_name()} SET {fields} WHERE {self._get_primary_key_field_name()}={self.model_id}"
+            f"UPDATE {self._get_table_name()} SET {', '.join(fields)} WHERE {conditions}",
+            params,
         )
+        if version_field:
+            if cursor.rowcount == 0:
+                raise ConflictError(
+                    f"{self.__class__.__name__} {self.model_id} was changed by someone else since version {version}"
+                )
+            setattr(self, version_field, version + 1)
         self._update_many_to_many_intermediate_table(cursor)
+        invalidate_tables(cursor.connection, self._get_table_name())
         return self
 
     def _update_many_to_many_intermediate_table(self, cursor: Cursor) -> None:
@@ -140,6 +452,10 @@ class DBModel(BaseModel):
         intermediate_table_name = get_intermediate_table_name(
             cursor, table_name, related_table_name
         )
+        if intermediate_table_name is None:
+            raise ValueError(
+                f"Table of the relation between {table_name} and {related_table_name} doesn't exist"
+            )
         cursor.execute(
             f"DELETE FROM {intermediate_table_name} WHERE {table_name}_id={self.model_id}"
         )
@@ -149,6 +465,7 @@ class DBModel(BaseModel):
             cursor.execute(
                 f"INSERT INTO {intermediate_table_name} ({table_name}_id, {related_table_name}_id) VALUES ({self.model_id}, {related_object.model_id})"
             )
+        invalidate_tables(cursor.connection, intermediate_table_name)
 
     def _prepare_data_to_insert(self) -> dict[str, Any]:
         prepared_data = {}
@@ -188,26 +505,26 @@ class DBModel(BaseModel):
 
     @classmethod
     def _prepare_order_by(
-        cls, order_by: str | list[str] | tuple[str] | set[str]
+        cls, order_by: str | Expression | OrderBy | list | tuple | set
     ) -> str:
         if isinstance(order_by, (list, tuple, set)):
             return ", ".join(cls._prepare_order_by(field) for field in order_by)
-        return f"{order_by[1:]} DESC" if order_by.startswith("-") else order_by
+        if isinstance(order_by, (Expression, OrderBy)):
+            return order_by.compile(get_json_fields(cls), get_decimal_fields(cls))[0]
+        descending = order_by.startswith("-")
+        field_name = order_by[1:] if descending else order_by
+        if field_name in get_decimal_fields(cls):
+            field_name = f"CAST({field_name} AS NUMERIC)"
+        return f"{field_name} DESC" if descending else field_name
 
     @classmethod
     def _prepare_query_to_fetch_raw_data(cls, *args, **kwargs) -> tuple[str, list]:
-        sql = f"SELECT * FROM {cls._get_table_name()}"
-        where_conditions, where_params = prepare_where_conditions(*args, **kwargs)
-        if where_conditions:
-            sql += f" WHERE {where_conditions}"
-        if order_by := kwargs.get("order_by"):
-            order_by = cls._prepare_order_by(order_by)
-            sql += f" ORDER BY {order_by}"
-        if limit := kwargs.get("limit"):
-            sql += f" LIMIT {limit}"
-        if offset := kwargs.get("offset"):
-            sql += f" OFFSET {offset}"
-        return sql, where_params
+        return prepare_query(
+            cls,
+            f"SELECT * FROM {cls._get_table_name()}",
+            *args,
+            **kwargs,
+        )
 
     @classmethod
     def _process_many_to_many_data(
@@ -232,24 +549,35 @@ class DBModel(BaseModel):
 
     @classmethod
     def _process_raw_data(
-        cls, cursor: Cursor, data: tuple, is_recursive_call: bool = False
+        cls,
+        cursor: Cursor,
+        data: tuple,
+        is_recursive_call: bool = False,
+        known: dict[str, dict[Any, "DBModel"]] | None = None,
     ) -> dict[str, Any]:
         data_dict = dict(zip(cls.model_fields.keys(), data))
+        for key, adapter in get_read_adapters(cls).items():
+            if data_dict[key] is not None:
+                data_dict[key] = adapter(data_dict[key])
         for key, field_info in cls.model_fields.items():
             if is_many_to_many_field(field_info.annotation):
                 if is_recursive_call:
                     continue
-                data_dict[key] = cls._process_many_to_many_data(
-                    cursor,
-                    field_info.annotation,
-                    data_dict[cls._get_primary_key_field_name()],
-                )
+                with track_relation(cls.__name__, key):
+                    data_dict[key] = cls._process_many_to_many_data(
+                        cursor,
+                        field_info.annotation,
+                        data_dict[cls._get_primary_key_field_name()],
+                    )
             elif not data_dict[key]:
                 continue
+            elif known and key in known:
+                data_dict[key] = known[key][data_dict[key]]
             elif foreign_model := get_foreign_key_model(field_info.annotation):
-                data_dict[key] = foreign_model._fetchone_raw_data(
-                    cursor, model_id=data_dict[key]
-                )
+                with track_relation(cls.__name__, key):
+                    data_dict[key] = foreign_model._fetchone_raw_data(
+                        cursor, model_id=data_dict[key]
+                    )
         return data_dict
 
     @classmethod
@@ -264,6 +592,19 @@ class DBModel(BaseModel):
         if model_id:
             kwargs[cls._get_primary_key_field_name()] = model_id
         query, params = cls._prepare_query_to_fetch_raw_data(*args, **kwargs)
+        return cls._execute_fetchone(cursor, query, params, is_recursive_call)
+
+    @classmethod
+    def _fetchall_raw_data(
+        cls, cursor: Cursor, *args, **kwargs
+    ) -> list[dict[str, Any]]:
+        query, params = cls._prepare_query_to_fetch_raw_data(*args, **kwargs)
+        return cls._execute_fetchall(cursor, query, params)
+
+    @classmethod
+    def _execute_fetchone(
+        cls, cursor: Cursor, query: str, params: list, is_recursive_call: bool = False
+    ) -> dict[str, Any]:
         cursor.execute(query, params)
         if data := cursor.fetchone():
             return cls._process_raw_data(cursor, data, is_recursive_call)
@@ -271,14 +612,43 @@ class DBModel(BaseModel):
             raise ObjectNotFound
 
     @classmethod
-    def _fetchall_raw_data(
-        cls, cursor: Cursor, *args, **kwargs
+    def _execute_fetchall(
+        cls, cursor: Cursor, query: str, params: list
     ) -> list[dict[str, Any]]:
-        query, params = cls._prepare_query_to_fetch_raw_data(*args, **kwargs)
         cursor.execute(query, params)
         data_list = cursor.fetchall()
         return [cls._process_raw_data(cursor, data) for data in data_list]
 
+    @classmethod
+    def _load_one(cls, query: str, params: list) -> Self:
+        with get_read_cursor() as cursor:
+            return cls(**cls._execute_fetchone(cursor, query, params))
+
+    @classmethod
+    def _load_all(cls, query: str, params: list) -> list[Self]:
+        with get_read_cursor() as cursor:
+            return [
+                cls(**data) for data in cls._execute_fetchall(cursor, query, params)
+            ]
+
+    @classmethod
+    def _load_referencing(
+        cls, field_name: str, objects: dict[Any, "DBModel"], *args, **kwargs
+    ) -> list[Self]:
+        query, params = cls._prepare_query_to_fetch_raw_data(*args, **kwargs)
+        with get_read_cursor() as cursor:
+            cursor.execute(query, params)
+            return [
+                cls(**cls._process_raw_data(cursor, data, known={field_name: objects}))
+                for data in cursor.fetchall()
+            ]
+
+    @classmethod
+    def _load_count(cls, query: str, params: list) -> int:
+        with get_read_cursor() as cursor:
+            cursor.execute(query, params)
+            return cursor.fetchone()[0]
+
     @classmethod
     def _get_table_name(cls) -> str:
         return cls.__name__.lower()
@@ -0,0 +1,109 @@
+import re
+import warnings
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from sqlite3 import Connection
+from typing import Any, Generator
+
+_detector: ContextVar["detect_n_plus_one | None"] = ContextVar(
+    "n_plus_one_detector", default=None
+)
+_relation: ContextVar[tuple[str, str] | None] = ContextVar(
+    "n_plus_one_relation", default=None
+)
+
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL = re.compile(r"(?<![\w.])-?\d+(?:\.\d+)?(?![\w.])")
+_IN_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)*\s*\)")
+_WHITESPACE = re.compile(r"\s+")
+
+
+class NPlusOneWarning(UserWarning):
+    pass
+
+
+class NPlusOneError(Exception):
+    pass
+
+
+@dataclass(frozen=True)
+class RepeatedQuery:
+    shape: str
+    count: int
+    model: str | None
+    field: str | None
+
+    def __str__(self) -> str:
+        source = f" while loading {self.model}.{self.field}" if self.model else ""
+        return f"Query executed {self.count} times{source}: {self.shape}"
+
+
+class detect_n_plus_one:
+    """Context manager that groups executed statements by their shape and reports
+    shapes repeated more than `threshold` times.
+
+    Args:
+        threshold (int, optional): How many times a shape may repeat before it is reported. Defaults to 10.
+        raise_error (bool, optional): Raise NPlusOneError instead of emitting NPlusOneWarning. Defaults to False.
+    """
+
+    def __init__(self, threshold: int = 10, raise_error: bool = False) -> None:
+        self.threshold = threshold
+        self.raise_error = raise_error
+        self.counts: dict[tuple[str, str | None, str | None], int] = {}
+        self.reports: list[RepeatedQuery] = []
+
+    def __enter__(self) -> "detect_n_plus_one":
+        self.counts = {}
+        self.reports = []
+        self._token = _detector.set(self)
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        _detector.reset(self._token)
+        self.reports = [
+            RepeatedQuery(shape, count, model, field)
+            for (shape, model, field), count in self.counts.items()
+            if count > self.threshold
+        ]
+        if not self.reports or exc_type:
+            return
+        message = "\n".join(str(report) for report in self.reports)
+        if self.raise_error:
+            raise NPlusOneError(message)
+        warnings.warn(message, NPlusOneWarning, stacklevel=2)
+
+    def record(self, sql: str) -> None:
+        model, field = _relation.get() or (None, None)
+        key = (normalize_query(sql), model, field)
+        self.counts[key] = self.counts.get(key, 0) + 1
+
+
+def normalize_query(sql: str) -> str:
+    sql = _STRING_LITERAL.sub("?", sql)
+    sql = _NUMBER_LITERAL.sub("?", sql)
+    sql = _IN_LIST.sub("(...)", sql)
+    return _WHITESPACE.sub(" ", sql).strip()
+
+
+def install_detector(connection: Connection) -> None:
+    if _detector.get() is not None:
+        connection.set_trace_callback(_trace)
+
+
+def _trace(sql: str) -> None:
+    if detector := _detector.get():
+        detector.record(sql)
+
+
+@contextmanager
+def track_relation(model: str, field: str) -> Generator[None, Any, None]:
+    if _detector.get() is None:
+        yield
+        return
+    token = _relation.set((model, field))
+    try:
+        yield
+    finally:
+        _relation.reset(token)
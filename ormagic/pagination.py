@@ -0,0 +1,82 @@
+import json
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from binascii import Error as Base64Error
+from dataclasses import dataclass
+from typing import Any, Generic, TypeVar
+
+from pydantic import BaseModel
+
+from .adapters import to_db_value
+from .query import Q, RowComparison
+
+T = TypeVar("T")
+
+
+@dataclass
+class Page(Generic[T]):
+    """Objects of one page and the cursor to pass as `after` to get the next page."""
+
+    items: list[T]
+    next_cursor: str | None
+
+    def __iter__(self):
+        return iter(self.items)
+
+    def __len__(self) -> int:
+        return len(self.items)
+
+
+def prepare_sort_fields(
+    order_by: str | list[str] | tuple[str, ...] | None, primary_key: str
+) -> tuple[list[str], bool]:
+    fields = [order_by] if isinstance(order_by, str) else list(order_by or [])
+    descending = {field.startswith("-") for field in fields}
+    if len(descending) > 1:
+        raise ValueError("All pagination fields must be sorted in the same direction")
+    is_descending = descending == {True}
+    fields = [field.lstrip("-") for field in fields]
+    if primary_key not in fields:
+        fields.append(primary_key)
+    return fields, is_descending
+
+
+def prepare_order_by(fields: list[str], descending: bool) -> list[str]:
+    return [f"-{field}" if descending else field for field in fields]
+
+
+def prepare_keyset_condition(
+    fields: list[str],
+    descending: bool,
+    cursor: str,
+    nullable: tuple[bool, ...] = (),
+) -> Q:
+    values = decode_cursor(cursor, fields, descending)
+    comparison = RowComparison(
+        tuple(fields), "<" if descending else ">", values, nullable
+    )
+    return Q._create(Q.AND, (comparison,), False)
+
+
+def encode_cursor(fields: list[str], descending: bool, item: BaseModel) -> str:
+    values = [_get_sort_value(getattr(item, field)) for field in fields]
+    token = json.dumps([prepare_order_by(fields, descending), values], default=str)
+    return urlsafe_b64encode(token.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, fields: list[str], descending: bool) -> tuple:
+    try:
+        token = urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        order_by, values = json.loads(token)
+    except (Base64Error, UnicodeDecodeError, TypeError, ValueError):
+        raise ValueError("Invalid pagination cursor")
+    if order_by != prepare_order_by(fields, descending) or len(values) != len(fields):
+        raise ValueError("Pagination cursor does not match the sort order")
+    return tuple(values)
+
+
+def _get_sort_value(value: Any) -> Any:
+    from .models import DBModel
+
+    if isinstance(value, DBModel):
+        return value.model_id
+    return to_db_value(value)
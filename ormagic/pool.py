@@ -0,0 +1,93 @@
+from contextlib import contextmanager
+from queue import LifoQueue
+from sqlite3 import Connection
+from threading import Lock, RLock
+from typing import Any, Generator
+
+from ormagic.connection import create_connection, create_read_connection
+from ormagic.workers import get_worker_connection
+
+_pool: "ConnectionPool | None" = None
+_pool_lock = Lock()
+
+
+class ConnectionPool:
+    """Single shared write connection and a bounded pool of read-only connections."""
+
+    def __init__(self, read_connections: int) -> None:
+        self.size = read_connections
+        self._write_connection = create_connection(check_same_thread=False)
+        self._write_lock = RLock()
+        self._readers: LifoQueue[Connection | None] = LifoQueue()
+        for _ in range(read_connections):
+            self._readers.put(None)
+
+    @contextmanager
+    def write_connection(self) -> Generator[Connection, Any, None]:
+        with self._write_lock:
+            yield self._write_connection
+
+    @contextmanager
+    def read_connection(self) -> Generator[Connection, Any, None]:
+        connection = self._readers.get()
+        try:
+            if connection is None:
+                connection = create_read_connection(check_same_thread=False)
+            yield connection
+        finally:
+            self._readers.put(connection)
+
+    def close(self) -> None:
+        with self._write_lock:
+            self._write_connection.close()
+        for _ in range(self.size):
+            if connection := self._readers.get():
+                connection.close()
+
+
+def enable_connection_pool(read_connections: int = 4) -> None:
+    """Serve reads from a pool of read-only connections and all writes from a single connection.
+
+    Args:
+        read_connections (int, optional): Maximum number of read-only connections. Defaults to 4.
+    """
+    global _pool
+    if read_connections < 1:
+        raise ValueError("Number of read connections must be greater than 0")
+    disable_connection_pool()
+    with _pool_lock:
+        _pool = ConnectionPool(read_connections)
+
+
+def disable_connection_pool() -> None:
+    """Close all pooled connections."""
+    global _pool
+    with _pool_lock:
+        pool, _pool = _pool, None
+    if pool:
+        pool.close()
+
+
+@contextmanager
+def write_connection() -> Generator[Connection, Any, None]:
+    if pool := _pool:
+        with pool.write_connection() as connection:
+            yield connection
+    elif worker_connection := get_worker_connection():
+        yield worker_connection
+    else:
+        connection = create_connection()
+        try:
+            yield connection
+        finally:
+            connection.close()
+
+
+@contextmanager
+def read_connection() -> Generator[Connection, Any, None]:
+    if pool := _pool:
+        with pool.read_connection() as connection:
+            yield connection
+    else:
+        with write_connection() as connection:
+            yield connection
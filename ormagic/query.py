@@ -1,23 +1,266 @@
-from .field_utils import prepare_where_conditions
+from typing import Any, Collection, Hashable, NamedTuple, Union
+
+from pydantic import BaseModel
+
+from .adapters import to_db_value
+from .expressions import Expression
+from .field_utils import (
+    is_decimal_value,
+    is_multi_value_lookup,
+    prepare_lookup_condition,
+)
+
+
+class RowComparison(NamedTuple):
+    """Comparison of several columns at once, e.g. `(age, id) > (?, ?)`.
+
+    Nullable fields are compared in the order SQLite sorts them, NULL before
+    any value in ascending order (`>`) and after any value in descending order (`<`).
+    Decimal fields are compared as numbers, in the same order as they are sorted.
+    """
+
+    fields: tuple[str, ...]
+    operator: str
+    values: tuple
+    nullable: tuple[bool, ...] = ()
+
+    def compile(self, decimal_fields: Collection[str] = ()) -> tuple[str, list]:
+        columns = [
+            f"CAST({field} AS NUMERIC)" if field in decimal_fields else field
+            for field in self.fields
+        ]
+        placeholders = [
+            "CAST(? AS NUMERIC)" if field in decimal_fields else "?"
+            for field in self.fields
+        ]
+        if not any(self.nullable) and None not in self.values:
+            return (
+                f"({', '.join(columns)}) {self.operator} ({', '.join(placeholders)})",
+                list(self.values),
+            )
+        branches = []
+        params: list = []
+        equal: list[str] = []
+        equal_params: list = []
+        nullable = self.nullable or (False,) * len(self.fields)
+        for field, column, placeholder, value, is_nullable in zip(
+            self.fields, columns, placeholders, self.values, nullable
+        ):
+            if value is None:
+                if self.operator == ">":
+                    branches.append(" AND ".join([*equal, f"{field} IS NOT NULL"]))
+                    params.extend(equal_params)
+                equal.append(f"{field} IS NULL")
+                continue
+            after = f"{column} {self.operator} {placeholder}"
+            if is_nullable and self.operator == "<":
+                after = f"({after} OR {field} IS NULL)"
+            branches.append(" AND ".join([*equal, after]))
+            params.extend([*equal_params, value])
+            equal.append(f"{column} = {placeholder}")
+            equal_params.append(value)
+        sql = " OR ".join(f"({branch})" for branch in branches)
+        return f"({sql})", params
+
+    @property
+    def params(self) -> list:
+        return self.compile()[1]
+
+    @property
+    def shape(self) -> Hashable:
+        return (
+            self.fields,
+            self.operator,
+            self.nullable,
+            tuple(value is None for value in self.values),
+        )
+
+
+Lookup = Union[tuple[str, Any], RowComparison]
 
 
 class Q:
-    def __init__(self, *args, **kwargs):
-        self.conditions, self.params = prepare_where_conditions(*args, **kwargs)
+    """Immutable tree of filter conditions combined with AND, OR and NOT.
+
+    The tree is simplified when it is built, nested groups with the same
+    operator are flattened and duplicate conditions are removed, and SQL is
+    compiled only when the query is executed.
+    """
+
+    AND = "AND"
+    OR = "OR"
+
+    __slots__ = ("connector", "children", "negated", "_params")
+
+    connector: str
+    children: tuple[Union["Q", Lookup], ...]
+    negated: bool
+    _params: tuple | None
+
+    def __init__(self, *args: "Q", **kwargs: Any) -> None:
+        children = [
+            *args,
+            *((field, _freeze(value)) for field, value in kwargs.items()),
+        ]
+        self._set(self.AND, _simplify(self.AND, children), False)
+
+    @classmethod
+    def _create(
+        cls, connector: str, children: tuple[Union["Q", Lookup], ...], negated: bool
+    ) -> "Q":
+        q = cls.__new__(cls)
+        q._set(connector, children, negated)
+        return q
+
+    def _set(
+        self, connector: str, children: tuple[Union["Q", Lookup], ...], negated: bool
+    ) -> None:
+        if len(children) == 1 and isinstance(children[0], Q):
+            child = children[0]
+            connector, children = child.connector, child.children
+            negated = negated != child.negated
+        object.__setattr__(self, "connector", connector)
+        object.__setattr__(self, "children", children)
+        object.__setattr__(self, "negated", negated)
+        object.__setattr__(self, "_params", None)
 
-        if len(self.params) > 1:
-            self.conditions = f"({self.conditions})"
+    def __setattr__(self, name: str, value: Any) -> None:
+        raise AttributeError("Q objects are immutable")
 
     def __or__(self, other: "Q") -> "Q":
-        self.conditions = f"{self.conditions} OR {other.conditions}"
-        self.params.extend(other.params)
-        return self
+        return self._combine(other, self.OR)
 
     def __and__(self, other: "Q") -> "Q":
-        self.conditions = f"{self.conditions} AND {other.conditions}"
-        self.params.extend(other.params)
-        return self
+        return self._combine(other, self.AND)
 
     def __invert__(self) -> "Q":
-        self.conditions = f"NOT ({self.conditions})"
-        return self
+        return self._create(self.connector, self.children, not self.negated)
+
+    def __eq__(self, other: object) -> bool:
+        return isinstance(other, Q) and self._key() == other._key()
+
+    def __hash__(self) -> int:
+        return hash(self._key())
+
+    def __repr__(self) -> str:
+        return f"Q({self.conditions!r}, {self.params!r})"
+
+    @property
+    def conditions(self) -> str:
+        return self.compile()[0]
+
+    @property
+    def params(self) -> list:
+        if (params := self._params) is None:
+            params = tuple(self._collect_params())
+            object.__setattr__(self, "_params", params)
+        return list(params)
+
+    @property
+    def shape(self) -> Hashable:
+        """Structure of the tree without values, the same for queries compiled to the same SQL."""
+        return (
+            self.connector,
+            self.negated,
+            tuple(
+                child.shape
+                if isinstance(child, (Q, RowComparison))
+                else _lookup_shape(child)
+                for child in self.children
+            ),
+        )
+
+    def compile(
+        self,
+        json_fields: Collection[str] = (),
+        decimal_fields: Collection[str] = (),
+        parent_connector: str | None = None,
+    ) -> tuple[str, list]:
+        """Compile the tree to SQL conditions with `?` placeholders and their parameters.
+
+        Args:
+            json_fields (Collection[str], optional): Names of JSON fields of the model, which allow lookups by JSON path.
+            decimal_fields (Collection[str], optional): Names of Decimal fields of the model, which are compared as numbers.
+            parent_connector (AND | OR, optional): Operator used to combine the result with other conditions, to add parentheses where needed.
+        """
+        conditions = []
+        for child in self.children:
+            if isinstance(child, Q):
+                conditions.append(
+                    child.compile(json_fields, decimal_fields, self.connector)[0]
+                )
+            elif isinstance(child, RowComparison):
+                conditions.append(child.compile(decimal_fields)[0])
+            else:
+                conditions.append(
+                    prepare_lookup_condition(*child, json_fields, decimal_fields)[0]
+                )
+        sql = f" {self.connector} ".join(conditions)
+        if self.negated:
+            sql = f"NOT ({sql})"
+        elif self._needs_parentheses(parent_connector):
+            sql = f"({sql})"
+        return sql, self.params
+
+    def _collect_params(self) -> list:
+        params: list = []
+        for child in self.children:
+            if isinstance(child, Q):
+                params.extend(child.params)
+            elif isinstance(child, RowComparison):
+                params.extend(child.params)
+            elif isinstance(child[1], Expression):
+                params.extend(child[1].params)
+            elif is_multi_value_lookup(child[0]):
+                params.extend(child[1])
+            else:
+                params.append(child[1])
+        return params
+
+    def _needs_parentheses(self, parent_connector: str | None) -> bool:
+        return (
+            parent_connector == self.AND
+            and self.connector == self.OR
+            and len(self.children) > 1
+        )
+
+    def _combine(self, other: "Q", connector: str) -> "Q":
+        if not isinstance(other, Q):
+            return NotImplemented
+        return self._create(connector, _simplify(connector, [self, other]), False)
+
+    def _key(self) -> Hashable:
+        return (self.connector, self.negated, self.children)
+
+
+def _simplify(connector: str, children: list) -> tuple[Union[Q, Lookup], ...]:
+    simplified: dict[Any, None] = {}
+    for child in children:
+        if isinstance(child, Q) and not child.children:
+            continue
+        if isinstance(child, Q) and child.connector == connector and not child.negated:
+            simplified.update(dict.fromkeys(child.children))
+        elif isinstance(child, Q) and len(child.children) == 1 and not child.negated:
+            simplified[child.children[0]] = None
+        else:
+            simplified[child] = None
+    return tuple(simplified)
+
+
+def _freeze(value: Any) -> Any:
+    if isinstance(value, (dict, BaseModel)):
+        return to_db_value(value)
+    if isinstance(value, list):
+        return tuple(value)
+    if isinstance(value, set):
+        return frozenset(value)
+    return value
+
+
+def _lookup_shape(lookup: tuple[str, Any]) -> Hashable:
+    field, value = lookup
+    if isinstance(value, Expression):
+        return field, value.shape
+    if isinstance(value, (tuple, frozenset)):
+        return field, len(value), is_decimal_value(value)
+    return field, is_decimal_value(value) or None
@@ -0,0 +1,128 @@
+from typing import TYPE_CHECKING, Any, Generic, Iterator, TypeVar
+
+from .adapters import get_decimal_fields, get_json_fields, to_db_value
+from .cache import invalidate_tables
+from .columns import fetch_columns
+from .cursor import get_cursor
+from .expressions import Expression
+from .field_utils import is_many_to_many_field
+from .query import Q
+from .statement_cache import _QUERY_OPTIONS, prepare_query
+from .writer import queued_write
+
+if TYPE_CHECKING:
+    from .models import DBModel
+
+M = TypeVar("M", bound="DBModel")
+
+
+class QuerySet(Generic[M]):
+    """Objects of a model matching filters, the query runs only when a method needs its result."""
+
+    __slots__ = ("model", "args", "kwargs", "_result")
+
+    def __init__(self, model: type[M], *args: Q, **kwargs: Any) -> None:
+        self.model = model
+        self.args = args
+        self.kwargs = kwargs
+        self._result: list[M] | None = None
+
+    def __iter__(self) -> Iterator[M]:
+        return iter(self.all())
+
+    def __repr__(self) -> str:
+        return f"QuerySet({self.model.__name__}, {self.args!r}, {self.kwargs!r})"
+
+    def filter(self, *args: Q, **kwargs: Any) -> "QuerySet[M]":
+        """Narrow the query down with more filters, combined with the existing ones with AND."""
+        lookups = {
+            key: value
+            for key, value in kwargs.items()
+            if key in self.kwargs and key not in _QUERY_OPTIONS
+        }
+        kwargs = {key: value for key, value in kwargs.items() if key not in lookups}
+        extra_args = (Q(**lookups),) if lookups else ()
+        return QuerySet(
+            self.model, *self.args, *args, *extra_args, **{**self.kwargs, **kwargs}
+        )
+
+    def all(self) -> list[M]:
+        """Get objects matching the query, or objects loaded in advance by `prefetch_related`."""
+        if self._result is not None:
+            return list(self._result)
+        return self.model.filter(*self.args, **self.kwargs)
+
+    def count(self) -> int:
+        """Count objects matching the query."""
+        if self._result is not None:
+            return len(self._result)
+        return self.model.count(*self.args, **self.kwargs)
+
+    def to_columns(self, *fields: str, batch_size: int = 10000) -> dict[str, Any]:
+        """Get values of the fields of matching objects as NumPy arrays, by field name.
+
+        Values are copied from the database to the arrays in batches, without creating objects of the model. The type of each array is taken from the field type, optional integers and floats use `NaN` and datetimes use `NaT` for missing values.
+
+        Args:
+            fields (str, optional): Names of the fields. Defaults to all fields except many-to-many relations.
+            batch_size (int, optional): Number of rows fetched from the database at a time. Defaults to 10000.
+        """
+        return fetch_columns(self.model, fields, batch_size, *self.args, **self.kwargs)
+
+    @queued_write
+    def update(self, **values: Any) -> int:
+        """Update fields of all matching objects with one query and return the number of updated rows."""
+        if not values:
+            raise ValueError("No fields to update")
+        assignments, params = _prepare_assignments(self.model, values)
+        query, where_params = self._prepare_write_query(
+            f"UPDATE {self.model._get_table_name()} SET {assignments}"
+        )
+        return self._execute_write(query, [*params, *where_params])
+
+    @queued_write
+    def delete(self) -> int:
+        """Delete all matching objects with one query and return the number of deleted rows."""
+        query, params = self._prepare_write_query(
+            f"DELETE FROM {self.model._get_table_name()}"
+        )
+        return self._execute_write(query, params)
+
+    def _prepare_write_query(self, statement: str) -> tuple[str, list]:
+        if not any(option in self.kwargs for option in _QUERY_OPTIONS):
+            return prepare_query(self.model, statement, *self.args, **self.kwargs)
+        primary_key = self.model._get_primary_key_field_name()
+        query, params = prepare_query(
+            self.model,
+            f"SELECT {primary_key} FROM {self.model._get_table_name()}",
+            *self.args,
+            **self.kwargs,
+        )
+        return f"{statement} WHERE {primary_key} IN ({query})", params
+
+    def _execute_write(self, query: str, params: list) -> int:
+        with get_cursor() as cursor:
+            cursor.execute(query, params)
+            invalidate_tables(cursor.connection, self.model._get_table_name())
+            return cursor.rowcount
+
+
+def _prepare_assignments(model: Any, values: dict[str, Any]) -> tuple[str, list]:
+    assignments = []
+    params = []
+    for field_name, value in values.items():
+        field_info = model.model_fields.get(field_name)
+        if not field_info or is_many_to_many_field(field_info.annotation):
+            raise ValueError(f"Invalid field: {field_name}")
+        if isinstance(value, Expression):
+            expression, expression_params = value.compile(
+                get_json_fields(model), get_decimal_fields(model)
+            )
+            assignments.append(f"{field_name} = {expression}")
+            params.extend(expression_params)
+            continue
+        assignments.append(f"{field_name} = ?")
+        params.append(to_db_value(value))
+    if (version_field := model._version_field) and version_field not in values:
+        assignments.append(f"{version_field} = {version_field} + 1")
+    return ", ".join(assignments), params
@@ -0,0 +1,82 @@
+from typing import TYPE_CHECKING, Any, Sequence, TypeVar
+
+from .workers import run_in_worker
+
+if TYPE_CHECKING:
+    from .models import DBModel
+
+M = TypeVar("M", bound="DBModel")
+
+_BATCH_SIZE = 900
+
+
+class ReverseRelation:
+    """Accessor of objects referencing the object with a foreign key, like `author.post_set`."""
+
+    def __init__(self, model: type["DBModel"], field_name: str, name: str) -> None:
+        self.model = model
+        self.field_name = field_name
+        self.name = name
+
+    def __get__(self, instance: Any, owner: type) -> Any:
+        if instance is None:
+            return self
+        return self.model.query(**{self.field_name: _get_id(instance)})
+
+    def prefetch(self, objects: Sequence["DBModel"]) -> None:
+        """Load related objects of all objects with one query per batch and store them in the objects."""
+        parents = {_get_id(obj): obj for obj in objects}
+        groups: dict[Any, list] = {model_id: [] for model_id in parents}
+        model_ids = list(parents)
+        for start in range(0, len(model_ids), _BATCH_SIZE):
+            lookup = {f"{self.field_name}__in": model_ids[start : start + _BATCH_SIZE]}
+            for child in self.model._load_referencing(
+                self.field_name, parents, **lookup
+            ):
+                groups[getattr(child, self.field_name).model_id].append(child)
+        for obj in objects:
+            queryset = self.model.query(**{self.field_name: obj.model_id})
+            queryset._result = groups[obj.model_id]
+            obj.__dict__[self.name] = queryset
+
+
+def add_reverse_relation(
+    owner: type["DBModel"], model: type["DBModel"], field_name: str, name: str
+) -> None:
+    """Add an accessor of objects of the model referencing objects of the owner model by the field."""
+    existing = getattr(owner, name, None)
+    if name in owner.model_fields or not (
+        existing is None
+        or isinstance(existing, ReverseRelation)
+        and (existing.model.__name__, existing.field_name)
+        == (model.__name__, field_name)
+    ):
+        raise ValueError(
+            f"Reverse relation {name} clashes with an attribute of {owner.__name__}, "
+            f"set related_name of the field {model.__name__}.{field_name}"
+        )
+    setattr(owner, name, ReverseRelation(model, field_name, name))
+
+
+def prefetch_related(objects: Sequence[M], *relations: str) -> Sequence[M]:
+    """Load reverse relations of all objects with one query per relation, so that accessing them doesn't query the database."""
+    for name in relations:
+        for owner in {type(obj) for obj in objects}:
+            relation = getattr(owner, name, None)
+            if not isinstance(relation, ReverseRelation):
+                raise ValueError(f"Invalid reverse relation: {name}")
+            relation.prefetch([obj for obj in objects if type(obj) is owner])
+    return objects
+
+
+async def aprefetch_related(objects: Sequence[M], *relations: str) -> Sequence[M]:
+    """Asynchronous version of `prefetch_related` executed in a worker thread."""
+    return await run_in_worker(prefetch_related, objects, *relations)
+
+
+def _get_id(obj: "DBModel") -> Any:
+    if (model_id := obj.model_id) is None:
+        raise ValueError(
+            f"Save the {type(obj).__name__} object to access its relations"
+        )
+    return model_id
@@ -0,0 +1,184 @@
+import asyncio
+import random
+import time
+from sqlite3 import Cursor, OperationalError
+from threading import Lock
+from typing import Any, Awaitable, Callable, Iterator, NamedTuple, TypeVar
+
+T = TypeVar("T")
+
+_BUSY_ERROR_CODES = (5, 6)  # SQLITE_BUSY, SQLITE_LOCKED
+_READ_STATEMENTS = ("SELECT", "PRAGMA", "EXPLAIN")
+
+
+class RetryStats(NamedTuple):
+    busy_errors: int
+    retries: int
+    failures: int
+    lock_waits: int
+    lock_wait_time: float
+    backoff_time: float
+
+
+class RetryPolicy:
+    """Busy timeout of connections, jittered exponential backoff between retries and the time of writes counted as lock waits."""
+
+    def __init__(
+        self,
+        timeout: float,
+        retries: int,
+        backoff: float,
+        max_backoff: float,
+        lock_wait_threshold: float,
+    ) -> None:
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.lock_wait_threshold = lock_wait_threshold
+
+    def delays(self) -> Iterator[float]:
+        for attempt in range(self.retries):
+            yield random.uniform(0, min(self.max_backoff, self.backoff * 2**attempt))
+
+
+class RetryingCursor(Cursor):
+    """Cursor retrying statements executed outside of a transaction when the database is locked."""
+
+    def execute(self, sql: str, parameters: Any = (), /) -> Cursor:  # type: ignore[override]
+        if self.connection.in_transaction:
+            return measure_lock_wait(super().execute, sql, parameters)
+        return call_with_retry(measure_lock_wait, super().execute, sql, parameters)
+
+    def executemany(self, sql: str, parameters: Any, /) -> Cursor:  # type: ignore[override]
+        if self.connection.in_transaction:
+            return measure_lock_wait(super().executemany, sql, parameters)
+        return call_with_retry(
+            measure_lock_wait, super().executemany, sql, list(parameters)
+        )
+
+
+_policy = RetryPolicy(
+    timeout=5.0, retries=3, backoff=0.05, max_backoff=1.0, lock_wait_threshold=0.01
+)
+_counts = {"busy_errors": 0, "retries": 0, "failures": 0, "lock_waits": 0}
+_times = {"lock_wait_time": 0.0, "backoff_time": 0.0}
+_stats_lock = Lock()
+
+
+def configure_retries(
+    timeout: float = 5.0,
+    retries: int = 3,
+    backoff: float = 0.05,
+    max_backoff: float = 1.0,
+    lock_wait_threshold: float = 0.01,
+) -> None:
+    """Configure waiting for locks and retrying operations when the database is locked by another connection.
+
+    Args:
+        timeout (float, optional): Seconds a connection waits for a lock before the database is reported as locked. Used by connections opened after the change. Defaults to 5.0.
+        retries (int, optional): Number of retries of an operation or a transaction, 0 disables retrying. Defaults to 3.
+        backoff (float, optional): Maximum delay in seconds before the first retry, doubled for every next retry. The actual delay is random between 0 and this value. Defaults to 0.05.
+        max_backoff (float, optional): Maximum delay in seconds before any retry. Defaults to 1.0.
+        lock_wait_threshold (float, optional): Seconds after which a write statement is counted in statistics as waiting for a lock. Defaults to 0.01.
+    """
+    global _policy
+    if min(timeout, retries, backoff, max_backoff, lock_wait_threshold) < 0:
+        raise ValueError("Timeout, retries, backoff and threshold can't be negative")
+    _policy = RetryPolicy(timeout, retries, backoff, max_backoff, lock_wait_threshold)
+
+
+def get_busy_timeout() -> float:
+    return _policy.timeout
+
+
+def retry_stats() -> RetryStats:
+    """Return numbers of lock errors, retries, failed retries and lock waits, time spent waiting for locks and between retries."""
+    with _stats_lock:
+        return RetryStats(
+            busy_errors=_counts["busy_errors"],
+            retries=_counts["retries"],
+            failures=_counts["failures"],
+            lock_waits=_counts["lock_waits"],
+            lock_wait_time=_times["lock_wait_time"],
+            backoff_time=_times["backoff_time"],
+        )
+
+
+def reset_retry_stats() -> None:
+    """Reset retry statistics."""
+    with _stats_lock:
+        _counts.update(busy_errors=0, retries=0, failures=0, lock_waits=0)
+        _times.update(lock_wait_time=0.0, backoff_time=0.0)
+
+
+def is_busy_error(error: BaseException) -> bool:
+    return isinstance(error, OperationalError) and (
+        getattr(error, "sqlite_errorcode", 0) & 0xFF in _BUSY_ERROR_CODES
+    )
+
+
+def measure_lock_wait(func: Callable[..., T], sql: str, *args) -> T:
+    """Execute the statement with the function and record the time it waited for a lock.
+
+    SQLite doesn't report how long a statement waited for a lock within the busy timeout, so a write statement taking longer than the threshold is counted as a lock wait, as well as any statement failing because the database is locked.
+    """
+    start = time.monotonic()
+    try:
+        result = func(sql, *args)
+    except OperationalError as error:
+        if is_busy_error(error):
+            _record_lock_wait(time.monotonic() - start)
+        raise
+    elapsed = time.monotonic() - start
+    if elapsed >= _policy.lock_wait_threshold and _is_write_statement(sql):
+        _record_lock_wait(elapsed)
+    return result
+
+
+def call_with_retry(func: Callable[..., T], *args, **kwargs) -> T:
+    """Call the function again after a random delay when it fails because the database is locked."""
+    delays = _policy.delays()
+    while True:
+        try:
+            return func(*args, **kwargs)
+        except OperationalError as error:
+            if (delay := _next_delay(error, delays)) is None:
+                raise
+        time.sleep(delay)
+
+
+async def acall_with_retry(func: Callable[..., Awaitable[T]], *args, **kwargs) -> T:
+    """Asynchronous version of `call_with_retry` awaiting the delay."""
+    delays = _policy.delays()
+    while True:
+        try:
+            return await func(*args, **kwargs)
+        except OperationalError as error:
+            if (delay := _next_delay(error, delays)) is None:
+                raise
+        await asyncio.sleep(delay)
+
+
+def _next_delay(error: OperationalError, delays: Iterator[float]) -> float | None:
+    if not is_busy_error(error):
+        return None
+    delay = next(delays, None)
+    with _stats_lock:
+        _counts["busy_errors"] += 1
+        if delay is None:
+            _counts["failures"] += 1
+            return None
+        _counts["retries"] += 1
+        _times["backoff_time"] += delay
+    return delay
+
+
+def _is_write_statement(sql: str) -> bool:
+    return not sql.lstrip()[:7].upper().startswith(_READ_STATEMENTS)
+
+
+def _record_lock_wait(elapsed: float) -> None:
+    with _stats_lock:
+        _counts["lock_waits"] += 1
+        _times["lock_wait_time"] += elapsed
@@ -0,0 +1,59 @@
+from sqlite3 import Cursor
+
+
+def get_search_table_name(table_name: str) -> str:
+    return f"{table_name}_fts"
+
+
+def install_search_index(
+    cursor: Cursor, table_name: str, fields: tuple[str, ...]
+) -> None:
+    search_table_name = get_search_table_name(table_name)
+    definition = (
+        f"CREATE VIRTUAL TABLE {search_table_name} "
+        f"USING fts5({', '.join(fields)}, content='{table_name}')"
+    )
+    cursor.execute(
+        "SELECT sql FROM sqlite_master WHERE type='table' AND name=?",
+        (search_table_name,),
+    )
+    if (row := cursor.fetchone()) and row[0] == definition:
+        return
+    drop_search_index(cursor, table_name)
+    cursor.execute(definition)
+    columns = ", ".join(fields)
+    new_values = ", ".join(f"new.{field}" for field in fields)
+    old_values = ", ".join(f"old.{field}" for field in fields)
+    insert = f"INSERT INTO {search_table_name} (rowid, {columns}) VALUES (new.rowid, {new_values});"
+    delete = (
+        f"INSERT INTO {search_table_name} ({search_table_name}, rowid, {columns}) "
+        f"VALUES ('delete', old.rowid, {old_values});"
+    )
+    cursor.execute(
+        f"CREATE TRIGGER {search_table_name}_insert AFTER INSERT ON {table_name} BEGIN {insert} END"
+    )
+    cursor.execute(
+        f"CREATE TRIGGER {search_table_name}_delete AFTER DELETE ON {table_name} BEGIN {delete} END"
+    )
+    cursor.execute(
+        f"CREATE TRIGGER {search_table_name}_update AFTER UPDATE ON {table_name} BEGIN {delete} {insert} END"
+    )
+    cursor.execute(
+        f"INSERT INTO {search_table_name} ({search_table_name}) VALUES ('rebuild')"
+    )
+
+
+def drop_search_index(cursor: Cursor, table_name: str) -> None:
+    search_table_name = get_search_table_name(table_name)
+    for operation in ("insert", "delete", "update"):
+        cursor.execute(f"DROP TRIGGER IF EXISTS {search_table_name}_{operation}")
+    cursor.execute(f"DROP TABLE IF EXISTS {search_table_name}")
+
+
+def prepare_search_select(table_name: str) -> str:
+    search_table_name = get_search_table_name(table_name)
+    return (
+        f"SELECT {table_name}.* FROM "
+        f"(SELECT rowid, rank AS _search_rank FROM {search_table_name} WHERE {search_table_name} MATCH ?) AS _search "
+        f"JOIN {table_name} ON {table_name}.rowid = _search.rowid"
+    )
@@ -0,0 +1,162 @@
+from collections import OrderedDict
+from threading import Lock
+from typing import Any, Callable, Hashable, NamedTuple, TypeVar
+
+from .adapters import get_decimal_fields, get_json_fields, to_db_value
+from .expressions import Expression, OrderBy, get_order_by_params
+from .field_utils import (
+    is_decimal_value,
+    is_multi_value_lookup,
+    prepare_where_conditions,
+)
+
+T = TypeVar("T")
+
+_QUERY_OPTIONS = ("order_by", "limit", "offset")
+
+
+class CacheInfo(NamedTuple):
+    hits: int
+    misses: int
+    max_size: int
+    size: int
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+
+class StatementCache:
+    """LRU cache of compiled SQL templates keyed by the shape of the query."""
+
+    def __init__(self, max_size: int = 512) -> None:
+        self.max_size = max_size
+        self._statements: OrderedDict[Hashable, Any] = OrderedDict()
+        self._hits = 0
+        self._misses = 0
+        self._lock = Lock()
+
+    def get(self, shape: Hashable, compile: Callable[[], T]) -> T:
+        with self._lock:
+            if (statement := self._statements.get(shape)) is not None:
+                self._statements.move_to_end(shape)
+                self._hits += 1
+                return statement
+            self._misses += 1
+        statement = compile()
+        with self._lock:
+            self._statements[shape] = statement
+            while len(self._statements) > self.max_size:
+                self._statements.popitem(last=False)
+        return statement
+
+    def info(self) -> CacheInfo:
+        with self._lock:
+            return CacheInfo(
+                self._hits, self._misses, self.max_size, len(self._statements)
+            )
+
+    def clear(self) -> None:
+        with self._lock:
+            self._statements.clear()
+            self._hits = 0
+            self._misses = 0
+
+
+_statement_cache = StatementCache()
+
+
+def statement_cache_info() -> CacheInfo:
+    """Return hits, misses, maximum size and current size of the compiled SQL cache."""
+    return _statement_cache.info()
+
+
+def clear_statement_cache() -> None:
+    """Remove all compiled SQL templates and reset the statistics."""
+    _statement_cache.clear()
+
+
+def prepare_query(model: Any, select: str, /, *args, **kwargs) -> tuple[str, list]:
+    shape = (model, select, _get_args_shape(args), _get_kwargs_shape(kwargs))
+    query, expanded = _statement_cache.get(
+        shape, lambda: _compile_query(model, select, *args, **kwargs)
+    )
+    return query, _bind_params(expanded, *args, **kwargs)
+
+
+def _get_args_shape(args: tuple) -> tuple:
+    from .query import Q
+
+    return tuple(arg.shape for arg in args if isinstance(arg, Q))
+
+
+def _get_kwargs_shape(kwargs: dict) -> tuple:
+    shape: list[tuple[Hashable, ...]] = []
+    for field, value in kwargs.items():
+        if field == "order_by":
+            shape.append((field, _get_order_by_shape(value)))
+        elif field in _QUERY_OPTIONS:
+            shape.append((field, bool(value)))
+        elif isinstance(value, Expression):
+            shape.append((field, value.shape))
+        elif isinstance(value, (list, tuple, set, frozenset)):
+            shape.append((field, len(value), is_decimal_value(value)))
+        else:
+            shape.append((field, is_decimal_value(value) or None))
+    return tuple(shape)
+
+
+def _get_order_by_shape(order_by: Any) -> Hashable:
+    if isinstance(order_by, (list, tuple, set)):
+        return tuple(_get_order_by_shape(item) for item in order_by)
+    if isinstance(order_by, (Expression, OrderBy)):
+        return order_by.shape
+    return order_by
+
+
+def _compile_query(
+    model: Any, select: str, /, *args, **kwargs
+) -> tuple[str, tuple[bool, ...]]:
+    query = select
+    where_conditions, _ = prepare_where_conditions(
+        get_json_fields(model), get_decimal_fields(model), *args, **kwargs
+    )
+    if where_conditions:
+        query += f" WHERE {where_conditions}"
+    if kwargs.get("order_by"):
+        query += f" ORDER BY {model._prepare_order_by(kwargs['order_by'])}"
+    if kwargs.get("limit"):
+        query += " LIMIT ?"
+    elif kwargs.get("offset"):
+        query += " LIMIT -1"
+    if kwargs.get("offset"):
+        query += " OFFSET ?"
+    expanded = tuple(
+        is_multi_value_lookup(field) for field in kwargs if field not in _QUERY_OPTIONS
+    )
+    return query, expanded
+
+
+def _bind_params(expanded: tuple[bool, ...], /, *args, **kwargs) -> list:
+    from .query import Q
+
+    params: list = []
+    values = (value for field, value in kwargs.items() if field not in _QUERY_OPTIONS)
+    for value, is_expanded in zip(values, expanded):
+        if isinstance(value, Expression):
+            params.extend(value.params)
+        elif is_expanded:
+            params.extend(value)
+        else:
+            params.append(value)
+    for arg in args:
+        if isinstance(arg, Q):
+            params.extend(arg.params)
+    if order_by := kwargs.get("order_by"):
+        params.extend(get_order_by_params(order_by))
+    if limit := kwargs.get("limit"):
+        params.append(limit)
+    if offset := kwargs.get("offset"):
+        params.append(offset)
+    return [to_db_value(param) for param in params]
@@ -1,14 +1,16 @@
 from sqlite3 import Cursor
-from typing import Any, Type, get_args
+from typing import Any, Collection, Type, get_args
 
 from pydantic.fields import FieldInfo
 from pydantic_core import PydanticUndefined
 
+from .adapters import to_db_value
 from .field_utils import (
     get_on_delete_action,
     is_many_to_many_field,
     is_primary_key_field,
     is_unique_field,
+    prepare_lookup_expression,
     transform_field_annotation_to_sql_type,
 )
 
@@ -19,7 +21,6 @@ def create_table(
     primary_key: str,
     model_fields: dict[str, FieldInfo],
 ):
-    columns = []
     for field_name, field_info in model_fields.items():
         if is_many_to_many_field(field_info.annotation):
             related_table = getattr(field_info.annotation, "__args__")[0]
@@ -28,9 +29,29 @@ def create_table(
             _create_intermediate_table(
                 cursor, table_name, primary_key, related_table_name, related_primary_key
             )
-            continue
-        columns.append(_prepare_column_definition(field_name, field_info))
-    cursor.execute(f"CREATE TABLE IF NOT EXISTS {table_name} ({', '.join(columns)})")
+    cursor.execute(prepare_create_table_statement(table_name, model_fields))
+
+
+def prepare_create_table_statement(
+    table_name: str, model_fields: dict[str, FieldInfo]
+) -> str:
+    fields = [
+        (field_name, field_info)
+        for field_name, field_info in model_fields.items()
+        if not is_many_to_many_field(field_info.annotation)
+    ]
+    columns = [
+        prepare_column_definition(field_name, field_info, foreign_key=False)
+        for field_name, field_info in fields
+    ]
+    constraints = [
+        constraint
+        for field_name, field_info in fields
+        if (constraint := prepare_foreign_key_constraint(field_name, field_info))
+    ]
+    return (
+        f"CREATE TABLE IF NOT EXISTS {table_name} ({', '.join(columns + constraints)})"
+    )
 
 
 def update_table(
@@ -58,13 +79,39 @@ def update_table(
     )
 
 
+def create_indexes(
+    cursor: Cursor,
+    table_name: str,
+    indexes: tuple[tuple[str, ...], ...],
+    json_fields: Collection[str],
+    decimal_fields: Collection[str],
+) -> None:
+    for lookups in indexes:
+        index_name = "_".join([table_name, *lookups, "idx"])
+        expressions = ", ".join(
+            prepare_lookup_expression(lookup, json_fields, decimal_fields)
+            for lookup in lookups
+        )
+        cursor.execute(
+            f"CREATE INDEX IF NOT EXISTS {index_name} ON {table_name} ({expressions})"
+        )
+
+
 def get_foreign_key_model(field_annotation: Any) -> Type | None:
     from .models import DBModel
 
     types_tuple = get_args(field_annotation)
-    if not types_tuple and field_annotation and issubclass(field_annotation, DBModel):
+    if (
+        not types_tuple
+        and isinstance(field_annotation, type)
+        and issubclass(field_annotation, DBModel)
+    ):
         return field_annotation
-    if types_tuple and issubclass(types_tuple[0], DBModel):
+    if (
+        types_tuple
+        and isinstance(types_tuple[0], type)
+        and issubclass(types_tuple[0], DBModel)
+    ):
         return types_tuple[0]
 
 
@@ -78,6 +125,19 @@ def _create_intermediate_table(
     if get_intermediate_table_name(cursor, table_name, related_table_name):
         return
     cursor.execute(
+        prepare_intermediate_table_statement(
+            table_name, primary_key, related_table_name, related_primary_key
+        )
+    )
+
+
+def prepare_intermediate_table_statement(
+    table_name: str,
+    primary_key: str,
+    related_table_name: str,
+    related_primary_key: str,
+) -> str:
+    return (
         f"CREATE TABLE IF NOT EXISTS {table_name}_{related_table_name} ("
         "id INTEGER PRIMARY KEY, "
         f"{table_name}_id INTEGER, "
@@ -103,23 +163,42 @@ def get_intermediate_table_name(
     return f"{related_table_name}_{table_name}" if count == 1 else None
 
 
-def _prepare_column_definition(field_name: str, field_info: FieldInfo) -> str:
+def prepare_column_definition(
+    field_name: str, field_info: FieldInfo, foreign_key: bool = True
+) -> str:
     field_type = transform_field_annotation_to_sql_type(field_info.annotation)
     column_definition = f"{field_name} {field_type}"
     if field_info.default not in (PydanticUndefined, None):
-        column_definition += f" DEFAULT '{field_info.default}'"
+        column_definition += f" DEFAULT {prepare_default_value(field_info.default)}"
     if field_info.is_required():
         column_definition += " NOT NULL"
     if is_unique_field(field_info):
         column_definition += " UNIQUE"
-    if foreign_model := get_foreign_key_model(field_info.annotation):
-        action = get_on_delete_action(field_info)
-        column_definition += f", FOREIGN KEY ({field_name}) REFERENCES {foreign_model.__name__.lower()}({foreign_model._get_primary_key_field_name()}) ON UPDATE {action} ON DELETE {action}"
+    if foreign_key and (
+        constraint := prepare_foreign_key_constraint(field_name, field_info)
+    ):
+        column_definition += f", {constraint}"
     if is_primary_key_field(field_info):
         column_definition += " PRIMARY KEY"
     return column_definition
 
 
+def prepare_foreign_key_constraint(
+    field_name: str, field_info: FieldInfo
+) -> str | None:
+    if foreign_model := get_foreign_key_model(field_info.annotation):
+        action = get_on_delete_action(field_info)
+        return f"FOREIGN KEY ({field_name}) REFERENCES {foreign_model.__name__.lower()}({foreign_model._get_primary_key_field_name()}) ON UPDATE {action} ON DELETE {action}"
+    return None
+
+
+def prepare_default_value(value: Any) -> str:
+    value = to_db_value(value)
+    if isinstance(value, bytes):
+        return f"X'{value.hex()}'"
+    return "'{}'".format(str(value).replace("'", "''"))
+
+
 def _is_table_exists(cursor: Cursor, table_name: str) -> bool:
     cursor.execute(
         f"SELECT count(*) FROM sqlite_master WHERE type='table' AND name='{table_name}'"
@@ -154,7 +233,7 @@ def _add_new_columns_to_existing_table(
     for field_name, field_info in model_fields.items():
         if field_name in existing_columns:
             continue
-        column_definition = _prepare_column_definition(field_name, field_info)
+        column_definition = prepare_column_definition(field_name, field_info)
         cursor.execute(f"ALTER TABLE {table_name} ADD COLUMN {column_definition}")
 
 
@@ -1,23 +1,130 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
 from sqlite3 import Connection
+from typing import Any, Awaitable, Callable, Generator, TypeVar
 
-from ormagic.connection import create_connection
+from ormagic.cache import invalidate_pending_tables
+from ormagic.pool import write_connection
+from ormagic.retry import acall_with_retry, call_with_retry
+from ormagic.workers import _pinned_worker, get_worker_pool, run_in_worker
+
+T = TypeVar("T")
+
+_connection: ContextVar[Connection | None] = ContextVar(
+    "transaction_connection", default=None
+)
 
 
 class transaction:
-    _is_transaction = False
-    _connection: Connection
+    """Context manager grouping operations in one atomic transaction.
+
+    The transaction is bound to the current thread or asyncio task. Nested
+    transactions are executed as savepoints of the outer transaction.
+    """
 
     @classmethod
-    def __enter__(cls):
-        cls._is_transaction = True
-        cls._connection = create_connection()
-        cls._connection.execute("BEGIN")
+    def is_active(cls) -> bool:
+        return _connection.get() is not None
 
     @classmethod
-    def __exit__(cls, exc_type, exc_value, traceback):
-        cls._is_transaction = False
-        if exc_type:
-            cls._connection.rollback()
+    def run(cls, func: Callable[..., T], *args, **kwargs) -> T:
+        """Call the function in a transaction started again when the database is locked.
+
+        The function must be safe to call again. Inside another transaction it
+        is called once in a savepoint, only the outer transaction can be retried.
+        """
+
+        def attempt() -> T:
+            with cls():
+                return func(*args, **kwargs)
+
+        return attempt() if cls.is_active() else call_with_retry(attempt)
+
+    @classmethod
+    async def arun(cls, func: Callable[..., Awaitable[T]], *args, **kwargs) -> T:
+        """Asynchronous version of `run` for coroutine functions."""
+
+        async def attempt() -> T:
+            async with cls():
+                return await func(*args, **kwargs)
+
+        return await (attempt() if cls.is_active() else acall_with_retry(attempt))
+
+    @classmethod
+    def _get_connection(cls) -> Connection | None:
+        return _connection.get()
+
+    @classmethod
+    @contextmanager
+    def _bind(cls, connection: Connection) -> Generator[None, Any, None]:
+        token = _connection.set(connection)
+        try:
+            yield
+        finally:
+            _connection.reset(token)
+
+    def __enter__(self):
+        self._token = _connection.set(self._begin())
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        _connection.reset(self._token)
+        self._end(exc_type)
+
+    async def __aenter__(self):
+        self._worker = None
+        if _pinned_worker.get() is None:
+            self._pool = get_worker_pool()
+            self._worker = await self._pool.acquire()
+            self._worker_token = _pinned_worker.set(self._worker)
+        try:
+            self._token = _connection.set(await run_in_worker(self._begin))
+        except BaseException:
+            self._release_worker()
+            raise
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        _connection.reset(self._token)
+        try:
+            await run_in_worker(self._end, exc_type)
+        finally:
+            self._release_worker()
+
+    def _begin(self) -> Connection:
+        if connection := _connection.get():
+            self._savepoint: str | None = f"transaction_{id(self)}"
+            connection.execute(f"SAVEPOINT {self._savepoint}")
         else:
-            cls._connection.commit()
-        cls._connection.close()
+            self._savepoint = None
+            self._connection_context = write_connection()
+            connection = self._connection_context.__enter__()
+            try:
+                connection.execute("BEGIN")
+            except BaseException:
+                self._connection_context.__exit__(None, None, None)
+                raise
+        self._connection = connection
+        return connection
+
+    def _end(self, exc_type) -> None:
+        if self._savepoint:
+            if exc_type:
+                self._connection.execute(f"ROLLBACK TO {self._savepoint}")
+            self._connection.execute(f"RELEASE {self._savepoint}")
+            return
+        try:
+            if exc_type:
+                self._connection.rollback()
+            else:
+                try:
+                    self._connection.commit()
+                except BaseException:
+                    self._connection.rollback()
+                    raise
+        finally:
+            invalidate_pending_tables(self._connection)
+            self._connection_context.__exit__(None, None, None)
+
+    def _release_worker(self) -> None:
+        if self._worker:
+            _pinned_worker.reset(self._worker_token)
+            self._pool.release(self._worker)
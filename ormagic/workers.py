@@ -0,0 +1,142 @@
+import asyncio
+import os
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextvars import ContextVar, copy_context
+from sqlite3 import Connection
+from threading import Lock, local
+from typing import Callable, TypeVar
+
+from ormagic.connection import create_connection
+
+T = TypeVar("T")
+
+_local = local()
+_pinned_worker: ContextVar["Worker | None"] = ContextVar("pinned_worker", default=None)
+_pool: "WorkerPool | None" = None
+_pool_lock = Lock()
+_pool_size = min(4, os.cpu_count() or 1)
+
+
+class Worker:
+    """Single thread with its own connection kept open for the thread's lifetime."""
+
+    def __init__(self) -> None:
+        self._executor = ThreadPoolExecutor(
+            max_workers=1,
+            thread_name_prefix="ormagic-worker",
+            initializer=_open_worker_connection,
+        )
+
+    async def run(self, func: Callable[..., T], *args, **kwargs) -> T:
+        context = copy_context()
+        future = self._executor.submit(context.run, func, *args, **kwargs)
+        return await asyncio.wrap_future(future)
+
+    def shutdown(self) -> None:
+        self._executor.submit(_close_worker_connection)
+        self._executor.shutdown(wait=True)
+
+
+class WorkerPool:
+    """Bounded pool of workers, each of them is used by one caller at a time."""
+
+    def __init__(self, size: int) -> None:
+        self.size = size
+        self._idle = deque(Worker() for _ in range(size))
+        self._waiters: deque[Future[Worker]] = deque()
+        self._lock = Lock()
+        self._closed = False
+
+    async def acquire(self) -> Worker:
+        future: Future[Worker] = Future()
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("Worker pool is shut down")
+            if self._idle:
+                future.set_result(self._idle.popleft())
+            else:
+                self._waiters.append(future)
+        try:
+            return await asyncio.wrap_future(future)
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                self.release(future.result())
+            raise
+
+    def release(self, worker: Worker) -> None:
+        with self._lock:
+            while not self._closed and self._waiters:
+                waiter = self._waiters.popleft()
+                if waiter.set_running_or_notify_cancel():
+                    waiter.set_result(worker)
+                    return
+            if not self._closed:
+                return self._idle.append(worker)
+        worker.shutdown()
+
+    def shutdown(self) -> None:
+        with self._lock:
+            self._closed = True
+            workers = list(self._idle)
+            self._idle.clear()
+            for waiter in self._waiters:
+                waiter.cancel()
+            self._waiters.clear()
+        for worker in workers:
+            worker.shutdown()
+
+
+def configure_workers(size: int) -> None:
+    """Set the number of worker threads used by the asynchronous API.
+
+    Args:
+        size (int): Maximum number of database operations running at the same time.
+    """
+    global _pool_size
+    if size < 1:
+        raise ValueError("Number of workers must be greater than 0")
+    shutdown_workers()
+    _pool_size = size
+
+
+def shutdown_workers() -> None:
+    """Close all worker threads and their connections."""
+    global _pool
+    with _pool_lock:
+        pool, _pool = _pool, None
+    if pool:
+        pool.shutdown()
+
+
+def get_worker_pool() -> WorkerPool:
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = WorkerPool(_pool_size)
+        return _pool
+
+
+def get_worker_connection() -> Connection | None:
+    return getattr(_local, "connection", None)
+
+
+async def run_in_worker(func: Callable[..., T], *args, **kwargs) -> T:
+    if worker := _pinned_worker.get():
+        return await worker.run(func, *args, **kwargs)
+    pool = get_worker_pool()
+    worker = await pool.acquire()
+    try:
+        return await worker.run(func, *args, **kwargs)
+    finally:
+        pool.release(worker)
+
+
+def _open_worker_connection() -> None:
+    _local.connection = create_connection()
+
+
+def _close_worker_connection() -> None:
+    if connection := get_worker_connection():
+        connection.close()
+        _local.connection = None
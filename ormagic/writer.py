@@ -0,0 +1,177 @@
+from concurrent.futures import Future
+from contextvars import Context, copy_context
+from functools import wraps
+from queue import Empty, SimpleQueue
+from sqlite3 import Connection
+from threading import Lock, Thread, current_thread
+from time import monotonic
+from typing import Any, Callable, NamedTuple, TypeVar
+
+from ormagic.cache import invalidate_pending_tables
+from ormagic.pool import write_connection
+from ormagic.retry import call_with_retry, measure_lock_wait
+from ormagic.transactions import transaction
+
+T = TypeVar("T")
+
+_writer: "Writer | None" = None
+_writer_lock = Lock()
+
+
+class _Write(NamedTuple):
+    future: Future
+    context: Context
+    func: Callable[..., Any]
+    args: tuple
+    kwargs: dict
+
+
+class Writer(Thread):
+    """Thread executing all writes on a single connection and committing them in groups."""
+
+    def __init__(self, max_batch_size: int, max_latency: float) -> None:
+        super().__init__(name="ormagic-writer", daemon=True)
+        self.max_batch_size = max_batch_size
+        self.max_latency = max_latency
+        self._queue: SimpleQueue[_Write | None] = SimpleQueue()
+        self._stopping = False
+        self._closed = False
+
+    def submit(self, func: Callable[..., T], *args, **kwargs) -> "Future[T]":
+        if self._closed:
+            raise RuntimeError("Writer is stopped")
+        future: Future[T] = Future()
+        self._queue.put(_Write(future, copy_context(), func, args, kwargs))
+        return future
+
+    def stop(self) -> None:
+        self._closed = True
+        self._queue.put(None)
+        self.join()
+
+    def run(self) -> None:
+        while not self._stopping:
+            if batch := self._collect_batch():
+                with write_connection() as connection:
+                    self._commit_batch(connection, batch)
+
+    def _collect_batch(self) -> list[_Write]:
+        write = self._queue.get()
+        if write is None:
+            self._stopping = True
+            return []
+        batch = [write]
+        deadline = monotonic() + self.max_latency
+        while len(batch) < self.max_batch_size:
+            try:
+                write = self._queue.get(timeout=max(deadline - monotonic(), 0))
+            except Empty:
+                break
+            if write is None:
+                self._stopping = True
+                break
+            batch.append(write)
+        return batch
+
+    def _commit_batch(self, connection: Connection, batch: list[_Write]) -> None:
+        results: list[tuple[Future, Any, BaseException | None]] = []
+        try:
+            call_with_retry(measure_lock_wait, connection.execute, "BEGIN IMMEDIATE")
+            for write in batch:
+                if write.future.set_running_or_notify_cancel():
+                    results.append(self._execute(connection, write))
+            connection.execute("COMMIT")
+        except Exception as error:
+            if connection.in_transaction:
+                connection.execute("ROLLBACK")
+            for write in batch:
+                if not write.future.done():
+                    write.future.set_exception(error)
+            return
+        finally:
+            invalidate_pending_tables(connection)
+        for future, result, write_error in results:
+            if write_error is None:
+                future.set_result(result)
+            else:
+                future.set_exception(write_error)
+
+    @staticmethod
+    def _execute(
+        connection: Connection, write: _Write
+    ) -> tuple[Future, Any, BaseException | None]:
+        connection.execute("SAVEPOINT write")
+        try:
+            result = write.context.run(
+                _call_in_transaction, connection, write.func, write.args, write.kwargs
+            )
+        except Exception as error:
+            connection.execute("ROLLBACK TO write")
+            connection.execute("RELEASE write")
+            return write.future, None, error
+        connection.execute("RELEASE write")
+        return write.future, result, None
+
+
+def _call_in_transaction(
+    connection: Connection, func: Callable[..., T], args: tuple, kwargs: dict
+) -> T:
+    with transaction._bind(connection):
+        return func(*args, **kwargs)
+
+
+def enable_write_queue(max_batch_size: int = 100, max_latency: float = 0.002) -> None:
+    """Send all writes to a single writer thread that commits them in groups.
+
+    Args:
+        max_batch_size (int, optional): Maximum number of writes committed together. Defaults to 100.
+        max_latency (float, optional): Maximum time in seconds the writer waits for more writes before committing. Defaults to 0.002.
+    """
+    global _writer
+    if max_batch_size < 1:
+        raise ValueError("Batch size must be greater than 0")
+    disable_write_queue()
+    with _writer_lock:
+        _writer = Writer(max_batch_size, max_latency)
+        _writer.start()
+
+
+def disable_write_queue() -> None:
+    """Commit all queued writes and stop the writer thread."""
+    global _writer
+    with _writer_lock:
+        writer, _writer = _writer, None
+    if writer:
+        writer.stop()
+
+
+def is_write_queued() -> bool:
+    return _get_writer_for_current_thread() is not None
+
+
+def submit_write(func: Callable[..., T], *args, **kwargs) -> "Future[T]":
+    if writer := _get_writer_for_current_thread():
+        return writer.submit(func, *args, **kwargs)
+    future: Future[T] = Future()
+    try:
+        future.set_result(func(*args, **kwargs))
+    except Exception as error:
+        future.set_exception(error)
+    return future
+
+
+def queued_write(method: Callable[..., T]) -> Callable[..., T]:
+    @wraps(method)
+    def wrapper(*args, **kwargs) -> T:
+        if is_write_queued():
+            return submit_write(method, *args, **kwargs).result()
+        return method(*args, **kwargs)
+
+    return wrapper
+
+
+def _get_writer_for_current_thread() -> Writer | None:
+    writer = _writer
+    if writer is None or current_thread() is writer or transaction.is_active():
+        return None
+    return writer
@@ -2,7 +2,17 @@ import os
 
 import pytest
 
+from ormagic.connection import configure_database
 from ormagic.cursor import get_cursor
+from ormagic.pool import disable_connection_pool
+from ormagic.workers import shutdown_workers
+from ormagic.writer import disable_write_queue
+
+
+def pytest_configure(config):
+    config.addinivalue_line(
+        "markers", "file_database: run the test with the database stored in a file"
+    )
 
 
 @pytest.fixture
@@ -12,7 +22,13 @@ def db_cursor():
 
 
 @pytest.fixture(autouse=True)
-def remove_db():
+def remove_db(request):
+    if not request.node.get_closest_marker("file_database"):
+        configure_database(":memory:")
     yield
+    disable_write_queue()
+    shutdown_workers()
+    disable_connection_pool()
+    configure_database()
     if os.path.exists("db.sqlite3"):
         os.remove("db.sqlite3")
@@ -0,0 +1,176 @@
+import asyncio
+import threading
+
+import pytest
+from pydantic import ValidationError
+
+from ormagic import DBModel, configure_workers, transaction
+from ormagic.models import ObjectNotFound
+
+
+class User(DBModel):
+    name: str
+    age: int
+
+
+@pytest.fixture(autouse=True)
+def prepare_db():
+    User.create_table()
+
+
+def test_save_and_get_object_asynchronously():
+    async def main():
+        user = await User(name="John", age=30).asave()
+        return user, await User.aget(id=user.id)
+
+    user, user_from_db = asyncio.run(main())
+
+    assert user.id == 1
+    assert user_from_db == user
+
+
+def test_filter_and_all_asynchronously():
+    async def main():
+        await asyncio.gather(
+            *(User(name=f"User {i}", age=i).asave() for i in range(1, 6))
+        )
+        return await User.afilter(age__gt=3), await User.aall()
+
+    filtered, all_users = asyncio.run(main())
+
+    assert {user.age for user in filtered} == {4, 5}
+    assert len(all_users) == 5
+
+
+def test_delete_object_asynchronously():
+    async def main():
+        user = await User(name="John", age=30).asave()
+        await user.adelete()
+        await User.aget(id=user.id)
+
+    with pytest.raises(ObjectNotFound):
+        asyncio.run(main())
+
+
+def test_create_update_and_drop_table_asynchronously(db_cursor):
+    class Team(DBModel):
+        name: str
+
+    async def main():
+        await Team.acreate_table()
+        await Team.aupdate_table()
+        await Team(name="Barcelona").asave()
+        assert len(await Team.aall()) == 1
+        await Team.adrop_table()
+
+    asyncio.run(main())
+
+    db_cursor.execute("SELECT count(*) FROM sqlite_master WHERE name='team'")
+    assert db_cursor.fetchone()[0] == 0
+
+
+def test_operations_do_not_run_in_event_loop_thread():
+    event_loop_thread = threading.get_ident()
+    threads = set()
+
+    class Tracked(DBModel):
+        name: str
+
+        def save(self):
+            threads.add(threading.get_ident())
+            return super().save()
+
+    Tracked.create_table()
+
+    async def main():
+        await Tracked(name="test").asave()
+
+    asyncio.run(main())
+
+    assert threads and event_loop_thread not in threads
+
+
+def test_number_of_concurrent_operations_is_bounded():
+    configure_workers(2)
+    running = 0
+    max_running = 0
+    lock = threading.Lock()
+
+    class Slow(DBModel):
+        name: str
+
+        @classmethod
+        def all(cls, *args, **kwargs):
+            nonlocal running, max_running
+            with lock:
+                running += 1
+                max_running = max(max_running, running)
+            threading.Event().wait(0.02)
+            with lock:
+                running -= 1
+            return super().all(*args, **kwargs)
+
+    Slow.create_table()
+
+    async def main():
+        await asyncio.gather(*(Slow.aall() for _ in range(6)))
+
+    asyncio.run(main())
+
+    assert max_running == 2
+
+
+def test_commit_async_transaction():
+    async def main():
+        async with transaction():
+            await User(name="John", age=30).asave()
+            await User(name="Jane", age=25).asave()
+            assert transaction.is_active() is True
+
+    asyncio.run(main())
+
+    assert len(User.all()) == 2
+
+
+def test_rollback_async_transaction():
+    async def main():
+        async with transaction():
+            await User(name="John", age=30).asave()
+            await User(name="Jane").asave()  # type: ignore
+
+    with pytest.raises(ValidationError):
+        asyncio.run(main())
+
+    assert len(User.all()) == 0
+
+
+@pytest.mark.file_database
+def test_async_transaction_is_isolated_from_other_tasks():
+    configure_workers(2)
+
+    async def main():
+        started = asyncio.Event()
+        finish = asyncio.Event()
+
+        async def in_transaction():
+            async with transaction():
+                await User(name="John", age=30).asave()
+                started.set()
+                await finish.wait()
+
+        async def outside_transaction():
+            await started.wait()
+            users = await User.aall()
+            finish.set()
+            return users
+
+        _, users = await asyncio.gather(in_transaction(), outside_transaction())
+        return users
+
+    assert asyncio.run(main()) == []
+    assert len(User.all()) == 1
+
+
+def test_configure_workers_with_invalid_size():
+    with pytest.raises(ValueError):
+        configure_workers(0)
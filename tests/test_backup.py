@@ -0,0 +1,114 @@
+import sqlite3
+
+import pytest
+
+from ormagic import (
+    DBModel,
+    backup,
+    configure_cache,
+    enable_connection_pool,
+    restore,
+    snapshot,
+    transaction,
+)
+
+
+class User(DBModel):
+    name: str
+
+
+@pytest.fixture(autouse=True)
+def prepare_db():
+    User.create_table()
+    for i in range(200):
+        User(name=f"User {i}" * 50).save()
+
+
+def test_backup_database(tmp_path):
+    backup(tmp_path / "backup.sqlite3")
+
+    connection = sqlite3.connect(tmp_path / "backup.sqlite3")
+    assert connection.execute("SELECT count(*) FROM user").fetchone() == (200,)
+
+
+def test_backup_reports_progress(tmp_path):
+    steps = []
+
+    backup(
+        tmp_path / "backup.sqlite3",
+        pages_per_step=1,
+        sleep=0,
+        progress=lambda copied, total: steps.append((copied, total)),
+    )
+
+    total = steps[-1][1]
+    assert len(steps) == total > 1
+    assert steps == [(copied, total) for copied in range(1, total + 1)]
+
+
+@pytest.mark.file_database
+def test_backup_database_with_connection_pool(tmp_path):
+    enable_connection_pool()
+
+    backup(tmp_path / "backup.sqlite3")
+
+    connection = sqlite3.connect(tmp_path / "backup.sqlite3")
+    assert connection.execute("SELECT count(*) FROM user").fetchone() == (200,)
+
+
+def test_backup_with_invalid_pages_per_step(tmp_path):
+    with pytest.raises(ValueError):
+        backup(tmp_path / "backup.sqlite3", pages_per_step=0)
+
+
+def test_restore_database(tmp_path):
+    backup(tmp_path / "backup.sqlite3")
+    User.get(id=1).delete()
+    User(name="New").save()
+
+    restore(tmp_path / "backup.sqlite3")
+
+    assert User.count() == 200
+    assert User.get(id=1).name.startswith("User 0")
+
+
+def test_restore_clears_query_cache(tmp_path):
+    class Country(DBModel, cache=True):
+        name: str
+
+    configure_cache()
+    Country.create_table()
+    backup(tmp_path / "backup.sqlite3")
+    Country(name="Poland").save()
+    assert Country.count() == 1
+
+    restore(tmp_path / "backup.sqlite3")
+
+    assert Country.count() == 0
+
+
+def test_restore_clears_schema_fingerprint(tmp_path, db_cursor):
+    DBModel.sync_all(User)
+    backup(tmp_path / "backup.sqlite3")
+
+    restore(tmp_path / "backup.sqlite3")
+
+    db_cursor.execute("SELECT fingerprint FROM _ormagic_schema")
+    assert db_cursor.fetchall() == []
+
+
+def test_restore_inside_transaction(tmp_path):
+    backup(tmp_path / "backup.sqlite3")
+
+    with pytest.raises(RuntimeError):
+        with transaction():
+            restore(tmp_path / "backup.sqlite3")
+
+
+def test_snapshot_to_memory():
+    connection = snapshot()
+    User(name="New").save()
+
+    assert connection.execute("SELECT count(*) FROM user").fetchone() == (200,)
+    with pytest.raises(sqlite3.OperationalError):
+        connection.execute("DELETE FROM user")
@@ -0,0 +1,104 @@
+from datetime import date, datetime, timezone
+from decimal import Decimal
+from typing import Optional
+
+import pytest
+
+from ormagic import DBModel
+
+np = pytest.importorskip("numpy")
+
+
+class Team(DBModel):
+    name: str
+
+
+class Product(DBModel):
+    name: str
+    price: Decimal
+    qty: int
+    discount: Optional[float] = None
+    stock: Optional[int] = None
+    available: bool = True
+    released: date
+    updated_at: Optional[datetime] = None
+    tags: list[str] = []
+    team: Optional[Team] = None
+
+
+@pytest.fixture(autouse=True)
+def prepare_db():
+    Team.create_table()
+    Product.create_table()
+    team = Team(name="Shop").save()
+    Product(
+        name="Apple",
+        price=Decimal("1.5"),
+        qty=10,
+        released=date(2024, 1, 1),
+        updated_at=datetime(2024, 5, 1, 12, 0, tzinfo=timezone.utc),
+        tags=["fruit"],
+        team=team,
+    ).save()
+    Product(
+        name="Pear",
+        price=Decimal("2.25"),
+        qty=5,
+        discount=0.1,
+        stock=3,
+        available=False,
+        released=date(2024, 2, 1),
+    ).save()
+
+
+def test_fetch_columns_with_dtypes_from_field_types():
+    columns = Product.query().to_columns(
+        "id", "price", "qty", "discount", "stock", "available", "team"
+    )
+
+    assert columns["id"].dtype == np.int64
+    assert columns["price"].tolist() == [1.5, 2.25]
+    assert columns["price"].dtype == np.float64
+    assert columns["qty"].tolist() == [10, 5]
+    assert columns["qty"].dtype == np.int64
+    assert np.isnan(columns["discount"][0])
+    assert columns["discount"][1] == 0.1
+    assert columns["stock"].dtype == np.float64
+    assert columns["available"].tolist() == [True, False]
+    assert columns["available"].dtype == np.bool_
+    assert columns["team"].dtype == np.float64
+
+
+def test_fetch_date_and_datetime_columns():
+    columns = Product.query().to_columns("released", "updated_at")
+
+    assert columns["released"].tolist() == [date(2024, 1, 1), date(2024, 2, 1)]
+    assert columns["updated_at"][0] == np.datetime64("2024-05-01T12:00:00")
+    assert np.isnat(columns["updated_at"][1])
+
+
+def test_fetch_object_columns():
+    columns = Product.query().to_columns("name", "tags")
+
+    assert columns["name"].dtype == object
+    assert columns["name"].tolist() == ["Apple", "Pear"]
+    assert columns["tags"].tolist() == [["fruit"], []]
+
+
+def test_fetch_all_columns_of_filtered_objects_in_batches():
+    columns = Product.query(qty__gt=1, order_by="-qty").to_columns(batch_size=1)
+
+    assert list(columns) == list(Product.model_fields)
+    assert columns["name"].tolist() == ["Apple", "Pear"]
+
+
+def test_fetch_columns_of_no_objects():
+    columns = Product.query(qty__gt=100).to_columns("qty", "name")
+
+    assert columns["qty"].dtype == np.int64
+    assert len(columns["qty"]) == len(columns["name"]) == 0
+
+
+def test_fetch_invalid_column():
+    with pytest.raises(ValueError):
+        Product.query().to_columns("weight")
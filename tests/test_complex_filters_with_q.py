@@ -79,7 +79,7 @@ def test_create_q_object_with_not_equal_operator():
 def test_create_q_object_with_two_operators():
     q = Q(name="Alice", age__gt=25)
 
-    assert q.conditions == "(name = ? AND age > ?)"
+    assert q.conditions == "name = ? AND age > ?"
     assert q.params == ["Alice", 25]
 
 
@@ -88,7 +88,7 @@ def test_create_q_object_with_two_q_objects_inside():
     q2 = Q(age__lt=25)
     q = Q(q1 | q2)
 
-    assert q.conditions == "(name = ? OR age < ?)"
+    assert q.conditions == "name = ? OR age < ?"
 
 
 def test_combine_two_q_objects_with_or_operator():
@@ -105,7 +105,7 @@ def test_combine_two_q_objects_with_and_operator():
     q2 = Q(weight__gte=70)
     q = q1 & q2
 
-    assert q.conditions == "(age BETWEEN ? AND ?) AND weight >= ?"
+    assert q.conditions == "age BETWEEN ? AND ? AND weight >= ?"
     assert q.params == [25, 35, 70]
 
 
@@ -139,6 +139,81 @@ def test_combine_multiple_q_objects_inside_other_q_objects():
 
     assert (
         q.conditions
-        == "(name = ? AND age < ? OR weight >= ?) OR (name = ? AND age > ? OR weight <= ?)"
+        == "name = ? AND age < ? OR weight >= ? OR name = ? AND age > ? OR weight <= ?"
     )
     assert q.params == ["Alice", 25, 70, "Bob", 30, 80]
+
+
+def test_combine_q_objects_with_or_inside_and_operator():
+    q1 = Q(name="Alice")
+    q2 = Q(age__lt=25)
+    q3 = Q(weight__gte=70)
+    q = (q1 | q2) & q3
+
+    assert q.conditions == "(name = ? OR age < ?) AND weight >= ?"
+    assert q.params == ["Alice", 25, 70]
+
+
+def test_nested_q_objects_with_the_same_operator_are_flattened():
+    q = Q(name="Alice") | (Q(age__lt=25) | Q(weight__gte=70))
+
+    assert len(q.children) == 3
+    assert q.conditions == "name = ? OR age < ? OR weight >= ?"
+
+
+def test_duplicate_conditions_are_removed():
+    q = Q(name="Alice") | Q(age__lt=25) | Q(name="Alice")
+
+    assert q.conditions == "name = ? OR age < ?"
+    assert q.params == ["Alice", 25]
+
+
+def test_double_negation_is_removed():
+    q = ~~Q(name="Alice")
+
+    assert q == Q(name="Alice")
+    assert q.conditions == "name = ?"
+
+
+def test_combining_q_objects_does_not_modify_them():
+    q1 = Q(name="Alice")
+    q2 = Q(age__lt=25)
+
+    q1 | q2
+    q1 & ~q2
+
+    assert q1.conditions == "name = ?"
+    assert q2.conditions == "age < ?"
+    with pytest.raises(AttributeError):
+        q1.negated = True  # type: ignore
+
+
+def test_reuse_q_object_in_many_queries(prepare_db):
+    class User(DBModel):
+        name: str
+        age: int
+
+    adults = Q(age__gte=30)
+
+    assert len(User.filter(adults)) == 3
+    assert len(User.filter(adults, name="Alice")) == 1
+    assert len(User.filter(adults | Q(name="Bob"))) == 4
+    assert len(User.filter(adults)) == 3
+
+
+def test_filter_with_or_q_object_and_keyword_arguments(prepare_db):
+    class User(DBModel):
+        name: str
+        age: int
+
+    users = User.filter(Q(name="Alice") | Q(name="Bob"), age__lt=30)
+
+    assert len(users) == 1
+    assert users[0].name == "Bob"
+
+
+def test_q_objects_with_the_same_structure_have_the_same_shape():
+    assert (Q(name="Alice") | Q(age__in=[1, 2])).shape == (
+        Q(name="Bob") | Q(age__in=[3, 4])
+    ).shape
+    assert Q(age__in=[1]).shape != Q(age__in=[1, 2]).shape
@@ -0,0 +1,85 @@
+from concurrent.futures import ThreadPoolExecutor
+from sqlite3 import OperationalError
+
+import pytest
+
+from ormagic import (
+    DBModel,
+    disable_connection_pool,
+    enable_connection_pool,
+    transaction,
+)
+from ormagic.cursor import get_cursor, get_read_cursor
+
+
+class User(DBModel):
+    name: str
+    age: int
+
+
+@pytest.fixture(autouse=True)
+def connection_pool():
+    User.create_table()
+    enable_connection_pool(read_connections=2)
+    yield
+    disable_connection_pool()
+
+
+def test_read_cursor_is_read_only():
+    with get_read_cursor() as cursor:
+        assert cursor.execute("PRAGMA query_only").fetchone()[0] == 1
+        with pytest.raises(OperationalError):
+            cursor.execute("INSERT INTO user (name, age) VALUES ('John', 30)")
+
+
+def test_writes_use_single_connection():
+    with get_cursor() as first_cursor, get_cursor() as second_cursor:
+        assert first_cursor.connection is second_cursor.connection
+
+
+def test_reads_see_committed_writes():
+    user = User(name="John", age=30).save()
+
+    assert User.get(id=user.id) == user
+    assert User.filter(name="John") == [user]
+    assert User.all() == [user]
+    assert User.count() == 1
+
+
+def test_read_connections_are_reused():
+    with get_read_cursor() as cursor:
+        connection = cursor.connection
+
+    with get_read_cursor() as cursor:
+        assert cursor.connection is connection
+
+
+@pytest.mark.file_database
+def test_reads_inside_transaction_see_uncommitted_writes():
+    with transaction():
+        User(name="John", age=30).save()
+        assert User.count() == 1
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            assert executor.submit(User.count).result() == 0
+
+    assert User.count() == 1
+
+
+def test_concurrent_reads_and_writes():
+    def write(i):
+        return User(name=f"User {i}", age=i + 1).save()
+
+    def read(_):
+        return User.count()
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        writes = [executor.submit(write, i) for i in range(20)]
+        reads = [executor.submit(read, i) for i in range(20)]
+        [future.result() for future in writes + reads]
+
+    assert User.count() == 20
+
+
+def test_enable_connection_pool_with_invalid_size():
+    with pytest.raises(ValueError):
+        enable_connection_pool(read_connections=0)
@@ -0,0 +1,18 @@
+from ormagic import DBModel, Q
+
+
+class User(DBModel):
+    name: str
+    age: int
+
+
+def test_count_objects(db_cursor):
+    User.create_table()
+    User(name="John", age=30).save()
+    User(name="Jane", age=25).save()
+    User(name="Doe", age=35).save()
+
+    assert User.count() == 3
+    assert User.count(age__gte=30) == 2
+    assert User.count(Q(name="John") | Q(name="Jane")) == 2
+    assert User.count(name="Alice") == 0
@@ -0,0 +1,84 @@
+import sqlite3
+import subprocess
+import sys
+
+import pytest
+
+from ormagic import DBModel, configure_cache
+from ormagic.cache import get_query_cache
+
+pytestmark = pytest.mark.file_database
+
+
+class Country(DBModel, cache=True):
+    name: str
+
+
+class Currency(DBModel, cache=True):
+    code: str
+
+
+@pytest.fixture(autouse=True)
+def prepare_db():
+    configure_cache(cross_process=True)
+    Country.create_table()
+    Currency.create_table()
+    Country(name="Poland").save()
+    Currency(code="PLN").save()
+    yield
+    configure_cache()
+
+
+def _execute_in_other_process(sql: str) -> None:
+    code = f"import sqlite3; sqlite3.connect('db.sqlite3').execute({sql!r}).connection.commit()"
+    subprocess.run([sys.executable, "-c", code], check=True)
+
+
+def test_create_table_installs_change_triggers(db_cursor):
+    db_cursor.execute(
+        "SELECT name FROM sqlite_master WHERE type='trigger' AND tbl_name='country' ORDER BY name"
+    )
+    assert [row[0] for row in db_cursor.fetchall()] == [
+        "_ormagic_changes_country_delete",
+        "_ormagic_changes_country_insert",
+        "_ormagic_changes_country_update",
+    ]
+
+
+def test_change_in_other_process_invalidates_cache():
+    assert Country.get(id=1).name == "Poland"
+
+    _execute_in_other_process("UPDATE country SET name='Germany'")
+
+    assert Country.get(id=1).name == "Germany"
+
+
+def test_change_in_other_connection_invalidates_cache():
+    assert Country.count() == 1
+
+    connection = sqlite3.connect("db.sqlite3")
+    connection.execute("INSERT INTO country (name) VALUES ('Germany')")
+    connection.commit()
+    connection.close()
+
+    assert Country.count() == 2
+
+
+def test_change_of_other_table_keeps_cached_results():
+    Country.get(id=1)
+    Currency.get(id=1)
+
+    _execute_in_other_process("UPDATE currency SET code='EUR'")
+
+    assert Currency.get(id=1).code == "EUR"
+    hits = get_query_cache().hits
+    Country.get(id=1)
+    assert get_query_cache().hits == hits + 1
+
+
+def test_cached_results_are_served_when_nothing_changed():
+    Country.get(id=1)
+    Country.get(id=1)
+    Country.get(id=1)
+
+    assert get_query_cache().hits == 2
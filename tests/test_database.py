@@ -0,0 +1,73 @@
+import os
+import sqlite3
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from ormagic import DBModel, configure_database, enable_connection_pool
+from ormagic.connection import get_database, is_memory_database
+
+
+class User(DBModel):
+    name: str
+
+
+def test_memory_database_is_kept_between_connections():
+    configure_database(":memory:")
+    User.create_table()
+    User(name="John").save()
+
+    assert User.get(id=1).name == "John"
+    assert is_memory_database()
+    assert not os.path.exists("db.sqlite3")
+
+
+def test_configure_new_memory_database():
+    configure_database(":memory:")
+    User.create_table()
+    User(name="John").save()
+
+    configure_database(":memory:")
+
+    with pytest.raises(sqlite3.OperationalError):
+        User.all()
+
+
+def test_memory_database_with_connection_pool():
+    configure_database(":memory:")
+    enable_connection_pool(4)
+    User.create_table()
+
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        list(executor.map(lambda i: User(name=f"User {i}").save(), range(20)))
+        counts = list(executor.map(lambda _: User.count(), range(20)))
+
+    assert set(counts) == {20}
+
+
+def test_shared_cache_memory_database():
+    configure_database("file::memory:?cache=shared")
+    User.create_table()
+    User(name="John").save()
+
+    assert User.get(id=1).name == "John"
+    assert is_memory_database()
+
+
+@pytest.mark.file_database
+def test_configure_file_database(tmp_path):
+    path = str(tmp_path / "app.sqlite3")
+    configure_database(path)
+    User.create_table()
+    User(name="John").save()
+
+    assert get_database() == path
+    assert not is_memory_database()
+    assert os.path.exists(path)
+    assert not os.path.exists("db.sqlite3")
+
+
+@pytest.mark.file_database
+def test_default_database():
+    assert get_database() == "db.sqlite3"
+    assert not is_memory_database()
@@ -0,0 +1,202 @@
+import asyncio
+import json
+import sqlite3
+from datetime import datetime
+from decimal import Decimal
+from typing import Optional
+
+import pytest
+from pydantic import ValidationError, field_validator
+
+from ormagic import DBModel, Q
+
+
+class Team(DBModel):
+    name: str
+
+
+class Player(DBModel):
+    name: str
+    nickname: Optional[str] = None
+    born: datetime
+    salary: Decimal
+    active: bool = True
+    photo: bytes = b""
+    stats: dict = {}
+    team: Optional[Team] = None
+
+
+@pytest.fixture(autouse=True)
+def prepare_db():
+    Team.create_table()
+    Player.create_table()
+    team = Team(name="Inter Miami").save()
+    Player(
+        name="Messi",
+        nickname="La Pulga",
+        born=datetime(1987, 6, 24),
+        salary=Decimal("20.45"),
+        photo=b"\x00\xff",
+        stats={"goals": 821},
+        team=team,
+    ).save()
+    Player(
+        name="Ronaldo",
+        born=datetime(1985, 2, 5),
+        salary=Decimal("200"),
+        active=False,
+    ).save()
+
+
+def _clear_players():
+    Player.drop_table()
+    Player.create_table()
+
+
+def test_export_to_jsonl(tmp_path):
+    count = Player.export(tmp_path / "players.jsonl")
+
+    lines = (tmp_path / "players.jsonl").read_text().splitlines()
+    assert count == 2
+    assert json.loads(lines[0]) == {
+        "id": 1,
+        "name": "Messi",
+        "nickname": "La Pulga",
+        "born": "1987-06-24 00:00:00.000000",
+        "salary": "20.45",
+        "active": 1,
+        "photo": "AP8=",
+        "stats": {"goals": 821},
+        "team": 1,
+    }
+
+
+def test_export_to_csv(tmp_path):
+    Player.export(tmp_path / "players.csv", format="csv")
+
+    assert (tmp_path / "players.csv").read_text().splitlines() == [
+        "id,name,nickname,born,salary,active,photo,stats,team",
+        '1,Messi,La Pulga,1987-06-24 00:00:00.000000,20.45,1,AP8=,"{""goals"":821}",1',
+        "2,Ronaldo,,1985-02-05 00:00:00.000000,200,0,,{},",
+    ]
+
+
+def test_export_filtered_objects(tmp_path):
+    count = Player.export(
+        tmp_path / "players.jsonl", Q(active=False) | Q(name="Pele"), order_by="-id"
+    )
+
+    lines = (tmp_path / "players.jsonl").read_text().splitlines()
+    assert count == 1
+    assert json.loads(lines[0])["name"] == "Ronaldo"
+
+
+@pytest.mark.parametrize("format", ["jsonl", "csv"])
+def test_export_and_import(tmp_path, format):
+    players = Player.all()
+    Player.export(tmp_path / "players", format=format, batch_size=1)
+    _clear_players()
+
+    count = Player.import_(tmp_path / "players", format=format, batch_size=1)
+
+    assert count == 2
+    assert Player.all() == players
+
+
+@pytest.mark.parametrize("format, nickname", [("jsonl", ""), ("csv", None)])
+def test_import_empty_string_of_optional_field(tmp_path, format, nickname):
+    Player(name="Pele", nickname="", born=datetime(1940, 10, 23), salary=1).save()
+    Player.export(tmp_path / "players", format=format, name="Pele")
+    _clear_players()
+
+    Player.import_(tmp_path / "players", format=format)
+
+    assert Player.get(name="Pele").nickname == nickname
+
+
+def test_import_without_primary_keys(tmp_path):
+    (tmp_path / "players.jsonl").write_text(
+        '{"name": "Pele", "born": "1940-10-23", "salary": "1.5"}\n\n'
+        '{"name": "Zico", "born": "1953-03-03T10:00:00", "salary": 3, "team": 1}\n'
+    )
+
+    Player.import_(tmp_path / "players.jsonl")
+
+    pele = Player.get(name="Pele")
+    assert pele.id == 3
+    assert pele.born == datetime(1940, 10, 23)
+    assert pele.salary == Decimal("1.5")
+    assert pele.active is True
+    assert Player.get(name="Zico").team.name == "Inter Miami"
+
+
+def test_import_validates_rows_in_batches(tmp_path):
+    (tmp_path / "players.jsonl").write_text(
+        '{"name": "Pele", "born": "1940-10-23", "salary": 1}\n'
+        '{"name": "Zico", "born": "1953-03-03", "salary": 3}\n'
+        '{"name": "Kaka", "born": "not a date", "salary": 3}\n'
+    )
+
+    with pytest.raises(ValidationError):
+        Player.import_(tmp_path / "players.jsonl", batch_size=2)
+
+    assert [player.name for player in Player.all()] == [
+        "Messi",
+        "Ronaldo",
+        "Pele",
+        "Zico",
+    ]
+
+
+def test_import_runs_model_validators(tmp_path):
+    class Fan(DBModel):
+        email: str
+        team: Team
+
+        @field_validator("email")
+        @classmethod
+        def check_email(cls, value: str) -> str:
+            if "@" not in value:
+                raise ValueError("Invalid email")
+            return value.lower()
+
+    Fan.create_table()
+    (tmp_path / "fans.jsonl").write_text(
+        '{"email": "FAN@EXAMPLE.COM", "team": 1}\n{"email": "NOPE", "team": 1}\n'
+    )
+
+    with pytest.raises(ValidationError, match="Invalid email"):
+        Fan.import_(tmp_path / "fans.jsonl", batch_size=1)
+
+    fans = Fan.all()
+    assert [fan.email for fan in fans] == ["fan@example.com"]
+    assert fans[0].team.name == "Inter Miami"
+
+
+def test_import_is_rolled_back_for_failed_batch(tmp_path):
+    (tmp_path / "players.jsonl").write_text(
+        '{"name": "Pele", "born": "1940-10-23", "salary": 1}\n'
+        '{"id": 1, "name": "Zico", "born": "1953-03-03", "salary": 3}\n'
+    )
+
+    with pytest.raises(sqlite3.IntegrityError):
+        Player.import_(tmp_path / "players.jsonl")
+
+    assert Player.count() == 2
+
+
+def test_export_with_invalid_options(tmp_path):
+    with pytest.raises(ValueError):
+        Player.export(tmp_path / "players.xml", format="xml")  # type: ignore
+    with pytest.raises(ValueError):
+        Player.import_(tmp_path / "players.jsonl", batch_size=0)
+
+
+def test_export_and_import_asynchronously(tmp_path):
+    async def export_and_import():
+        await Player.aexport(tmp_path / "players.jsonl")
+        _clear_players()
+        return await Player.aimport_(tmp_path / "players.jsonl")
+
+    assert asyncio.run(export_and_import()) == 2
+    assert Player.count() == 2
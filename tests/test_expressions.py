@@ -0,0 +1,158 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from ormagic import DBModel, F, Q
+from ormagic.expressions import Expression
+from ormagic.statement_cache import prepare_query
+
+
+class Product(DBModel):
+    name: str
+    price: float
+    stock: int
+    reserved: int = 0
+    views: int = 0
+    data: dict = {}
+
+
+@pytest.fixture(autouse=True)
+def prepare_db():
+    Product.create_table()
+    Product(name="Apple", price=2.0, stock=10, reserved=2, data={"sold": 5}).save()
+    Product(name="Pear", price=3.0, stock=3, reserved=5, data={"sold": 1}).save()
+    Product(name="Plum", price=1.0, stock=7, reserved=7, data={"sold": 9}).save()
+
+
+def test_compile_expression():
+    expression = (F("price") * (F("stock") - F("reserved")) + 1) / 2
+
+    assert expression.compile() == (
+        "((price * (stock - reserved)) + ?) / ?",
+        [1, 2],
+    )
+    assert expression.params == [1, 2]
+    assert expression == (F("price") * (F("stock") - F("reserved")) + 1) / 2
+    assert (
+        expression.shape == ((F("price") * (F("stock") - F("reserved")) + 7) / 3).shape
+    )
+
+
+def test_compile_expression_with_value_on_the_left():
+    assert (10 - F("stock")).compile() == ("? - stock", [10])
+    assert (2 * F("stock") % 3).compile() == ("(? * stock) % ?", [2, 3])
+
+
+def test_invalid_field_name():
+    with pytest.raises(ValueError):
+        F("stock; DROP TABLE product")
+
+
+def test_expressions_are_immutable():
+    with pytest.raises(AttributeError):
+        F("stock").name = "price"  # type: ignore
+
+
+def test_expression_without_compile_cannot_be_created():
+    class Incomplete(Expression):
+        params = []
+        shape = None
+
+        def _key(self):
+            return ()
+
+    with pytest.raises(TypeError, match="compile"):
+        Incomplete()
+
+
+def test_increment_field():
+    count = Product.query(name="Apple").update(views=F("views") + 1)
+    Product.query(name="Apple").update(views=F("views") + 1)
+
+    assert count == 1
+    assert Product.get(name="Apple").views == 2
+    assert Product.get(name="Pear").views == 0
+
+
+def test_update_with_expressions_and_values():
+    Product.query().update(stock=F("stock") - F("reserved"), reserved=0)
+
+    assert [(p.stock, p.reserved) for p in Product.all()] == [(8, 0), (-2, 0), (0, 0)]
+
+
+def test_concurrent_increments_are_not_lost():
+    def increment(_):
+        Product.query(name="Apple").update(views=F("views") + 1)
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        list(executor.map(increment, range(50)))
+
+    assert Product.get(name="Apple").views == 50
+
+
+def test_filter_by_expression():
+    products = Product.filter(stock__lt=F("reserved"))
+    assert [product.name for product in products] == ["Pear"]
+
+    products = Product.filter(stock__gte=F("reserved") + 3)
+    assert [product.name for product in products] == ["Apple"]
+
+    products = Product.filter(stock=F("reserved"))
+    assert [product.name for product in products] == ["Plum"]
+
+
+def test_filter_by_expression_in_q():
+    products = Product.filter(Q(stock__lte=F("reserved")) | Q(price__gt=1.5))
+
+    assert [product.name for product in products] == ["Apple", "Pear", "Plum"]
+    assert Product.count(~Q(stock__lte=F("reserved") * 2), name__like="P%") == 0
+
+
+def test_filter_by_json_key_expression():
+    products = Product.filter(stock__lt=F("data__sold"))
+
+    assert [product.name for product in products] == ["Plum"]
+
+
+def test_expression_cannot_be_used_in_multi_value_lookups():
+    with pytest.raises(ValueError):
+        Product.filter(stock__in=F("reserved"))
+
+
+def test_order_by_expression():
+    products = Product.filter(order_by=F("stock") - F("reserved"))
+    assert [product.name for product in products] == ["Pear", "Plum", "Apple"]
+
+    products = Product.filter(order_by=(F("price") * F("stock")).desc())
+    assert [product.name for product in products] == ["Apple", "Pear", "Plum"]
+
+    products = Product.filter(order_by=[(F("stock") % 2).asc(), "-name"])
+    assert [product.name for product in products] == ["Apple", "Plum", "Pear"]
+
+
+def test_parameters_of_expressions_are_bound_in_order():
+    query, params = prepare_query(
+        Product,
+        "SELECT * FROM product",
+        Q(price__gt=F("stock") / 4),
+        stock__lt=F("reserved") + 3,
+        order_by=(F("price") * 2).desc(),
+        limit=10,
+    )
+
+    assert query == (
+        "SELECT * FROM product WHERE stock < reserved + ? AND price > stock / ? "
+        "ORDER BY price * ? DESC LIMIT ?"
+    )
+    assert params == [3, 4, 2, 10]
+
+
+def test_statement_cache_uses_shape_of_expressions():
+    first = prepare_query(Product, "SELECT * FROM product", stock__lt=F("reserved") + 1)
+    second = prepare_query(
+        Product, "SELECT * FROM product", stock__lt=F("reserved") + 5
+    )
+    third = prepare_query(Product, "SELECT * FROM product", stock__lt=F("views") + 5)
+
+    assert first[0] == second[0] != third[0]
+    assert (first[1], second[1]) == ([1], [5])
@@ -0,0 +1,226 @@
+from datetime import date, datetime, timedelta, timezone
+from decimal import Decimal
+from typing import Optional
+
+import pytest
+
+from ormagic import DBModel, Q
+
+
+class Measurement(DBModel):
+    value: float
+    active: bool
+    payload: bytes
+    measured_at: datetime
+    measured_on: date
+    price: Decimal
+    note: Optional[str] = None
+
+
+@pytest.fixture
+def measurement():
+    Measurement.create_table()
+    return Measurement(
+        value=1.5,
+        active=True,
+        payload=b"\x00\x01binary",
+        measured_at=datetime(2024, 5, 1, 12, 30, 15, 250),
+        measured_on=date(2024, 5, 1),
+        price=Decimal("19.99"),
+    ).save()
+
+
+def test_create_table_with_native_types(db_cursor):
+    Measurement.create_table()
+
+    db_cursor.execute("PRAGMA table_info(measurement)")
+    assert [column[2] for column in db_cursor.fetchall()] == [
+        "INTEGER",
+        "REAL",
+        "INTEGER",
+        "BLOB",
+        "TEXT",
+        "TEXT",
+        "TEXT",
+        "TEXT",
+    ]
+
+
+def test_save_native_types(measurement, db_cursor):
+    db_cursor.execute(
+        "SELECT typeof(value), typeof(active), typeof(payload), typeof(measured_at), typeof(price) FROM measurement"
+    )
+    assert db_cursor.fetchone() == ("real", "integer", "blob", "text", "text")
+
+    db_cursor.execute(
+        "SELECT active, payload, measured_at, measured_on FROM measurement"
+    )
+    assert db_cursor.fetchone() == (
+        1,
+        b"\x00\x01binary",
+        "2024-05-01 12:30:15.000250",
+        "2024-05-01",
+    )
+
+
+def test_read_native_types(measurement):
+    measurement_from_db = Measurement.get(id=measurement.id)
+
+    assert measurement_from_db == measurement
+    assert isinstance(measurement_from_db.price, Decimal)
+    assert measurement_from_db.price == Decimal("19.99")
+
+
+def test_save_falsy_values():
+    Measurement.create_table()
+    Measurement(
+        value=0.0,
+        active=False,
+        payload=b"",
+        measured_at=datetime(2024, 1, 1),
+        measured_on=date(2024, 1, 1),
+        price=Decimal("0"),
+        note="",
+    ).save()
+
+    measurement = Measurement.get(id=1)
+
+    assert measurement.value == 0.0
+    assert measurement.active is False
+    assert measurement.payload == b""
+    assert measurement.price == Decimal("0")
+    assert measurement.note == ""
+
+
+def test_update_native_types(measurement):
+    measurement.active = False
+    measurement.price = Decimal("5.25")
+    measurement.save()
+
+    measurement_from_db = Measurement.get(id=measurement.id)
+    assert measurement_from_db.active is False
+    assert measurement_from_db.price == Decimal("5.25")
+
+
+def test_timezone_aware_datetime_is_stored_in_utc(db_cursor):
+    Measurement.create_table()
+    measured_at = datetime(2024, 5, 1, 14, 0, tzinfo=timezone(timedelta(hours=2)))
+    Measurement(
+        value=1,
+        active=True,
+        payload=b"",
+        measured_at=measured_at,
+        measured_on=date(2024, 5, 1),
+        price=Decimal("1"),
+    ).save()
+
+    db_cursor.execute("SELECT measured_at FROM measurement")
+    assert db_cursor.fetchone() == ("2024-05-01 12:00:00.000000+00:00",)
+    assert Measurement.get(id=1).measured_at == measured_at
+
+
+def test_filter_by_datetime_range():
+    Measurement.create_table()
+    for day in range(1, 11):
+        Measurement(
+            value=day * 0.5,
+            active=day % 2 == 0,
+            payload=b"",
+            measured_at=datetime(2024, 5, day, 9, 0, 0, 1 if day == 3 else 0),
+            measured_on=date(2024, 5, day),
+            price=Decimal(day),
+        ).save()
+
+    measurements = Measurement.filter(
+        measured_at__gte=datetime(2024, 5, 3), measured_at__lt=datetime(2024, 5, 10)
+    )
+    assert [measurement.measured_on.day for measurement in measurements] == [
+        3,
+        4,
+        5,
+        6,
+        7,
+        8,
+        9,
+    ]
+    assert (
+        Measurement.count(measured_on__between=(date(2024, 5, 2), date(2024, 5, 4)))
+        == 3
+    )
+    assert Measurement.count(Q(active=True) & Q(value__gt=2.5)) == 3
+    assert Measurement.count(price__gte=Decimal("9.5")) == 1
+
+
+def test_decimal_round_trip_is_exact():
+    Measurement.create_table()
+    prices = [Decimal("12345678901234567.89"), Decimal("10.00"), Decimal("-0.10")]
+    for price in prices:
+        Measurement(
+            value=1,
+            active=True,
+            payload=b"",
+            measured_at=datetime(2024, 5, 1),
+            measured_on=date(2024, 5, 1),
+            price=price,
+        ).save()
+
+    assert [str(measurement.price) for measurement in Measurement.all()] == [
+        "12345678901234567.89",
+        "10.00",
+        "-0.10",
+    ]
+    assert Measurement.count(price=Decimal("10")) == 1
+    assert Measurement.count(price__in=[Decimal("10"), Decimal("-0.1")]) == 2
+    assert [
+        str(measurement.price) for measurement in Measurement.all(order_by="-price")
+    ] == ["12345678901234567.89", "10.00", "-0.10"]
+
+
+def test_filter_decimal_field_by_int_and_float():
+    class Product(DBModel, indexes=["price"]):
+        price: Decimal
+
+    Product.create_table()
+    for price in ["2", "9.5", "10.25", "100"]:
+        Product(price=Decimal(price)).save()
+
+    assert [str(product.price) for product in Product.filter(price__gt=9)] == [
+        "9.5",
+        "10.25",
+        "100",
+    ]
+    assert Product.count(price__lte=10.25) == 3
+    assert Product.count(price__between=(5, 50)) == 2
+    assert Product.count(price=100) == 1
+    assert Product.count(price=9.5) == 1
+    assert Product.count(price__in=[2, 10.25]) == 2
+
+
+def test_filter_decimal_field_uses_index(db_cursor):
+    class Product(DBModel, indexes=["price"]):
+        price: Decimal
+
+    Product.create_table()
+
+    db_cursor.execute(
+        "EXPLAIN QUERY PLAN SELECT * FROM product "
+        "WHERE CAST(price AS NUMERIC) > CAST(? AS NUMERIC)",
+        (9,),
+    )
+    assert "product_price_idx" in db_cursor.fetchall()[0][3]
+
+
+def test_default_values_with_native_types(db_cursor):
+    class Settings(DBModel):
+        enabled: bool = True
+        ratio: float = 0.5
+        note: str = "it's"
+
+    Settings.create_table()
+    db_cursor.execute("INSERT INTO settings DEFAULT VALUES")
+    db_cursor.connection.commit()
+
+    settings = Settings.get(id=1)
+    assert settings.enabled is True
+    assert settings.ratio == 0.5
+    assert settings.note == "it's"
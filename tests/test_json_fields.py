@@ -0,0 +1,148 @@
+from typing import Optional
+
+import pytest
+from pydantic import BaseModel
+
+from ormagic import DBModel, Q
+
+
+class Address(BaseModel):
+    city: str
+    zip_code: str
+
+
+class Product(DBModel, indexes=["meta__color", ("meta__size", "name")]):
+    name: str
+    meta: dict = {}
+    tags: list[str] = []
+    address: Optional[Address] = None
+
+
+@pytest.fixture
+def products():
+    Product.create_table()
+    return [
+        Product(
+            name="Shirt",
+            meta={"color": "red", "size": 2, "labels": ["sale", "new"]},
+            tags=["clothes", "summer"],
+            address=Address(city="Warsaw", zip_code="00-001"),
+        ).save(),
+        Product(
+            name="Hat",
+            meta={"color": "blue", "size": 1, "labels": ["new"]},
+            tags=["clothes"],
+        ).save(),
+        Product(name="Mug", meta={"color": "red", "size": 3}).save(),
+    ]
+
+
+def test_save_json_fields(products, db_cursor):
+    db_cursor.execute(
+        "SELECT meta, tags, address, json_valid(meta) FROM product WHERE id = 1"
+    )
+
+    assert db_cursor.fetchone() == (
+        '{"color":"red","size":2,"labels":["sale","new"]}',
+        '["clothes","summer"]',
+        '{"city":"Warsaw","zip_code":"00-001"}',
+        1,
+    )
+
+
+def test_read_json_fields(products):
+    product = Product.get(id=1)
+
+    assert product.meta == {"color": "red", "size": 2, "labels": ["sale", "new"]}
+    assert product.tags == ["clothes", "summer"]
+    assert product.address == Address(city="Warsaw", zip_code="00-001")
+    assert Product.get(id=3).address is None
+
+
+def test_filter_by_json_key(products):
+    assert [product.name for product in Product.filter(meta__color="red")] == [
+        "Shirt",
+        "Mug",
+    ]
+    assert [product.name for product in Product.filter(meta__size__gte=2)] == [
+        "Shirt",
+        "Mug",
+    ]
+    assert [product.name for product in Product.filter(address__city="Warsaw")] == [
+        "Shirt"
+    ]
+    assert Product.count(meta__labels__0="new") == 1
+
+
+def test_filter_by_json_array_contains(products):
+    assert [product.name for product in Product.filter(tags__contains="summer")] == [
+        "Shirt"
+    ]
+    assert [
+        product.name for product in Product.filter(meta__labels__contains="new")
+    ] == ["Shirt", "Hat"]
+    assert [
+        product.name for product in Product.filter(meta__labels__ncontains="sale")
+    ] == ["Hat", "Mug"]
+
+
+def test_filter_by_json_fields_with_q_objects(products):
+    products = Product.filter(Q(meta__color="blue") | Q(tags__contains="summer"))
+
+    assert [product.name for product in products] == ["Shirt", "Hat"]
+
+
+def test_filter_by_whole_json_model(products):
+    address = Address(city="Warsaw", zip_code="00-001")
+
+    assert [product.name for product in Product.filter(address=address)] == ["Shirt"]
+    assert [product.name for product in Product.filter(Q(address=address))] == ["Shirt"]
+    assert Q(address=address) == Q(address=Address(city="Warsaw", zip_code="00-001"))
+    assert Product.filter(Q(address=Address(city="Paris", zip_code="75001"))) == []
+
+
+def test_filter_json_lookup_on_not_json_field(products):
+    with pytest.raises(ValueError):
+        Product.filter(name__color="red")
+    with pytest.raises(ValueError):
+        Product.filter(name__contains="S")
+
+
+def test_filter_json_lookup_with_invalid_path(products):
+    with pytest.raises(ValueError):
+        Product.filter(**{"meta__color')--": "red"})
+
+
+def test_create_expression_indexes(products, db_cursor):
+    db_cursor.execute(
+        "SELECT name, sql FROM sqlite_master WHERE type = 'index' AND tbl_name = 'product'"
+    )
+
+    assert db_cursor.fetchall() == [
+        (
+            "product_meta__color_idx",
+            "CREATE INDEX product_meta__color_idx ON product (json_extract(meta, '$.color'))",
+        ),
+        (
+            "product_meta__size_name_idx",
+            "CREATE INDEX product_meta__size_name_idx ON product (json_extract(meta, '$.size'), name)",
+        ),
+    ]
+
+
+def test_filter_by_json_key_uses_expression_index(products, db_cursor):
+    query, params = Product._prepare_query_to_fetch_raw_data(meta__color="red")
+    db_cursor.execute(f"EXPLAIN QUERY PLAN {query}", params)
+
+    assert "USING INDEX product_meta__color_idx" in db_cursor.fetchone()[-1]
+
+
+def test_create_index_on_regular_field(db_cursor):
+    class Event(DBModel, indexes=["name"]):
+        name: str
+
+    Event.create_table()
+    query, params = Event._prepare_query_to_fetch_raw_data(name="start")
+    db_cursor.execute(f"EXPLAIN QUERY PLAN {query}", params)
+
+    assert "INDEX event_name_idx" in db_cursor.fetchone()[-1]
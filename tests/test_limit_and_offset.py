@@ -60,3 +60,9 @@ def test_filter_with_limit_and_offset(prepare_db):
     assert len(users) == 2
     assert users[0].name == "David"
     assert users[1].name == "Eve"
+
+
+def test_get_all_with_offset_without_limit(prepare_db):
+    users = User.all(offset=6)
+
+    assert [user.name for user in users] == ["Grace", "Helen", "Ivy"]
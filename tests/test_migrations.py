@@ -0,0 +1,233 @@
+from typing import Optional
+
+import pytest
+
+from ormagic import DBField, DBModel, MigrationPlan, migrate, transaction
+
+
+def _user_model(**fields):
+    namespace = {"__annotations__": {}}
+    for name, (annotation, default) in fields.items():
+        namespace["__annotations__"][name] = annotation
+        if default is not ...:
+            namespace[name] = default
+    return type("User", (DBModel,), namespace)
+
+
+def _columns(db_cursor, table_name="user"):
+    db_cursor.execute(f"PRAGMA table_info({table_name})")
+    return [(column[1], column[2], column[3]) for column in db_cursor.fetchall()]
+
+
+def test_migrate_creates_tables(db_cursor):
+    class Team(DBModel):
+        name: str
+
+    class Player(DBModel):
+        name: str
+        team: Team
+
+    plan = migrate(Team, Player)
+
+    assert isinstance(plan, MigrationPlan)
+    assert plan.version == 1
+    assert [table.table_name for table in plan.tables] == ["team", "player"]
+    assert _columns(db_cursor, "player") == [
+        ("id", "INTEGER", 0),
+        ("name", "TEXT", 1),
+        ("team", "INTEGER", 1),
+    ]
+
+
+def test_migrate_without_changes(db_cursor):
+    User = _user_model(name=(str, ...))
+    migrate(User)
+
+    plan = migrate(User)
+
+    assert not plan
+    assert plan.version is None
+    assert str(plan) == "No changes"
+
+
+def test_migrate_adds_new_columns_at_the_end_without_rebuild(db_cursor):
+    User = _user_model(name=(str, ...))
+    migrate(User)
+    User(name="John").save()
+
+    User = _user_model(name=(str, ...), age=(Optional[int], None), city=(str, "Krakow"))
+    plan = migrate(User)
+
+    assert plan.tables[0].rebuild is False
+    assert plan.rows_touched == 0
+    assert plan.statements == [
+        "ALTER TABLE user ADD COLUMN age INTEGER",
+        "ALTER TABLE user ADD COLUMN city TEXT DEFAULT 'Krakow'",
+    ]
+    assert User.get(id=1).city == "Krakow"
+
+
+def test_migrate_renames_columns(db_cursor):
+    User = _user_model(name=(str, ...))
+    migrate(User)
+    User(name="John").save()
+
+    User = _user_model(first_name=(str, ...))
+    plan = migrate(User, renames={"user": {"name": "first_name"}})
+
+    assert plan.statements == ["ALTER TABLE user RENAME COLUMN name TO first_name"]
+    assert User.get(id=1).first_name == "John"
+
+
+def test_migrate_rebuilds_table_once_for_all_changes(db_cursor):
+    User = _user_model(name=(str, ...), age=(str, ...), nickname=(str, ...))
+    migrate(User)
+    db_cursor.executemany(
+        "INSERT INTO user (name, age, nickname) VALUES (?, ?, ?)",
+        [("John", "30", "j"), ("Jane", "25", "ja")],
+    )
+    db_cursor.connection.commit()
+
+    User = _user_model(
+        email=(Optional[str], DBField(default=None, unique=True)),
+        full_name=(str, ...),
+        age=(int, ...),
+    )
+    plan = migrate(User, renames={"user": {"name": "full_name"}})
+
+    assert plan.tables[0].rebuild is True
+    assert plan.rows_touched == 2
+    assert plan.tables[0].changes == [
+        "rename column name to full_name",
+        "add column email",
+        "drop column nickname",
+        "change column age",
+    ]
+    assert [statement.split(" (")[0] for statement in plan.statements] == [
+        "CREATE TABLE IF NOT EXISTS _ormagic_new_user",
+        "INSERT INTO _ormagic_new_user",
+        "DROP TABLE user",
+        "ALTER TABLE _ormagic_new_user RENAME TO user",
+    ]
+    assert _columns(db_cursor) == [
+        ("id", "INTEGER", 0),
+        ("email", "TEXT", 0),
+        ("full_name", "TEXT", 1),
+        ("age", "INTEGER", 1),
+    ]
+    db_cursor.execute("SELECT id, full_name, age, typeof(age) FROM user")
+    assert db_cursor.fetchall() == [
+        (1, "John", 30, "integer"),
+        (2, "Jane", 25, "integer"),
+    ]
+
+
+def test_migrate_rebuild_keeps_related_rows(db_cursor):
+    class Team(DBModel):
+        name: str
+
+    class Player(DBModel):
+        name: str
+        team: Team
+
+    migrate(Team, Player)
+    Player(name="Messi", team=Team(name="Inter Miami")).save()
+
+    class Team(DBModel):  # type: ignore
+        name: str = DBField(unique=True)
+
+    plan = migrate(Team)
+
+    assert plan.tables[0].rebuild is True
+    assert Player.get(id=1).team.name == "Inter Miami"
+    db_cursor.execute("PRAGMA foreign_key_check")
+    assert db_cursor.fetchall() == []
+
+
+def test_migrate_changes_foreign_key_action(db_cursor):
+    class Team(DBModel):
+        name: str
+
+    class Player(DBModel):
+        name: str
+        team: Optional[Team] = None
+
+    migrate(Team, Player)
+    Player(name="Messi", team=Team(name="Inter Miami")).save()
+
+    class Player(DBModel):  # type: ignore
+        name: str
+        team: Optional[Team] = DBField(default=None, on_delete="SET NULL")
+
+    assert migrate(Player).tables[0].changes == ["change column team"]
+    Team.get(id=1).delete()
+    assert Player.get(id=1).team is None
+
+
+def test_migrate_dry_run(db_cursor):
+    User = _user_model(name=(str, ...), age=(int, ...))
+    migrate(User)
+    User(name="John", age=30).save()
+
+    User = _user_model(name=(str, ...))
+    plan = migrate(User, dry_run=True)
+
+    assert plan.dry_run is True
+    assert plan.version is None
+    assert plan.rows_touched == 1
+    assert str(plan) == "user: rebuild (1 rows): drop column age"
+    assert [column[0] for column in _columns(db_cursor)] == ["id", "name", "age"]
+
+
+def test_migrate_required_column_without_default_in_table_with_rows(db_cursor):
+    User = _user_model(name=(str, ...))
+    migrate(User)
+    User(name="John").save()
+
+    User = _user_model(name=(str, ...), age=(int, ...))
+
+    with pytest.raises(ValueError):
+        migrate(User)
+    assert [column[0] for column in _columns(db_cursor)] == ["id", "name"]
+
+
+def test_migrate_recreates_indexes_and_search_index(db_cursor):
+    class Article(DBModel):
+        title: str
+        body: str
+
+    migrate(Article)
+    Article(title="SQLite", body="Migrations").save()
+
+    class Article(DBModel, indexes=["title"], searchable=["body"]):  # type: ignore
+        body: str
+        title: str
+
+    migrate(Article)
+
+    assert Article.search("migrations")[0].title == "SQLite"
+    db_cursor.execute(
+        "SELECT name FROM sqlite_master WHERE type = 'index' AND tbl_name = 'article'"
+    )
+    assert db_cursor.fetchall() == [("article_title_idx",)]
+
+
+def test_migrations_are_versioned(db_cursor):
+    User = _user_model(name=(str, ...))
+    migrate(User)
+    User = _user_model(name=(str, ...), age=(Optional[int], None))
+    migrate(User)
+
+    db_cursor.execute("SELECT version, changes FROM _ormagic_migrations")
+    assert db_cursor.fetchall() == [
+        (1, '["user: alter: create table"]'),
+        (2, '["user: alter: add column age"]'),
+    ]
+
+
+def test_migrate_inside_transaction():
+    User = _user_model(name=(str, ...))
+
+    with pytest.raises(RuntimeError):
+        with transaction():
+            migrate(User)
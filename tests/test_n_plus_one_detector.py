@@ -0,0 +1,94 @@
+import pytest
+
+from ormagic import DBModel, detect_n_plus_one
+from ormagic.n_plus_one import NPlusOneError, NPlusOneWarning, normalize_query
+
+
+class Team(DBModel):
+    name: str
+
+
+class Player(DBModel):
+    name: str
+    team: Team
+
+
+@pytest.fixture
+def prepare_db(db_cursor):
+    Team.create_table()
+    Player.create_table()
+    for i in range(5):
+        Player(name=f"Player {i}", team=Team(name=f"Team {i}")).save()
+
+
+def test_normalize_query_replaces_literals():
+    assert (
+        normalize_query("SELECT * FROM user WHERE id=12 AND name='O''Neil'")
+        == "SELECT * FROM user WHERE id=? AND name=?"
+    )
+
+
+def test_normalize_query_collapses_in_lists():
+    assert (
+        normalize_query("SELECT * FROM user WHERE id IN (1, 2, 3)")
+        == normalize_query("SELECT * FROM user WHERE id IN (4)")
+        == "SELECT * FROM user WHERE id IN (...)"
+    )
+
+
+def test_detect_repeated_foreign_key_queries(prepare_db):
+    with pytest.warns(NPlusOneWarning, match="Player.team"):
+        with detect_n_plus_one(threshold=3) as detector:
+            Player.all()
+
+    assert len(detector.reports) == 1
+    report = detector.reports[0]
+    assert report.count == 5
+    assert report.model == "Player"
+    assert report.field == "team"
+    assert report.shape == "SELECT * FROM team WHERE id = ?"
+
+
+def test_do_not_report_queries_below_threshold(prepare_db, recwarn):
+    with detect_n_plus_one(threshold=5) as detector:
+        Player.all()
+
+    assert detector.reports == []
+    assert not recwarn.list
+
+
+def test_detect_repeated_many_to_many_queries(db_cursor):
+    class Course(DBModel):
+        name: str
+
+    class Student(DBModel):
+        name: str
+        courses: list[Course] = []
+
+    Course.create_table()
+    Student.create_table()
+    course = Course(name="Math").save()
+    for i in range(3):
+        Student(name=f"Student {i}", courses=[course]).save()
+
+    with pytest.warns(NPlusOneWarning):
+        with detect_n_plus_one(threshold=2) as detector:
+            Student.all()
+
+    assert {(report.model, report.field) for report in detector.reports} == {
+        ("Student", "courses")
+    }
+
+
+def test_raise_error_on_repeated_queries(prepare_db):
+    with pytest.raises(NPlusOneError):
+        with detect_n_plus_one(threshold=1, raise_error=True):
+            Player.all()
+
+
+def test_queries_outside_detector_are_not_recorded(prepare_db):
+    with detect_n_plus_one(threshold=1) as detector:
+        pass
+    Player.all()
+
+    assert detector.counts == {}
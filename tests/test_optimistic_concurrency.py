@@ -0,0 +1,110 @@
+import pytest
+
+from ormagic import DBField, DBModel, transaction
+from ormagic.cursor import get_cursor
+from ormagic.models import ConflictError
+
+
+class Document(DBModel):
+    title: str
+    version: int = DBField(version=True)
+
+
+@pytest.fixture(autouse=True)
+def prepare_db():
+    Document.create_table()
+
+
+def test_version_starts_at_zero():
+    document = Document(title="Draft").save()
+
+    assert document.version == 0
+    assert Document.get(id=1).version == 0
+
+
+def test_update_increments_version():
+    statements = []
+    document = Document(title="Draft").save()
+
+    with transaction():
+        with get_cursor() as cursor:
+            cursor.connection.set_trace_callback(statements.append)
+            document.title = "Final"
+            document.save()
+            cursor.connection.set_trace_callback(None)
+
+    assert document.version == 1
+    assert Document.get(id=1).version == 1
+    assert (
+        "UPDATE document SET title='Final', version=version + 1 WHERE id=1 AND version=0"
+        in statements
+    )
+
+
+def test_concurrent_update_raises_conflict():
+    Document(title="Draft").save()
+    first = Document.get(id=1)
+    second = Document.get(id=1)
+
+    first.title = "First"
+    first.save()
+    second.title = "Second"
+
+    with pytest.raises(ConflictError):
+        second.save()
+    assert Document.get(id=1).title == "First"
+
+
+def test_save_again_after_reloading_conflicting_object():
+    Document(title="Draft").save()
+    first = Document.get(id=1)
+    second = Document.get(id=1)
+    first.save()
+    with pytest.raises(ConflictError):
+        second.save()
+
+    second = Document.get(id=1)
+    second.title = "Second"
+    second.save()
+
+    assert Document.get(id=1).title == "Second"
+    assert Document.get(id=1).version == 2
+
+
+def test_set_based_update_increments_version():
+    document = Document(title="Draft").save()
+
+    Document.query().update(title="Edited")
+
+    assert Document.get(id=1).version == 1
+    with pytest.raises(ConflictError):
+        document.save()
+
+
+def test_models_without_version_field_are_overwritten():
+    class Note(DBModel):
+        text: str
+
+    Note.create_table()
+    Note(text="Draft").save()
+    first = Note.get(id=1)
+    second = Note.get(id=1)
+    first.text = "First"
+    first.save()
+    second.text = "Second"
+    second.save()
+
+    assert Note.get(id=1).text == "Second"
+
+
+def test_invalid_version_fields():
+    with pytest.raises(ValueError):
+
+        class Text(DBModel):
+            version: str = DBField(default="1", version=True)
+
+    with pytest.raises(ValueError):
+
+        class Page(DBModel):
+            version: int = DBField(version=True)
+            revision: int = DBField(version=True)
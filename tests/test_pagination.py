@@ -0,0 +1,183 @@
+import asyncio
+from decimal import Decimal
+from typing import Optional
+
+import pytest
+
+from ormagic import DBModel, Page, Q
+from ormagic.pagination import prepare_keyset_condition
+from ormagic.query import RowComparison
+
+
+class User(DBModel):
+    name: str
+    age: int
+
+
+@pytest.fixture(autouse=True)
+def prepare_db():
+    User.create_table()
+    for i in range(10):
+        User(name=f"User {i}", age=20 + i % 3).save()
+
+
+def test_paginate_by_primary_key():
+    page = User.paginate(page_size=4)
+
+    assert isinstance(page, Page)
+    assert [user.id for user in page.items] == [1, 2, 3, 4]
+    assert page.next_cursor is not None
+
+    page = User.paginate(after=page.next_cursor, page_size=4)
+    assert [user.id for user in page.items] == [5, 6, 7, 8]
+
+    page = User.paginate(after=page.next_cursor, page_size=4)
+    assert [user.id for user in page.items] == [9, 10]
+    assert page.next_cursor is None
+
+
+def test_paginate_by_field_with_duplicate_values():
+    ids = []
+    cursor = None
+    while True:
+        page = User.paginate(after=cursor, order_by="age", page_size=3)
+        ids.extend(user.id for user in page)
+        if not (cursor := page.next_cursor):
+            break
+
+    expected = [user.id for user in User.filter(order_by=["age", "id"])]
+    assert ids == expected
+    assert len(set(ids)) == 10
+
+
+def test_paginate_descending():
+    first_page = User.paginate(order_by="-age", page_size=4)
+    second_page = User.paginate(
+        after=first_page.next_cursor, order_by="-age", page_size=4
+    )
+
+    ages = [user.age for user in [*first_page, *second_page]]
+    assert ages == sorted(ages, reverse=True)
+    assert [user.id for user in first_page] == [9, 6, 3, 8]
+    assert [user.id for user in second_page] == [5, 2, 10, 7]
+
+
+def test_paginate_with_filters():
+    page = User.paginate(Q(age=20) | Q(age=21), name__nlike="User 0", page_size=3)
+    page = User.paginate(
+        Q(age=20) | Q(age=21),
+        name__nlike="User 0",
+        after=page.next_cursor,
+        page_size=3,
+    )
+
+    assert [user.id for user in page] == [7, 8, 10]
+    assert page.next_cursor is None
+
+
+def test_paginate_generates_keyset_query():
+    page = User.paginate(order_by="age", page_size=2)
+    query, params = User._prepare_query_to_fetch_raw_data(
+        prepare_keyset_condition(["age", "id"], False, page.next_cursor),
+        order_by=["age", "id"],
+        limit=3,
+    )
+
+    assert query == (
+        "SELECT * FROM user WHERE (age, id) > (?, ?) ORDER BY age, id LIMIT ?"
+    )
+    assert params == [20, 4, 3]
+
+
+@pytest.mark.parametrize("order_by", ["score", "-score"])
+def test_paginate_by_nullable_field(order_by):
+    class Player(DBModel):
+        score: Optional[int] = None
+
+    Player.create_table()
+    for score in [None, 3, None, 1, 3, None]:
+        Player(score=score).save()
+
+    ids = []
+    cursor = None
+    while True:
+        page = Player.paginate(after=cursor, order_by=order_by, page_size=2)
+        ids.extend(player.id for player in page)
+        if not (cursor := page.next_cursor):
+            break
+
+    descending = order_by.startswith("-")
+    expected = [
+        player.id
+        for player in Player.filter(order_by=[order_by, "-id" if descending else "id"])
+    ]
+    assert ids == expected
+    assert len(ids) == 6
+
+
+@pytest.mark.parametrize("order_by", ["price", "-price"])
+def test_paginate_by_decimal_field(order_by):
+    class Product(DBModel):
+        price: Decimal
+
+    Product.create_table()
+    for price in ["9.5", "10.25", "100", "2"]:
+        Product(price=Decimal(price)).save()
+
+    prices = []
+    cursor = None
+    while True:
+        page = Product.paginate(after=cursor, order_by=order_by, page_size=2)
+        prices.extend(str(product.price) for product in page)
+        if not (cursor := page.next_cursor):
+            break
+
+    expected = ["2", "9.5", "10.25", "100"]
+    assert prices == (expected[::-1] if order_by.startswith("-") else expected)
+
+
+def test_decimal_keyset_condition():
+    comparison = RowComparison(("price", "id"), ">", ("9.5", 2))
+
+    assert comparison.compile(decimal_fields={"price"}) == (
+        "(CAST(price AS NUMERIC), id) > (CAST(? AS NUMERIC), ?)",
+        ["9.5", 2],
+    )
+
+
+def test_nullable_keyset_condition():
+    after_value = RowComparison(("score", "id"), "<", (5, 2), (True, False))
+    after_null = RowComparison(("score", "id"), ">", (None, 2), (True, False))
+
+    assert after_value.compile() == (
+        "(((score < ? OR score IS NULL)) OR (score = ? AND id < ?))",
+        [5, 5, 2],
+    )
+    assert after_null.compile() == (
+        "((score IS NOT NULL) OR (score IS NULL AND id > ?))",
+        [2],
+    )
+
+
+def test_paginate_with_cursor_of_other_sort_order():
+    page = User.paginate(order_by="age", page_size=2)
+
+    with pytest.raises(ValueError):
+        User.paginate(after=page.next_cursor, order_by="name")
+
+
+def test_paginate_with_invalid_cursor():
+    with pytest.raises(ValueError):
+        User.paginate(after="not a cursor")
+
+
+def test_paginate_with_mixed_sort_directions():
+    with pytest.raises(ValueError):
+        User.paginate(order_by=["age", "-name"])
+
+
+def test_paginate_async():
+    page = asyncio.run(User.apaginate(page_size=5))
+
+    assert len(page) == 5
+    assert page.next_cursor is not None
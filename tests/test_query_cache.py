@@ -0,0 +1,192 @@
+import time
+
+import pytest
+
+from ormagic import DBModel, clear_cache, configure_cache, transaction
+from ormagic.cache import get_query_cache
+from ormagic.cursor import get_cursor
+from ormagic.models import ObjectNotFound
+
+
+class Country(DBModel, cache=True):
+    name: str
+
+
+class City(DBModel, cache=True):
+    name: str
+    country: Country
+
+
+class User(DBModel):
+    name: str
+
+
+@pytest.fixture(autouse=True)
+def prepare_db():
+    configure_cache()
+    Country.create_table()
+    City.create_table()
+    Country(name="Poland").save()
+    yield
+    clear_cache()
+
+
+def _update_without_orm(sql: str) -> None:
+    with get_cursor() as cursor:
+        cursor.execute(sql)
+
+
+def test_cache_is_disabled_by_default():
+    User.create_table()
+    User(name="John").save()
+
+    User.get(id=1)
+    _update_without_orm("UPDATE user SET name='Jane'")
+
+    assert User.get(id=1).name == "Jane"
+    assert len(get_query_cache()) == 0
+
+
+def test_get_result_is_served_from_cache():
+    assert Country.get(id=1).name == "Poland"
+    _update_without_orm("UPDATE country SET name='Germany'")
+
+    assert Country.get(id=1).name == "Poland"
+    assert get_query_cache().hits == 1
+
+
+def test_filter_all_and_count_results_are_cached():
+    Country.filter(name="Poland")
+    Country.all()
+    Country.count()
+    _update_without_orm("DELETE FROM country")
+
+    assert len(Country.filter(name="Poland")) == 1
+    assert len(Country.all()) == 1
+    assert Country.count() == 1
+
+
+def test_cached_objects_are_copies():
+    country = Country.get(id=1)
+    country.name = "Changed"
+
+    assert Country.get(id=1).name == "Poland"
+
+
+def test_save_invalidates_cache():
+    Country.all()
+    Country(name="Germany").save()
+
+    assert len(Country.all()) == 2
+
+
+def test_update_invalidates_cache():
+    country = Country.get(id=1)
+    country.name = "Germany"
+    country.save()
+
+    assert Country.get(id=1).name == "Germany"
+
+
+def test_delete_invalidates_cache():
+    country = Country.get(id=1)
+    country.delete()
+
+    with pytest.raises(ObjectNotFound):
+        Country.get(id=1)
+
+
+def test_drop_table_invalidates_cache():
+    Country.all()
+    Country.drop_table()
+    Country.create_table()
+
+    assert Country.all() == []
+
+
+def test_write_to_related_table_invalidates_cache():
+    City(name="Warsaw", country=Country.get(id=1)).save()
+    assert City.get(id=1).country.name == "Poland"
+
+    country = Country.get(id=1)
+    country.name = "Polska"
+    country.save()
+
+    assert City.get(id=1).country.name == "Polska"
+
+
+def test_cache_is_not_used_inside_transaction():
+    Country.all()
+    with transaction():
+        Country(name="Germany").save()
+        assert len(Country.all()) == 2
+
+    assert len(Country.all()) == 2
+
+
+def test_rolled_back_transaction_does_not_leave_stale_results():
+    with pytest.raises(ValueError):
+        with transaction():
+            Country(name="Germany").save()
+            assert len(Country.all()) == 2
+            raise ValueError
+
+    assert len(Country.all()) == 1
+
+
+def test_cache_entries_expire_after_ttl():
+    configure_cache(ttl=0.01)
+    Country.get(id=1)
+    _update_without_orm("UPDATE country SET name='Germany'")
+    time.sleep(0.02)
+
+    assert Country.get(id=1).name == "Germany"
+
+
+def test_least_recently_used_entries_are_evicted():
+    configure_cache(max_size=2)
+    Country.count()
+    Country.all()
+    Country.filter(name="Poland")
+
+    assert len(get_query_cache()) == 2
+
+
+def test_configure_cache_with_invalid_size():
+    with pytest.raises(ValueError):
+        configure_cache(max_size=0)
+
+
+def test_invalidate_tables_after_many_to_many_rows_are_written(monkeypatch):
+    from ormagic import models
+
+    class Tag(DBModel, cache=True):
+        name: str
+
+    class Article(DBModel, cache=True):
+        title: str
+        tags: list[Tag] = []
+
+    Tag.create_table()
+    Article.create_table()
+    events: list[str] = []
+    invalidate_tables = models.invalidate_tables
+
+    def record_invalidation(connection, *tables):
+        events.append(f"invalidate {' '.join(tables)}")
+        invalidate_tables(connection, *tables)
+
+    monkeypatch.setattr(models, "invalidate_tables", record_invalidation)
+    with transaction():
+        with get_cursor() as cursor:
+            cursor.connection.set_trace_callback(events.append)
+            Article(title="News", tags=[Tag(name="a"), Tag(name="b")]).save()
+            cursor.connection.set_trace_callback(None)
+
+    last_insert = max(
+        index
+        for index, event in enumerate(events)
+        if event.startswith("INSERT INTO article_tag")
+    )
+    assert "invalidate article_tag" in events[last_insert:]
+    assert "invalidate article" in events[last_insert:]
@@ -0,0 +1,149 @@
+import sys
+from typing import Optional
+
+import pytest
+
+from ormagic import DBModel, Q, QuerySet, configure_cache, transaction
+from ormagic.cursor import get_cursor
+
+
+class User(DBModel):
+    name: str
+    age: int
+
+
+@pytest.fixture(autouse=True)
+def prepare_db():
+    User.create_table()
+    for name, age in [("John", 30), ("Jane", 25), ("Alice", 35), ("Bob", 18)]:
+        User(name=name, age=age).save()
+
+
+def test_query_is_lazy(db_cursor):
+    statements = []
+    db_cursor.connection.set_trace_callback(statements.append)
+
+    queryset = User.query(age__gte=25)
+
+    assert isinstance(queryset, QuerySet)
+    assert statements == []
+
+
+def test_get_objects_from_query():
+    queryset = User.query(age__gte=25, order_by="-age")
+
+    assert [user.name for user in queryset.all()] == ["Alice", "John", "Jane"]
+    assert [user.name for user in queryset] == ["Alice", "John", "Jane"]
+    assert queryset.count() == 3
+
+
+def test_narrow_query_down():
+    queryset = User.query(age__gte=20).filter(Q(name="John") | Q(name="Bob"))
+
+    assert [user.name for user in queryset] == ["John"]
+
+
+def test_narrow_query_down_with_the_same_lookup():
+    queryset = User.query(age__gte=20, order_by="age").filter(
+        age__gte=30, order_by="-age"
+    )
+
+    assert [user.name for user in queryset] == ["Alice", "John"]
+
+
+def test_fetch_columns_without_numpy(monkeypatch):
+    monkeypatch.setitem(sys.modules, "numpy", None)
+
+    with pytest.raises(ImportError):
+        User.query().to_columns("age")
+
+
+def test_update_matching_objects():
+    count = User.query(age__gte=30).update(name="Senior", age=40)
+
+    assert count == 2
+    assert [(user.name, user.age) for user in User.all()] == [
+        ("Senior", 40),
+        ("Jane", 25),
+        ("Senior", 40),
+        ("Bob", 18),
+    ]
+
+
+def test_update_is_one_query():
+    statements = []
+    with transaction():
+        with get_cursor() as cursor:
+            cursor.connection.set_trace_callback(statements.append)
+            User.query(Q(name="John") | Q(name="Bob")).update(age=50)
+            cursor.connection.set_trace_callback(None)
+
+    assert statements == [
+        "UPDATE user SET age = 50 WHERE (name = 'John' OR name = 'Bob')"
+    ]
+
+
+def test_update_with_limit_and_order_by():
+    count = User.query(order_by="-age", limit=2).update(name="Oldest")
+
+    assert count == 2
+    assert [user.id for user in User.filter(name="Oldest", order_by="id")] == [1, 3]
+
+
+def test_update_foreign_key():
+    class Team(DBModel):
+        name: str
+
+    class Player(DBModel):
+        name: str
+        team: Optional[Team] = None
+
+    Team.create_table()
+    Player.create_table()
+    team = Team(name="Inter Miami").save()
+    Player(name="Messi").save()
+
+    assert Player.query(name="Messi").update(team=team) == 1
+    assert Player.get(id=1).team == team
+
+
+def test_update_invalid_field():
+    with pytest.raises(ValueError):
+        User.query().update(email="john@example.com")
+    with pytest.raises(ValueError):
+        User.query().update()
+
+
+def test_delete_matching_objects():
+    count = User.query(age__lt=30).delete()
+
+    assert count == 2
+    assert [user.name for user in User.all()] == ["John", "Alice"]
+
+
+def test_delete_with_limit_and_offset():
+    count = User.query(order_by="age", limit=2, offset=1).delete()
+
+    assert count == 2
+    assert [user.name for user in User.all()] == ["Alice", "Bob"]
+
+
+def test_delete_without_matching_objects():
+    assert User.query(age__gt=100).delete() == 0
+    assert User.count() == 4
+
+
+def test_update_and_delete_invalidate_cache():
+    class Country(DBModel, cache=True):
+        name: str
+
+    configure_cache()
+    Country.create_table()
+    Country(name="Poland").save()
+    assert Country.count(name="Polska") == 0
+
+    Country.query(name="Poland").update(name="Polska")
+    assert Country.count(name="Polska") == 1
+
+    Country.query(name="Polska").delete()
+    assert Country.count() == 0
@@ -0,0 +1,217 @@
+import asyncio
+import sqlite3
+import threading
+from contextlib import contextmanager
+
+import pytest
+
+from ormagic import (
+    DBModel,
+    configure_retries,
+    reset_retry_stats,
+    retry_stats,
+    transaction,
+)
+from ormagic.connection import create_connection
+from ormagic.cursor import get_cursor
+
+pytestmark = pytest.mark.file_database
+
+
+class Item(DBModel):
+    name: str
+
+
+@pytest.fixture(autouse=True)
+def retry_settings():
+    Item.create_table()
+    reset_retry_stats()
+    yield
+    configure_retries()
+    reset_retry_stats()
+
+
+@contextmanager
+def locked_database(release_after: float | None = None):
+    connection = sqlite3.connect(
+        "db.sqlite3", isolation_level=None, check_same_thread=False
+    )
+    connection.execute("BEGIN IMMEDIATE")
+    timer = None
+    if release_after is not None:
+        timer = threading.Timer(release_after, connection.rollback)
+        timer.start()
+    try:
+        yield
+    finally:
+        if timer:
+            timer.join()
+        connection.rollback()
+        connection.close()
+
+
+def test_configure_busy_timeout_of_new_connections():
+    configure_retries(timeout=0.25)
+
+    connection = create_connection()
+
+    assert connection.execute("PRAGMA busy_timeout").fetchone()[0] == 250
+    connection.close()
+
+
+def test_configure_retries_with_negative_values():
+    with pytest.raises(ValueError):
+        configure_retries(retries=-1)
+    with pytest.raises(ValueError):
+        configure_retries(timeout=-1)
+    with pytest.raises(ValueError):
+        configure_retries(lock_wait_threshold=-1)
+
+
+def test_retry_write_when_database_is_locked():
+    configure_retries(timeout=0, retries=50, backoff=0.01, max_backoff=0.02)
+
+    with locked_database(release_after=0.1):
+        Item(name="first").save()
+
+    assert [item.name for item in Item.all()] == ["first"]
+    stats = retry_stats()
+    assert stats.busy_errors == stats.retries > 0
+    assert stats.failures == 0
+    assert stats.backoff_time > 0
+
+
+def test_raise_error_when_retries_are_exhausted():
+    configure_retries(timeout=0, retries=2, backoff=0.01)
+
+    with locked_database():
+        with pytest.raises(sqlite3.OperationalError, match="locked"):
+            Item(name="first").save()
+
+    assert retry_stats()[:3] == (3, 2, 1)
+    assert Item.all() == []
+
+
+def test_measure_time_waiting_for_lock():
+    configure_retries(timeout=0.1, retries=1, backoff=0)
+
+    with locked_database():
+        with pytest.raises(sqlite3.OperationalError, match="locked"):
+            Item(name="first").save()
+        with pytest.raises(sqlite3.OperationalError, match="locked"):
+            with transaction():
+                Item(name="second").save()
+
+    stats = retry_stats()
+    assert stats.lock_waits == 3
+    assert stats.lock_wait_time >= 0.3
+    assert stats.backoff_time == 0
+
+
+@pytest.mark.parametrize("in_transaction", [False, True])
+def test_measure_time_waiting_for_lock_before_success(in_transaction):
+    configure_retries(timeout=5)
+
+    with locked_database(release_after=0.2):
+        if in_transaction:
+            with transaction():
+                Item(name="first").save()
+        else:
+            Item(name="first").save()
+
+    stats = retry_stats()
+    assert stats.busy_errors == 0
+    assert stats.lock_waits == 1
+    assert stats.lock_wait_time >= 0.15
+
+
+def test_do_not_count_lock_waits_shorter_than_threshold():
+    configure_retries(lock_wait_threshold=1)
+
+    with locked_database(release_after=0.1):
+        Item(name="first").save()
+
+    assert retry_stats().lock_waits == 0
+
+
+def test_disable_retries():
+    configure_retries(timeout=0, retries=0)
+
+    with locked_database():
+        with pytest.raises(sqlite3.OperationalError, match="locked"):
+            Item(name="first").save()
+
+    assert retry_stats()[:3] == (1, 0, 1)
+
+
+def test_do_not_retry_other_errors():
+    with pytest.raises(sqlite3.OperationalError, match="no such table"):
+        with get_cursor() as cursor:
+            cursor.execute("SELECT * FROM missing")
+
+    assert retry_stats() == (0, 0, 0, 0, 0.0, 0.0)
+
+
+def test_do_not_retry_statements_inside_transaction():
+    configure_retries(timeout=0, retries=5, backoff=0.01)
+
+    with locked_database():
+        with pytest.raises(sqlite3.OperationalError, match="locked"):
+            with transaction():
+                Item(name="first").save()
+
+    assert retry_stats().retries == 0
+
+
+def test_retry_whole_transaction():
+    configure_retries(timeout=0, retries=50, backoff=0.01, max_backoff=0.02)
+    calls = []
+
+    def create_items():
+        calls.append(1)
+        Item(name="first").save()
+        Item(name="second").save()
+        return len(calls)
+
+    with locked_database(release_after=0.1):
+        result = transaction.run(create_items)
+
+    assert result == len(calls) > 1
+    assert [item.name for item in Item.all()] == ["first", "second"]
+    assert retry_stats().retries == len(calls) - 1
+
+
+def test_run_nested_transaction_once_in_savepoint():
+    configure_retries(timeout=0, retries=5, backoff=0.01)
+    calls = []
+
+    def create_item():
+        calls.append(1)
+        Item(name="inner").save()
+
+    with locked_database():
+        with pytest.raises(sqlite3.OperationalError, match="locked"):
+            with transaction():
+                transaction.run(create_item)
+
+    assert len(calls) == 1
+
+
+def test_retry_whole_transaction_asynchronously():
+    configure_retries(timeout=0, retries=50, backoff=0.01, max_backoff=0.02)
+    calls = []
+
+    async def create_item(name):
+        calls.append(1)
+        await Item(name=name).asave()
+        return name
+
+    async def main():
+        return await transaction.arun(create_item, "first")
+
+    with locked_database(release_after=0.1):
+        result = asyncio.run(main())
+
+    assert result == "first"
+    assert len(calls) > 1
+    assert [item.name for item in Item.all()] == ["first"]
@@ -0,0 +1,156 @@
+import asyncio
+from contextlib import contextmanager
+from typing import Optional
+
+import pytest
+
+from ormagic import DBField, DBModel, QuerySet, aprefetch_related, prefetch_related
+from ormagic.cursor import get_cursor
+from ormagic.transactions import transaction
+
+
+class Author(DBModel):
+    name: str
+
+
+class Post(DBModel):
+    title: str
+    author: Author
+
+
+class Message(DBModel):
+    text: str
+    sender: Author = DBField(related_name="sent_messages")
+    recipient: Optional[Author] = DBField(
+        default=None, related_name="received_messages"
+    )
+
+
+@pytest.fixture
+def authors():
+    Author.create_table()
+    Post.create_table()
+    Message.create_table()
+    authors = [Author(name=f"Author {i}").save() for i in range(3)]
+    for i in range(4):
+        Post(title=f"Post {i}", author=authors[i % 2]).save()
+    Message(text="Hello", sender=authors[0], recipient=authors[1]).save()
+    return Author.all()
+
+
+@contextmanager
+def trace_statements():
+    statements: list[str] = []
+    with transaction():
+        with get_cursor() as cursor:
+            cursor.connection.set_trace_callback(statements.append)
+            yield statements
+            cursor.connection.set_trace_callback(None)
+
+
+def test_reverse_relation_returns_query_set(authors):
+    posts = authors[0].post_set
+
+    assert isinstance(posts, QuerySet)
+    assert [post.title for post in posts] == ["Post 0", "Post 2"]
+    assert posts.count() == 2
+    assert authors[2].post_set.all() == []
+
+
+def test_filter_reverse_relation(authors):
+    posts = authors[0].post_set.filter(title="Post 2")
+
+    assert [post.title for post in posts] == ["Post 2"]
+
+
+def test_reverse_relation_with_related_name(authors):
+    assert [message.text for message in authors[0].sent_messages] == ["Hello"]
+    assert [message.text for message in authors[1].received_messages] == ["Hello"]
+    assert authors[0].received_messages.all() == []
+    assert not hasattr(authors[0], "message_set")
+
+
+def test_reverse_relation_of_unsaved_object():
+    with pytest.raises(ValueError, match="Save the Author object"):
+        Author(name="New").post_set
+
+
+def test_clashing_reverse_relation_names():
+    class Person(DBModel):
+        name: str
+
+    with pytest.raises(ValueError, match="related_name"):
+
+        class Letter(DBModel):
+            sender: Person
+            recipient: Person = DBField(related_name="letter_set")
+
+
+def test_prefetch_related_with_one_query(authors):
+    with trace_statements() as statements:
+        prefetch_related(authors, "post_set")
+
+    assert statements == ["SELECT * FROM post WHERE author IN (1, 2, 3)"]
+
+
+def test_access_prefetched_relations_without_queries(authors):
+    prefetch_related(authors, "post_set")
+    with trace_statements() as statements:
+        titles = [[post.title for post in author.post_set] for author in authors]
+        counts = [author.post_set.count() for author in authors]
+
+    assert titles == [["Post 0", "Post 2"], ["Post 1", "Post 3"], []]
+    assert counts == [2, 2, 0]
+    assert statements == []
+
+
+def test_prefetched_objects_reference_parent_objects(authors):
+    prefetch_related(authors, "post_set")
+
+    post = authors[0].post_set.all()[0]
+
+    assert post.author is authors[0]
+
+
+def test_filter_prefetched_relation_queries_database(authors):
+    prefetch_related(authors, "post_set")
+    Post(title="Post 4", author=authors[0]).save()
+
+    assert authors[0].post_set.count() == 2
+    assert [post.title for post in authors[0].post_set.filter(title="Post 4")] == [
+        "Post 4"
+    ]
+
+
+def test_prefetch_related_in_batches(authors, monkeypatch):
+    monkeypatch.setattr("ormagic.relations._BATCH_SIZE", 2)
+
+    prefetch_related(authors, "post_set")
+
+    assert [author.post_set.count() for author in authors] == [2, 2, 0]
+
+
+def test_prefetch_invalid_relation(authors):
+    with pytest.raises(ValueError, match="Invalid reverse relation"):
+        prefetch_related(authors, "name")
+
+
+def test_prefetch_related_asynchronously(authors):
+    asyncio.run(aprefetch_related(authors, "post_set"))
+
+    assert [author.post_set.count() for author in authors] == [2, 2, 0]
+
+
+def test_create_table_with_many_foreign_keys(authors, db_cursor):
+    db_cursor.execute("PRAGMA foreign_key_list(message)")
+
+    assert sorted(row[3] for row in db_cursor.fetchall()) == ["recipient", "sender"]
+
+
+def test_create_index_on_foreign_key(db_cursor):
+    Author.create_table()
+    Post.create_table()
+
+    db_cursor.execute("SELECT name FROM sqlite_master WHERE type='index'")
+
+    assert ("post_author_idx",) in db_cursor.fetchall()
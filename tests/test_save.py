@@ -62,7 +62,7 @@ def test_save_object_with_datetime_field_to_db(prepare_db, db_cursor):
 
     res = db_cursor.execute("SELECT * FROM userwithdatetime")
     data = res.fetchall()
-    assert data == [(1, "John", "2021-01-01 12:00:00")]
+    assert data == [(1, "John", "2021-01-01 12:00:00.000000")]
     assert user.created_at == datetime(2021, 1, 1, 12, 0, 0)
 
 
@@ -0,0 +1,121 @@
+import asyncio
+
+import pytest
+
+from ormagic import DBModel
+
+
+class Article(DBModel, searchable=["title", "body"]):
+    title: str
+    body: str
+    views: int = 1
+
+
+@pytest.fixture
+def articles():
+    Article.create_table()
+    return [
+        Article(title="SQLite tips", body="Use indexes to make queries fast").save(),
+        Article(title="Python", body="SQLite ships with Python").save(),
+        Article(title="Gardening", body="Tomatoes need sun", views=10).save(),
+        Article(title="SQLite SQLite SQLite", body="All about SQLite").save(),
+    ]
+
+
+def test_create_search_table(articles, db_cursor):
+    db_cursor.execute(
+        "SELECT name FROM sqlite_master WHERE name LIKE 'article_fts%' AND type IN ('table', 'trigger') ORDER BY name"
+    )
+
+    assert [row[0] for row in db_cursor.fetchall()] == [
+        "article_fts",
+        "article_fts_config",
+        "article_fts_data",
+        "article_fts_delete",
+        "article_fts_docsize",
+        "article_fts_idx",
+        "article_fts_insert",
+        "article_fts_update",
+    ]
+
+
+def test_search_ranked_by_relevance(articles):
+    results = Article.search("sqlite")
+
+    assert [article.id for article in results] == [4, 2, 1]
+    assert all(isinstance(article, Article) for article in results)
+
+
+def test_search_without_rank(articles):
+    results = Article.search("sqlite", rank=False, order_by="-id")
+
+    assert [article.id for article in results] == [4, 2, 1]
+
+
+def test_search_with_filters_and_limit(articles):
+    assert [article.id for article in Article.search("sqlite", limit=1)] == [4]
+    assert [article.id for article in Article.search("sqlite", title="Python")] == [2]
+
+
+def test_search_with_fts_query_syntax(articles):
+    assert [article.id for article in Article.search("title:python")] == [2]
+    assert [article.id for article in Article.search("tomato*")] == [3]
+    assert Article.search("sqlite NOT python", rank=False, order_by="id")[0].id == 1
+
+
+def test_search_index_is_updated_by_triggers(articles):
+    articles[2].body = "SQLite in the garden"
+    articles[2].save()
+    articles[0].delete()
+
+    assert [article.id for article in Article.search("sqlite", order_by="id")] == [
+        2,
+        3,
+        4,
+    ]
+    assert Article.search("tomatoes") == []
+
+
+def test_search_index_is_built_for_existing_rows(db_cursor):
+    class Note(DBModel):
+        text: str
+
+    Note.create_table()
+    Note(text="existing note").save()
+
+    class Note(DBModel, searchable=["text"]):  # type: ignore
+        text: str
+
+    Note.update_table()
+
+    assert [note.text for note in Note.search("existing")] == ["existing note"]
+
+
+def test_drop_table_removes_search_table(articles, db_cursor):
+    Article.drop_table()
+
+    db_cursor.execute("SELECT count(*) FROM sqlite_master WHERE name LIKE 'article%'")
+    assert db_cursor.fetchone()[0] == 0
+
+
+def test_search_model_without_searchable_fields(db_cursor):
+    class User(DBModel):
+        name: str
+
+    User.create_table()
+
+    with pytest.raises(ValueError):
+        User.search("john")
+
+
+def test_searchable_field_must_be_text():
+    with pytest.raises(ValueError):
+
+        class Product(DBModel, searchable=["price"]):
+            price: int
+
+
+def test_search_async(articles):
+    results = asyncio.run(Article.asearch("garden*"))
+
+    assert [article.id for article in results] == [3]
@@ -0,0 +1,85 @@
+import pytest
+
+from ormagic import DBModel, Q, clear_statement_cache, statement_cache_info
+from ormagic.statement_cache import prepare_query
+
+
+class User(DBModel):
+    name: str
+    age: int
+
+
+@pytest.fixture(autouse=True)
+def prepare_db():
+    User.create_table()
+    User(name="John", age=30).save()
+    User(name="Jane", age=25).save()
+    clear_statement_cache()
+
+
+def _prepare(*args, **kwargs):
+    return prepare_query(User, "SELECT * FROM user", *args, **kwargs)
+
+
+def test_queries_with_same_shape_reuse_compiled_sql():
+    assert User.filter(name="John", age__gt=20)[0].name == "John"
+    assert User.filter(name="Jane", age__gt=10)[0].name == "Jane"
+
+    info = statement_cache_info()
+    assert info.misses == 1
+    assert info.hits == 1
+    assert info.size == 1
+    assert info.hit_rate == 0.5
+
+
+def test_queries_with_different_shapes_are_compiled_separately():
+    User.filter(name="John")
+    User.filter(age="John")
+    User.filter(name__ne="John")
+
+    assert statement_cache_info().misses == 3
+
+
+def test_limit_and_offset_are_bound_as_params():
+    assert _prepare(limit=10, offset=5) == (
+        "SELECT * FROM user LIMIT ? OFFSET ?",
+        [10, 5],
+    )
+    assert _prepare(limit=20, offset=1)[1] == [20, 1]
+    assert statement_cache_info().hits == 1
+
+
+def test_in_lists_of_different_length_have_different_shapes():
+    assert _prepare(name__in=["John"]) == (
+        "SELECT * FROM user WHERE name IN (?)",
+        ["John"],
+    )
+    assert _prepare(name__in=["John", "Jane"]) == (
+        "SELECT * FROM user WHERE name IN (?, ?)",
+        ["John", "Jane"],
+    )
+
+
+def test_bind_params_of_q_objects_and_keyword_arguments():
+    query, params = _prepare(Q(name="John") | Q(age__between=(20, 30)), age__lt=40)
+
+    assert (
+        query
+        == "SELECT * FROM user WHERE age < ? AND (name = ? OR age BETWEEN ? AND ?)"
+    )
+    assert params == [40, "John", 20, 30]
+
+
+def test_order_by_is_part_of_shape():
+    assert User.filter(order_by="age")[0].name == "Jane"
+    assert User.filter(order_by="-age")[0].name == "John"
+    assert User.filter(order_by=["name", "-age"])[0].name == "Jane"
+
+    assert statement_cache_info().misses == 3
+
+
+def test_clear_statement_cache():
+    User.filter(name="John")
+    clear_statement_cache()
+
+    assert statement_cache_info() == (0, 0, 512, 0)
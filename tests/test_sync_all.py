@@ -0,0 +1,141 @@
+from typing import Optional
+
+from ormagic import DBModel, migrate, migrations
+from ormagic.migrations import sort_models_by_dependencies
+
+
+def test_sync_all_creates_tables_ordered_by_foreign_keys(db_cursor):
+    class Team(DBModel):
+        name: str
+
+    class Player(DBModel):
+        name: str
+        team: Team
+
+    plan = DBModel.sync_all(Player, Team)
+
+    assert [table.table_name for table in plan.tables] == ["team", "player"]
+    Player(name="Messi", team=Team(name="Inter Miami")).save()
+    assert Player.get(id=1).team.name == "Inter Miami"
+
+
+def test_sync_all_saves_schema_fingerprint(db_cursor):
+    class User(DBModel):
+        name: str
+
+    DBModel.sync_all(User)
+
+    db_cursor.execute("SELECT fingerprint FROM _ormagic_schema")
+    assert db_cursor.fetchall() == [(migrations.get_schema_fingerprint([User]),)]
+
+
+def test_sync_all_skips_introspection_when_schema_not_changed(db_cursor, monkeypatch):
+    class User(DBModel):
+        name: str
+
+    DBModel.sync_all(User)
+
+    def plan_tables(*args):
+        raise AssertionError("Tables should not be introspected")
+
+    monkeypatch.setattr(migrations, "_plan_tables", plan_tables)
+    plan = DBModel.sync_all(User)
+
+    assert not plan
+
+
+def test_sync_all_migrates_changed_models(db_cursor):
+    class User(DBModel):
+        name: str
+
+    DBModel.sync_all(User)
+    User(name="John").save()
+
+    class User(DBModel):  # type: ignore
+        name: str
+        age: Optional[int] = None
+
+    plan = DBModel.sync_all(User)
+
+    assert plan.tables[0].changes == ["add column age"]
+    assert User.get(id=1).age is None
+    assert DBModel.sync_all(User).tables == []
+
+
+def test_sync_all_after_drop_table(db_cursor):
+    class User(DBModel):
+        name: str
+
+    DBModel.sync_all(User)
+    User.drop_table()
+
+    plan = DBModel.sync_all(User)
+
+    assert [table.table_name for table in plan.tables] == ["user"]
+    User(name="John").save()
+    assert User.count() == 1
+
+
+def test_ddl_methods_clear_schema_fingerprint(db_cursor):
+    class User(DBModel):
+        name: str
+
+    for run_ddl in [User.create_table, User.update_table, lambda: migrate(User)]:
+        DBModel.sync_all(User)
+        run_ddl()
+
+        db_cursor.execute("SELECT fingerprint FROM _ormagic_schema")
+        assert db_cursor.fetchall() == []
+
+
+def test_fingerprint_changes_with_indexes_and_search():
+    class Article(DBModel):
+        title: str
+
+    fingerprint = migrations.get_schema_fingerprint([Article])
+
+    class Article(DBModel, indexes=["title"]):  # type: ignore
+        title: str
+
+    assert migrations.get_schema_fingerprint([Article]) != fingerprint
+    fingerprint = migrations.get_schema_fingerprint([Article])
+
+    class Article(DBModel, indexes=["title"], searchable=["title"]):  # type: ignore
+        title: str
+
+    assert migrations.get_schema_fingerprint([Article]) != fingerprint
+
+
+def test_sync_all_defaults_to_all_subclasses(db_cursor):
+    class AppModel(DBModel):
+        pass
+
+    class Author(AppModel):
+        name: str
+
+    class Book(AppModel):
+        title: str
+        author: Author
+
+    plan = AppModel.sync_all()
+
+    assert [table.table_name for table in plan.tables] == ["author", "book"]
+
+
+def test_sort_models_with_circular_foreign_keys():
+    class Employee(DBModel):
+        name: str
+        department: Optional["Department"] = None
+
+    class Department(DBModel):
+        name: str
+        manager: Optional[Employee] = None
+
+    class Office(DBModel):
+        department: Department
+
+    assert sort_models_by_dependencies([Office, Employee, Department]) == [
+        Employee,
+        Department,
+        Office,
+    ]
@@ -1,11 +1,16 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
 from ormagic import DBModel, transaction
 
 
 def test_is_under_transaction():
     with transaction():
-        assert transaction._is_transaction is True
+        assert transaction.is_active() is True
 
-    assert transaction._is_transaction is False
+    assert transaction.is_active() is False
 
 
 def test_save_multiple_objects_under_transaction():
@@ -37,3 +42,103 @@ def test_try_to_save_multiple_objects_with_rollbacks():
         pass
     finally:
         assert len(TestModel.all()) == 1
+
+
+def test_nested_transaction_is_rolled_back_to_savepoint():
+    class TestModel(DBModel):
+        name: str
+
+    TestModel.create_table()
+
+    with transaction():
+        TestModel(name="outer").save()
+        try:
+            with transaction():
+                TestModel(name="inner").save()
+                raise ValueError
+        except ValueError:
+            pass
+        TestModel(name="after").save()
+
+    assert [obj.name for obj in TestModel.all()] == ["outer", "after"]
+
+
+def test_nested_transaction_is_committed_with_outer_transaction():
+    class TestModel(DBModel):
+        name: str
+
+    TestModel.create_table()
+
+    with pytest.raises(ValueError):
+        with transaction():
+            with transaction():
+                TestModel(name="inner").save()
+            assert transaction.is_active() is True
+            raise ValueError
+
+    assert TestModel.all() == []
+
+
+@pytest.mark.file_database
+def test_transaction_is_not_shared_between_threads():
+    class TestModel(DBModel):
+        name: str
+
+    TestModel.create_table()
+
+    with transaction():
+        TestModel(name="test").save()
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            assert executor.submit(transaction.is_active).result() is False
+            assert executor.submit(TestModel.all).result() == []
+
+    assert len(TestModel.all()) == 1
+
+
+def test_transaction_is_not_shared_between_asyncio_tasks():
+    class TestModel(DBModel):
+        name: str
+
+    TestModel.create_table()
+
+    async def in_transaction(started: asyncio.Event, finish: asyncio.Event):
+        async with transaction():
+            await TestModel(name="test").asave()
+            started.set()
+            await finish.wait()
+
+    async def outside_transaction(started: asyncio.Event, finish: asyncio.Event):
+        await started.wait()
+        assert transaction.is_active() is False
+        finish.set()
+
+    async def main():
+        started, finish = asyncio.Event(), asyncio.Event()
+        await asyncio.gather(
+            in_transaction(started, finish), outside_transaction(started, finish)
+        )
+
+    asyncio.run(main())
+
+    assert len(TestModel.all()) == 1
+
+
+def test_nested_async_transaction_is_rolled_back_to_savepoint():
+    class TestModel(DBModel):
+        name: str
+
+    TestModel.create_table()
+
+    async def main():
+        async with transaction():
+            await TestModel(name="outer").asave()
+            try:
+                async with transaction():
+                    await TestModel(name="inner").asave()
+                    raise ValueError
+            except ValueError:
+                pass
+
+    asyncio.run(main())
+
+    assert [obj.name for obj in TestModel.all()] == ["outer"]
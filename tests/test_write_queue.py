@@ -0,0 +1,136 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from sqlite3 import IntegrityError
+
+import pytest
+
+from ormagic import DBField, DBModel, disable_write_queue, enable_write_queue
+from ormagic.models import ObjectNotFound
+from ormagic.writer import Writer
+
+
+class User(DBModel):
+    name: str = DBField(unique=True)
+    age: int
+
+
+@pytest.fixture(autouse=True)
+def write_queue():
+    enable_write_queue(max_batch_size=10, max_latency=0.01)
+    User.create_table()
+    yield
+    disable_write_queue()
+
+
+def test_save_object_through_writer_thread():
+    user = User(name="John", age=30).save()
+
+    assert user.id == 1
+    assert User.get(id=1) == user
+
+
+def test_submit_save_returns_future():
+    future = User(name="John", age=30).submit_save()
+
+    assert future.result().id == 1
+    assert User.get(name="John").age == 30
+
+
+def test_submit_delete_returns_future():
+    user = User(name="John", age=30).save()
+
+    user.submit_delete().result()
+
+    with pytest.raises(ObjectNotFound):
+        User.get(id=user.id)
+
+
+def test_writes_are_executed_in_writer_thread():
+    threads = set()
+
+    class Tracked(DBModel):
+        name: str
+
+        def _insert(self, cursor):
+            threads.add(threading.current_thread())
+            return super()._insert(cursor)
+
+    Tracked.create_table()
+    Tracked(name="test").save()
+
+    assert len(threads) == 1
+    assert isinstance(threads.pop(), Writer)
+
+
+def test_concurrent_writes_are_grouped_in_batches():
+    commits = 0
+    original_commit_batch = Writer._commit_batch
+
+    def counting_commit_batch(self, connection, batch):
+        nonlocal commits
+        commits += 1
+        return original_commit_batch(self, connection, batch)
+
+    Writer._commit_batch = counting_commit_batch  # type: ignore
+    try:
+        futures = [User(name=f"User {i}", age=i + 1).submit_save() for i in range(30)]
+        results = [future.result() for future in futures]
+    finally:
+        Writer._commit_batch = original_commit_batch  # type: ignore
+
+    assert len(User.all()) == 30
+    assert sorted(user.id for user in results) == list(range(1, 31))
+    assert commits <= 10
+
+
+def test_failed_write_does_not_affect_other_writes_in_batch():
+    futures = [
+        User(name="John", age=30).submit_save(),
+        User(name="John", age=40).submit_save(),
+        User(name="Jane", age=25).submit_save(),
+    ]
+
+    assert futures[0].result().name == "John"
+    with pytest.raises(IntegrityError):
+        futures[1].result()
+    assert futures[2].result().name == "Jane"
+    assert [user.name for user in User.all()] == ["John", "Jane"]
+
+
+def test_save_raises_error_of_failed_write():
+    User(name="John", age=30).save()
+
+    with pytest.raises(IntegrityError):
+        User(name="John", age=40).save()
+
+
+def test_concurrent_saves_from_many_threads():
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        list(
+            executor.map(lambda i: User(name=f"User {i}", age=i + 1).save(), range(50))
+        )
+
+    assert len(User.all()) == 50
+
+
+def test_disable_write_queue_commits_pending_writes():
+    futures = [User(name=f"User {i}", age=i + 1).submit_save() for i in range(5)]
+
+    disable_write_queue()
+
+    assert all(future.done() for future in futures)
+    assert len(User.all()) == 5
+
+
+def test_submit_save_without_write_queue():
+    disable_write_queue()
+
+    future = User(name="John", age=30).submit_save()
+
+    assert future.done()
+    assert future.result().id == 1
+
+
+def test_enable_write_queue_with_invalid_batch_size():
+    with pytest.raises(ValueError):
+        enable_write_queue(max_batch_size=0)